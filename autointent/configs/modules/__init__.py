@@ -1,6 +1,6 @@
 from .base import ModuleConfig
 from .prediction import ArgmaxPredictorConfig, JinoosPredictorConfig, ThresholdPredictorConfig, TunablePredictorConfig
-from .retrieval import VectorDBConfig
+from .retrieval import HybridConfig, VectorDBConfig
 from .scoring import DNNCScorerConfig, KNNScorerConfig, LinearScorerConfig, MLKnnScorerConfig
 
 PREDICTION_MODULES_CONFIGS: dict[str, type[ModuleConfig]] = {
@@ -10,7 +10,7 @@ PREDICTION_MODULES_CONFIGS: dict[str, type[ModuleConfig]] = {
     "tunable": TunablePredictorConfig,
 }
 
-RETRIEVAL_MODULES_CONFIGS: dict[str, type[ModuleConfig]] = {"vector_db": VectorDBConfig}
+RETRIEVAL_MODULES_CONFIGS: dict[str, type[ModuleConfig]] = {"hybrid": HybridConfig, "vector_db": VectorDBConfig}
 
 SCORING_MODULES_CONFIGS: dict[str, type[ModuleConfig]] = {
     "dnnc": DNNCScorerConfig,
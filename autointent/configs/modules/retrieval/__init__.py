@@ -1 +1,2 @@
+from .hybrid import HybridConfig
 from .vectordb import VectorDBConfig
@@ -0,0 +1,16 @@
+from dataclasses import dataclass
+
+from omegaconf import MISSING
+
+from autointent.configs.modules.base import ModuleConfig
+
+
+@dataclass
+class HybridConfig(ModuleConfig):
+    k: int = MISSING
+    model_name: str = MISSING
+    n_candidates: int | None = None
+    rrf_k: int = 60
+    bm25_k1: float = 1.5
+    bm25_b: float = 0.75
+    _target_: str = "autointent.modules.retrieval.HybridModule"
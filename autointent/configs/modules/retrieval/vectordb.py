@@ -9,4 +9,14 @@ from autointent.configs.modules.base import ModuleConfig
 class VectorDBConfig(ModuleConfig):
     k: int = MISSING
     model_name: str = MISSING
+    dim_reduction: str = "none"
+    n_components: int | None = None
+    hnsw_m: int | None = None
+    hnsw_construction_ef: int | None = None
+    hnsw_search_ef: int | None = None
+    n_lists: int | None = None
+    nprobe: int | None = None
+    pq_subvectors: int | None = None
+    pq_centroids: int | None = None
+    rerank: int | None = None
     _target_: str = "autointent.modules.retrieval.VectorDBModule"
@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
 
 from hydra.core.config_store import ConfigStore
@@ -7,6 +7,7 @@ from omegaconf import MISSING
 from autointent.custom_types import LogLevel
 
 from .node import NodeOptimizerConfig
+from .vector_index import VectorIndexConfig
 
 
 @dataclass
@@ -28,6 +29,7 @@ class OptimizationConfig:
     multilabel_path: str = ""
     test_path: str = ""
     db_dir: str = ""
+    vector_index: VectorIndexConfig = field(default_factory=VectorIndexConfig)
     logs_dir: str = ""
     run_name: str = ""
     mode: ClassificationMode = ClassificationMode.multiclass
@@ -36,6 +38,7 @@ class OptimizationConfig:
     seed: int = 0
     log_level: LogLevel = LogLevel.ERROR
     multilabel_generation_config: str = ""
+    float_dtype: str = "float32"  # "float32" or "float64" dtype of scores and probabilities
 
 
 cs = ConfigStore.instance()
@@ -0,0 +1,14 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class VectorIndexConfig:
+    backend: str = "chroma"  # "chroma", "brute_force", "ivf" or "pq"
+    quantization: str = "none"  # "none", "float16" or "int8" storage of train embeddings
+    embeddings_cache_dir: str = ""
+    model_pool_memory_limit: int = 4 * 1024 * 1024 * 1024  # 4 GB
+    embedding_batch_size: int = 32
+    query_chunk_size: int = 1024  # queries embedded and searched at once
+    max_seq_length: int | None = None  # None means the model's own limit
+    embedding_workers: int = 0  # number of cpu worker processes for embedding, 0 or 1 means the main process
+    embedding_worker_threads: int | None = None  # torch threads per worker, None splits cpu cores evenly
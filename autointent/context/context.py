@@ -1,16 +1,20 @@
 from typing import Any
 
-from chromadb import Collection
+import numpy as np
+from numpy.typing import NDArray
 
-from autointent.custom_types import TASK_TYPES
+from autointent.configs.vector_index import VectorIndexConfig
+from autointent.custom_types import FLOAT_TYPES, QUERY_SET_TYPES, TASK_TYPES
+from autointent.dtype_policy import dtype_policy
 
 from .data_handler import DataHandler
 from .optimization_info import OptimizationInfo
-from .vector_index import VectorIndex
+from .query_cache import Neighbours, QueryCache
+from .vector_index import BaseIndex, VectorIndex
 
 
 class Context:
-    def __init__(
+    def __init__(  # noqa: PLR0913
         self,
         multiclass_intent_records: list[dict[str, Any]],
         multilabel_utterance_records: list[dict[str, Any]],
@@ -21,7 +25,11 @@ class Context:
         db_dir: str,
         regex_sampling: int,
         seed: int,
+        vector_index_config: VectorIndexConfig | None = None,
+        float_dtype: FLOAT_TYPES = "float32",
     ) -> None:
+        # scores of all scorers, predictors and metrics follow the process-wide dtype policy
+        dtype_policy.set_float_dtype(float_dtype)
         self.data_handler = DataHandler(
             multiclass_intent_records,
             multilabel_utterance_records,
@@ -32,16 +40,41 @@ class Context:
             seed,
         )
         self.optimization_info = OptimizationInfo()
-        self.vector_index = VectorIndex(db_dir, device, self.data_handler.multilabel, self.data_handler.n_classes)
+        self.vector_index = VectorIndex(
+            db_dir,
+            device,
+            self.data_handler.multilabel,
+            self.data_handler.n_classes,
+            vector_index_config,
+        )
+        self.query_cache = QueryCache(self.data_handler)
 
         self.device = device
         self.multilabel = self.data_handler.multilabel
         self.n_classes = self.data_handler.n_classes
         self.seed = seed
+        self.float_dtype = float_dtype
+
+    def get_best_collection(self) -> BaseIndex:
+        retriever = self.optimization_info.get_best_retriever()
+        return self.vector_index.get_collection(
+            retriever.embedder_name,
+            dim_reduction=retriever.dim_reduction,
+            n_components=retriever.n_components,
+            index_params=retriever.index_params,
+        )
+
+    def get_query_embeddings(self, query_set: QUERY_SET_TYPES) -> NDArray[np.float32]:
+        """embeddings of the test or oos utterances made by the best embedder"""
+        return self.query_cache.get_embeddings(self.get_best_collection(), query_set)
+
+    def get_neighbours(self, query_set: QUERY_SET_TYPES, k: int) -> Neighbours:
+        """`k` closest train items to the test or oos utterances in the best embedder's vector index"""
+        return self.query_cache.get_neighbours(self.get_best_collection(), query_set, k)
 
-    def get_best_collection(self) -> Collection:
-        model_name = self.optimization_info.get_best_embedder()
-        return self.vector_index.get_collection(model_name)
+    def get_train_neighbours(self, k: int) -> Neighbours:
+        """`k` closest train items to each train item in the best embedder's vector index"""
+        return self.query_cache.get_train_neighbours(self.get_best_collection(), k)
 
     def get_inference_config(self) -> dict[str, Any]:
         return {
@@ -50,7 +83,10 @@ class Context:
                 "multilabel": self.multilabel,
                 "n_classes": self.n_classes,
                 "seed": self.seed,
+                "float_dtype": self.float_dtype,
                 "db_dir": self.vector_index.db_dir,
+                "embedding_batch_size": self.vector_index.config.embedding_batch_size,
+                "max_seq_length": self.vector_index.config.max_seq_length,
             },
             "nodes_configs": self.optimization_info.get_best_trials(),
         }
@@ -0,0 +1,161 @@
+import logging
+import multiprocessing as mp
+import os
+from collections.abc import Callable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Protocol
+
+import numpy as np
+import torch
+from numpy.typing import NDArray
+from sentence_transformers import SentenceTransformer
+
+
+class EmbeddingFunction(Protocol):
+    def __call__(self, texts: list[str]) -> NDArray[np.float32]:
+        """
+        Return
+        ---
+        float32 array of shape (len(texts), dim), also for empty `texts`
+        """
+        ...
+
+
+def get_token_lengths(model: SentenceTransformer, texts: list[str]) -> NDArray[np.int64]:
+    """number of tokens in each text (character count if the model has no tokenizer)"""
+    tokenizer = getattr(model, "tokenizer", None)
+    if tokenizer is None:
+        return np.array([len(text) for text in texts], dtype=np.int64)
+    input_ids = tokenizer(texts, add_special_tokens=False)["input_ids"]
+    return np.array([len(ids) for ids in input_ids], dtype=np.int64)
+
+
+@contextmanager
+def max_seq_length_set(model: SentenceTransformer, max_seq_length: int | None) -> Iterator[None]:
+    """temporarily truncate inputs of the model, which can be shared with other embedding functions"""
+    if max_seq_length is None:
+        yield
+        return
+    old_max_seq_length = model.max_seq_length
+    model.max_seq_length = max_seq_length
+    try:
+        yield
+    finally:
+        model.max_seq_length = old_max_seq_length
+
+
+def encode_bucketed(
+    model: SentenceTransformer,
+    texts: list[str],
+    batch_size: int = 32,
+    max_seq_length: int | None = None,
+    normalize_embeddings: bool = False,
+) -> NDArray[np.float32]:
+    """
+    Embed texts in batches of similar token length to cut padding.
+
+    Texts are sorted by token length (longest first, so that out-of-memory errors show up on the first batch), \
+    split into buckets of `batch_size` and the embeddings are put back in the original order.
+
+    Return
+    ---
+    float32 array of shape (len(texts), dim)
+    """
+    if len(texts) == 0:
+        return np.empty((0, model.get_sentence_embedding_dimension() or 0), dtype=np.float32)
+
+    lengths = get_token_lengths(model, texts)
+    if max_seq_length is not None:
+        lengths = np.minimum(lengths, max_seq_length)
+    order = np.argsort(-lengths, kind="stable")
+
+    with max_seq_length_set(model, max_seq_length):
+        batches = [
+            model.encode(
+                [texts[i] for i in order[start : start + batch_size]],
+                batch_size=batch_size,
+                convert_to_numpy=True,
+                normalize_embeddings=normalize_embeddings,
+            )
+            for start in range(0, len(texts), batch_size)
+        ]
+
+    res = np.empty((len(texts), batches[0].shape[1]), dtype=np.float32)
+    res[order] = np.concatenate(batches)
+    return res
+
+
+_worker_model: Any = None
+
+
+def _init_worker(loader: Callable[..., Any], model_name: str, n_threads: int, kwargs: dict[str, Any]) -> None:
+    global _worker_model  # noqa: PLW0603
+    torch.set_num_threads(n_threads)
+    _worker_model = loader(model_name, device="cpu", **kwargs)
+
+
+def _encode_shard(
+    texts: list[str], batch_size: int, max_seq_length: int | None, normalize_embeddings: bool
+) -> NDArray[np.float32]:
+    return encode_bucketed(_worker_model, texts, batch_size, max_seq_length, normalize_embeddings)
+
+
+class EmbeddingProcessPool:
+    """
+    Pool of CPU worker processes, each with its own copy of the sentence transformer and its own torch thread budget.
+
+    Texts are split into contiguous shards, every worker embeds its shards with `encode_bucketed` \
+    and the results are concatenated in the original order.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        n_workers: int,
+        n_threads: int | None = None,
+        loader: Callable[..., Any] = SentenceTransformer,
+        **kwargs: Any,  # noqa: ANN401
+    ) -> None:
+        """
+        Arguments
+        ---
+        - `model_name`: sentence transformer to load in each worker with `loader(model_name, device="cpu", **kwargs)`
+        - `n_workers`: number of worker processes
+        - `n_threads`: torch intra-op threads per worker, by default cpu cores are split evenly between workers
+        """
+        self._logger = logging.getLogger(__name__)
+        self.n_workers = n_workers
+        self.n_threads = n_threads if n_threads is not None else max(1, (os.cpu_count() or 1) // n_workers)
+        self._logger.debug("starting %s embedding workers with %s threads each...", n_workers, self.n_threads)
+        self._executor = ProcessPoolExecutor(
+            max_workers=n_workers,
+            mp_context=mp.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(loader, model_name, self.n_threads, kwargs),
+        )
+
+    def encode(
+        self,
+        texts: list[str],
+        batch_size: int = 32,
+        max_seq_length: int | None = None,
+        normalize_embeddings: bool = False,
+    ) -> NDArray[np.float32]:
+        """float32 array of shape (len(texts), dim) with embeddings in the order of `texts`"""
+        if len(texts) == 0:
+            return np.empty((0, 0), dtype=np.float32)
+        shard_size = -(-len(texts) // self.n_workers)
+        shards = [texts[start : start + shard_size] for start in range(0, len(texts), shard_size)]
+        n_shards = len(shards)
+        results = self._executor.map(
+            _encode_shard,
+            shards,
+            [batch_size] * n_shards,
+            [max_seq_length] * n_shards,
+            [normalize_embeddings] * n_shards,
+        )
+        return np.concatenate(list(results))
+
+    def close(self) -> None:
+        self._executor.shutdown()
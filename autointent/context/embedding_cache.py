@@ -0,0 +1,211 @@
+import hashlib
+import logging
+import unicodedata
+from pathlib import Path
+from typing import Any
+from uuid import uuid4
+
+import numpy as np
+from appdirs import user_cache_dir
+from numpy.typing import NDArray
+from sentence_transformers import SentenceTransformer
+
+from .embedder import EmbeddingProcessPool, encode_bucketed
+from .model_pool import model_pool
+
+
+def get_embeddings_cache_dir() -> Path:
+    """Get system's default directory for the embeddings cache."""
+    cache_dir = user_cache_dir("autointent")
+    return Path(cache_dir) / "embeddings"
+
+
+def hash_text(text: str) -> str:
+    """sha256 hex digest of the unicode-normalized and stripped text"""
+    normalized = unicodedata.normalize("NFC", text).strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def get_model_revision(model: SentenceTransformer) -> str:
+    """commit hash of the huggingface hub snapshot the model was loaded from, if available"""
+    auto_model = getattr(model[0], "auto_model", None)
+    config = getattr(auto_model, "config", None)
+    revision = getattr(config, "_commit_hash", None)
+    return revision if revision is not None else "unknown"
+
+
+class EmbeddingCache:
+    """
+    Content-addressed on-disk storage of sentence embeddings.
+
+    Embeddings are keyed by (model name, model revision, normalized text hash). Each call of `update` writes
+    a new shard into the model directory, so that concurrent runs never overwrite each other's files: the keys go
+    to `<uuid>.keys.npy` and then the embeddings to `<uuid>.embeddings.npy`, which completes the shard.
+    On load, all shards are merged into a single one and the merged shards are removed, so their number does not grow
+    across runs. The merged embeddings are opened memory-mapped and only a mapping from keys to rows is kept in memory.
+    """
+
+    def __init__(self, model_name: str, revision: str, cache_dir: str | Path | None = None) -> None:
+        self._logger = logging.getLogger(__name__)
+
+        cache_dir = get_embeddings_cache_dir() if cache_dir is None else Path(cache_dir)
+        self.path = cache_dir / model_name.replace("/", "_") / revision
+        self._rows: dict[str, int] = {}
+        self._stored: NDArray[np.float32] = np.empty((0, 0), dtype=np.float32)
+        self._new: dict[str, NDArray[np.float32]] = {}
+        self._load()
+
+    def _shard_paths(self) -> list[Path]:
+        return sorted(self.path.glob("*.embeddings.npy"))
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        shard_paths = self._shard_paths()
+        if len(shard_paths) > 1:
+            shard = self._compact(shard_paths)
+        elif len(shard_paths) == 1:
+            shard = _read_shard(shard_paths[0])
+        else:
+            shard = None
+        if shard is not None:
+            keys, self._stored = shard
+            self._rows = {key: row for row, key in enumerate(keys.tolist())}
+        self._logger.debug("loaded %s cached embeddings from %s", len(self._rows), self.path)
+
+    def _compact(self, shard_paths: list[Path]) -> tuple[NDArray[np.str_], NDArray[np.float32]] | None:
+        """merge the shards into a new one, remove them and return the merged keys and embeddings"""
+        # shards merged and removed by a concurrent run are skipped, their embeddings are computed again if needed
+        shards = [shard for shard in map(_read_shard, shard_paths) if shard is not None]
+        if not shards:
+            return None
+        keys, rows = np.unique(np.concatenate([keys for keys, _ in shards]), return_index=True)
+        embeddings = np.concatenate([embeddings for _, embeddings in shards])[rows]
+        merged_path = self._save(keys, embeddings)
+        for shard_path in shard_paths:
+            shard_path.unlink(missing_ok=True)
+            _keys_path(shard_path).unlink(missing_ok=True)
+        self._logger.debug("merged %s shards of cached embeddings in %s", len(shard_paths), self.path)
+        return _read_shard(merged_path)
+
+    def _save(self, keys: NDArray[np.str_], embeddings: NDArray[np.float32]) -> Path:
+        self.path.mkdir(parents=True, exist_ok=True)
+        shard_name = uuid4().hex
+        for path, array in [
+            (self.path / f"{shard_name}.keys.npy", keys),
+            (self.path / f"{shard_name}.embeddings.npy", embeddings),
+        ]:
+            tmp_path = path.with_name(f"{path.name.removesuffix('.npy')}.tmp.npy")
+            np.save(tmp_path, array)
+            tmp_path.replace(path)
+        return self.path / f"{shard_name}.embeddings.npy"
+
+    def __len__(self) -> int:
+        return len(self._rows) + len(self._new)
+
+    def lookup(self, keys: list[str]) -> list[NDArray[np.float32] | None]:
+        res: list[NDArray[np.float32] | None] = []
+        for key in keys:
+            row = self._rows.get(key)
+            res.append(self._stored[row] if row is not None else self._new.get(key))
+        return res
+
+    def update(self, keys: list[str], embeddings: NDArray[np.float32]) -> None:
+        if len(keys) == 0:
+            return
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        self._new.update(zip(keys, embeddings, strict=True))
+        self._save(np.array(keys), embeddings)
+        self._logger.debug("saved %s new embeddings to %s", len(keys), self.path)
+
+
+def _keys_path(shard_path: Path) -> Path:
+    return shard_path.with_name(shard_path.name.replace(".embeddings.npy", ".keys.npy"))
+
+
+def _read_shard(shard_path: Path) -> tuple[NDArray[np.str_], NDArray[np.float32]] | None:
+    """keys and memory-mapped embeddings of the shard, None if it was removed"""
+    try:
+        return np.load(_keys_path(shard_path)), np.load(shard_path, mmap_mode="r")
+    except FileNotFoundError:
+        return None
+
+
+class CachedEmbeddingFunction:
+    """
+    Sentence transformer embedding function that looks up the persistent `EmbeddingCache` \
+    before running the model and embeds only texts that were never seen before.
+
+    The model itself is taken from the process-wide `model_pool` on every call and is never referenced \
+    in between, so that all collections of the same embedder share one loaded instance and a model evicted \
+    from the pool is actually freed (it is loaded again if it is needed later). \
+    New texts are embedded in length-sorted batches (see `encode_bucketed`). With `n_workers > 1` on cpu, \
+    large inputs are sharded between worker processes (see `EmbeddingProcessPool`), which are started on first use.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        device: str = "cpu",
+        cache_dir: str | Path | None = None,
+        normalize_embeddings: bool = False,
+        batch_size: int = 32,
+        max_seq_length: int | None = None,
+        n_workers: int = 0,
+        n_threads: int | None = None,
+        **kwargs: Any,  # noqa: ANN401
+    ) -> None:
+        self._model_name = model_name
+        self._device = device
+        self._model_kwargs = kwargs
+        self._normalize_embeddings = normalize_embeddings
+        self._batch_size = batch_size
+        self._max_seq_length = max_seq_length
+        self._n_workers = n_workers if device == "cpu" else 0
+        self._n_threads = n_threads
+        self._process_pool: EmbeddingProcessPool | None = None
+
+        revision = get_model_revision(self._get_model())
+        if max_seq_length is not None:
+            # truncated inputs give different embeddings
+            revision = f"{revision}-max_seq_length-{max_seq_length}"
+        self._cache = EmbeddingCache(model_name, revision, cache_dir)
+
+    def _get_model(self) -> SentenceTransformer:
+        return model_pool.get(self._model_name, self._device, **self._model_kwargs)  # type: ignore[no-any-return]
+
+    def __call__(self, texts: list[str]) -> NDArray[np.float32]:
+        if len(texts) == 0:
+            return self._encode([])
+        keys = [hash_text(text) for text in texts]
+        embeddings = self._cache.lookup(keys)
+
+        missing = {key: text for key, text, emb in zip(keys, texts, embeddings, strict=True) if emb is None}
+        if missing:
+            new_embeddings = self._encode(list(missing.values()))
+            self._cache.update(list(missing.keys()), new_embeddings)
+            embeddings = self._cache.lookup(keys)
+
+        return np.stack(embeddings)  # type: ignore[arg-type]
+
+    def _encode(self, texts: list[str]) -> NDArray[np.float32]:
+        # starting worker processes does not pay off for a couple of batches
+        if self._n_workers > 1 and len(texts) >= self._n_workers * self._batch_size:
+            if self._process_pool is None:
+                self._process_pool = EmbeddingProcessPool(
+                    self._model_name, self._n_workers, self._n_threads, **self._model_kwargs
+                )
+            return self._process_pool.encode(texts, self._batch_size, self._max_seq_length, self._normalize_embeddings)
+        return encode_bucketed(
+            self._get_model(),
+            texts,
+            batch_size=self._batch_size,
+            max_seq_length=self._max_seq_length,
+            normalize_embeddings=self._normalize_embeddings,
+        )
+
+    def close(self) -> None:
+        """stop worker processes, if any"""
+        if self._process_pool is not None:
+            self._process_pool.close()
+            self._process_pool = None
@@ -0,0 +1,31 @@
+import numpy as np
+from numpy.typing import NDArray
+from sklearn.feature_extraction.text import HashingVectorizer
+
+HASHED_CHAR_NGRAMS_MODEL = "autointent/hashed-char-ngrams"
+
+
+class HashedCharNgramEmbeddingFunction:
+    """
+    Built-in embedder that needs no model download: character n-grams of lowercased words \
+    are feature-hashed into `dim` signed buckets and the vector is L2-normalized.
+
+    It is selected by passing `HASHED_CHAR_NGRAMS_MODEL` as a model name. Embeddings are deterministic \
+    and cost a few microseconds per utterance, so they are not cached on disk.
+    """
+
+    def __init__(self, dim: int = 1024, ngram_range: tuple[int, int] = (2, 4)) -> None:
+        self.dim = dim
+        self._vectorizer = HashingVectorizer(
+            analyzer="char_wb",
+            ngram_range=ngram_range,
+            n_features=dim,
+            alternate_sign=True,
+            norm="l2",
+            dtype=np.float32,
+        )
+
+    def __call__(self, texts: list[str]) -> NDArray[np.float32]:
+        if len(texts) == 0:
+            return np.empty((0, self.dim), dtype=np.float32)
+        return self._vectorizer.transform(texts).toarray().astype(np.float32, copy=False)  # type: ignore[no-any-return]
@@ -0,0 +1,78 @@
+import logging
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+from sentence_transformers import SentenceTransformer
+from torch import nn
+
+DEFAULT_MEMORY_LIMIT = 4 * 1024 * 1024 * 1024  # 4 GB
+
+
+def get_model_size(model: nn.Module) -> int:
+    """number of bytes occupied by parameters and buffers of the model"""
+    params = sum(p.numel() * p.element_size() for p in model.parameters())
+    buffers = sum(b.numel() * b.element_size() for b in model.buffers())
+    return params + buffers
+
+
+class ModelPool:
+    """
+    Process-wide storage of loaded sentence transformers, keyed by `(model_name, device)`.
+
+    When the total size of stored models exceeds `memory_limit` bytes, the least recently used models are evicted
+    (the model which is requested right now is never evicted).
+    """
+
+    def __init__(
+        self,
+        memory_limit: int = DEFAULT_MEMORY_LIMIT,
+        loader: Callable[..., nn.Module] = SentenceTransformer,
+    ) -> None:
+        self._logger = logging.getLogger(__name__)
+        self.memory_limit = memory_limit
+        self._loader = loader
+        self._models: OrderedDict[tuple[str, str], nn.Module] = OrderedDict()
+        self._sizes: dict[tuple[str, str], int] = {}
+
+    def get(self, model_name: str, device: str, **kwargs: Any) -> Any:  # noqa: ANN401
+        """
+        Return loaded model, loading it with `loader(model_name, device=device, **kwargs)` if it is not in the pool
+        """
+        key = (model_name, device)
+        if key in self._models:
+            self._models.move_to_end(key)
+            return self._models[key]
+
+        self._logger.info("loading %s on %s into model pool...", model_name, device)
+        model = self._loader(model_name, device=device, **kwargs)
+        self._models[key] = model
+        self._sizes[key] = get_model_size(model)
+        self._evict()
+        return model
+
+    def memory_usage(self) -> int:
+        return sum(self._sizes.values())
+
+    def set_memory_limit(self, memory_limit: int) -> None:
+        self.memory_limit = memory_limit
+        self._evict()
+
+    def _evict(self) -> None:
+        while len(self._models) > 1 and self.memory_usage() > self.memory_limit:
+            (model_name, device), _ = self._models.popitem(last=False)
+            self._sizes.pop((model_name, device))
+            self._logger.debug("evicting %s on %s from model pool...", model_name, device)
+
+    def clear(self) -> None:
+        self._models.clear()
+        self._sizes.clear()
+
+    def __contains__(self, key: tuple[str, str]) -> bool:
+        return key in self._models
+
+    def __len__(self) -> int:
+        return len(self._models)
+
+
+model_pool = ModelPool()
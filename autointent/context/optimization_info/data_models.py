@@ -2,7 +2,9 @@ from typing import Any
 
 import numpy as np
 from numpy.typing import NDArray
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+from autointent.dtype_policy import dtype_policy
 
 
 class Artifact(BaseModel): ...
@@ -13,20 +15,30 @@ class RegexpArtifact(Artifact): ...
 
 class RetrieverArtifact(Artifact):
     """
-    Name of the embedding model chosen after retrieval optimization
+    Name of the embedding model chosen after retrieval optimization, reduction of its embeddings (if any) \
+    and vector index parameters
     """
 
     embedder_name: str
+    dim_reduction: str = "none"
+    n_components: int | None = None
+    index_params: dict[str, Any] = Field(default_factory=dict)
 
 
 class ScorerArtifact(Artifact):
     """
-    Outputs from best scorer, numpy arrays of shape (n_samples, n_classes)
+    Outputs from best scorer, numpy arrays of shape (n_samples, n_classes) of the dtype set by `dtype_policy`
     """
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
-    test_scores: NDArray[np.float64] | None = Field(None, description="Scorer outputs for test utterances")
-    oos_scores: NDArray[np.float64] | None = Field(None, description="Scorer outputs for out-of-scope utterances")
+    test_scores: NDArray[np.floating[Any]] | None = Field(None, description="Scorer outputs for test utterances")
+    oos_scores: NDArray[np.floating[Any]] | None = Field(None, description="Scorer outputs for out-of-scope utterances")
+
+    @field_validator("test_scores", "oos_scores", mode="before")
+    @classmethod
+    def _cast_scores(cls, scores: NDArray[Any] | None) -> NDArray[np.floating[Any]] | None:
+        # artifacts of all trials are kept in memory, so they must not be silently upcast to float64
+        return None if scores is None else dtype_policy.asarray(scores)
 
 
 class PredictorArtifact(Artifact):
@@ -64,6 +76,7 @@ class Trial(BaseModel):
     module_params: dict[str, Any]
     metric_name: str
     metric_value: float
+    extra_info: dict[str, Any] = Field(default_factory=dict, description="timings and other trial statistics")
 
 
 class Trials(BaseModel):
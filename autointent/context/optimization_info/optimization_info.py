@@ -28,6 +28,7 @@ class OptimizationInfo:
         metric_value: float,
         metric_name: str,
         artifact: Artifact,
+        extra_info: dict[str, Any] | None = None,
     ) -> None:
         """
         Purposes:
@@ -41,6 +42,7 @@ class OptimizationInfo:
             metric_name=metric_name,
             metric_value=metric_value,
             module_params=module_params,
+            extra_info=extra_info if extra_info is not None else {},
         )
         self.trials[node_type].append(trial)
         self._logger.info(trial.model_dump())
@@ -64,15 +66,14 @@ class OptimizationInfo:
         i_best = self._get_best_trial_idx(node_type)
         return self.artifacts[node_type][i_best]
 
-    def get_best_embedder(self) -> str:
-        best_retriever_artifact: RetrieverArtifact = self._get_best_artifact(node_type="retrieval")
-        return best_retriever_artifact.embedder_name
+    def get_best_retriever(self) -> RetrieverArtifact:
+        return self._get_best_artifact(node_type="retrieval")  # type: ignore[return-value]
 
-    def get_best_test_scores(self) -> NDArray[np.float64] | None:
+    def get_best_test_scores(self) -> NDArray[np.floating[Any]] | None:
         best_scorer_artifact: ScorerArtifact = self._get_best_artifact(node_type="scoring")
         return best_scorer_artifact.test_scores
 
-    def get_best_oos_scores(self) -> NDArray[np.float64] | None:
+    def get_best_oos_scores(self) -> NDArray[np.floating[Any]] | None:
         best_scorer_artifact: ScorerArtifact = self._get_best_artifact(node_type="scoring")
         return best_scorer_artifact.oos_scores
 
@@ -0,0 +1,103 @@
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+
+from autointent.custom_types import QUERY_SET_TYPES
+
+from .data_handler import DataHandler
+from .vector_index import BaseIndex
+
+
+@dataclass
+class Neighbours:
+    """
+    Result of querying a vector index, rows correspond to queries and columns go from the closest item to the farthest.
+
+    - `ids`: row ids of the retrieved train items, array of shape (n_queries, k)
+    - `distances`: cosine distances to them, array of shape (n_queries, k)
+    - `labels`: their labels, array of shape (n_queries, k) (multiclass case) \
+        or (n_queries, k, n_classes) (multilabel case)
+    """
+
+    ids: NDArray[np.int64]
+    distances: NDArray[Any]
+    labels: NDArray[Any]
+
+    @property
+    def k(self) -> int:
+        return self.ids.shape[1]
+
+    def top(self, k: int) -> "Neighbours":
+        """views of the first `k` columns"""
+        return Neighbours(ids=self.ids[:, :k], distances=self.distances[:, :k], labels=self.labels[:, :k])
+
+
+class QueryCache:
+    """
+    Results of querying vector indexes with the test and oos utterances, shared between optimization trials.
+
+    Query embeddings are computed lazily once per (vector index, query set). Neighbour tables are computed \
+    once per (vector index, query set) at `max_k` neighbours, trials with smaller `k` get slices of them. \
+    The same is done for the train items themselves queried against their own index (see `get_train_neighbours`).
+    Vector indexes are told apart by their names, neighbour tables also by the search parameters they were found with.
+    """
+
+    def __init__(self, data_handler: DataHandler) -> None:
+        self.data_handler = data_handler
+        self.max_k = 0
+        self._embeddings: dict[tuple[str, QUERY_SET_TYPES], NDArray[np.float32]] = {}
+        self._neighbours: dict[tuple[str, str, str], Neighbours] = {}
+
+    def get_utterances(self, query_set: QUERY_SET_TYPES) -> list[str]:
+        if query_set == "test":
+            return self.data_handler.utterances_test
+        return self.data_handler.oos_utterances
+
+    def get_embeddings(self, collection: BaseIndex, query_set: QUERY_SET_TYPES) -> NDArray[np.float32]:
+        """read-only array of shape (n_queries, dim) with embeddings of the query set"""
+        key = (collection.name, query_set)
+        if key not in self._embeddings:
+            embeddings = collection.embed(self.get_utterances(query_set))
+            embeddings.flags.writeable = False
+            self._embeddings[key] = embeddings
+        return self._embeddings[key]
+
+    def get_neighbours(self, collection: BaseIndex, query_set: QUERY_SET_TYPES, k: int) -> Neighbours:
+        """
+        Arguments
+        ---
+        - `collection`: vector index to query
+        - `query_set`: which utterances to use as queries
+        - `k`: number of neighbours needed, the table is recomputed if it holds fewer of them
+        """
+        return self._get_neighbours(collection, query_set, k)
+
+    def get_train_neighbours(self, collection: BaseIndex, k: int) -> Neighbours:
+        """
+        Neighbours of the items stored in the index among themselves, queried with their stored embeddings \
+        (so the first neighbour of an item is usually the item itself)
+        """
+        return self._get_neighbours(collection, "train", k)
+
+    def _get_neighbours(self, collection: BaseIndex, query_set: str, k: int) -> Neighbours:
+        key = (collection.name, query_set, repr(sorted(collection.get_search_params().items())))
+        cached = self._neighbours.get(key)
+        if cached is None or cached.k < min(k, collection.count()):
+            n_neighbours = min(max(k, self.max_k), collection.count())
+            if query_set == "train":
+                queries = collection.get_all_embeddings()
+            else:
+                queries = self.get_embeddings(collection, query_set)  # type: ignore[arg-type]
+            ids, distances = collection.query(queries, n_neighbours)
+            cached = Neighbours(ids=ids, distances=distances, labels=collection.get_labels(ids))
+            for array in (cached.ids, cached.distances, cached.labels):
+                # tables are shared between trials
+                array.flags.writeable = False
+            self._neighbours[key] = cached
+        return cached.top(k)
+
+    def clear(self) -> None:
+        self._embeddings = {}
+        self._neighbours = {}
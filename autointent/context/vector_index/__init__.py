@@ -0,0 +1,23 @@
+from .base import BaseIndex
+from .brute_force import BruteForceIndex, search_recall
+from .chroma import ChromaIndex
+from .embeddings import EmbeddingStore
+from .ivf import IVFIndex
+from .labels import LabelStore
+from .pq import PQIndex, ProductQuantizer
+from .reduction import DimReduction
+from .vector_index import VectorIndex
+
+__all__ = [
+    "BaseIndex",
+    "BruteForceIndex",
+    "ChromaIndex",
+    "DimReduction",
+    "EmbeddingStore",
+    "IVFIndex",
+    "LabelStore",
+    "PQIndex",
+    "ProductQuantizer",
+    "VectorIndex",
+    "search_recall",
+]
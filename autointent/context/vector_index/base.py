@@ -0,0 +1,214 @@
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from typing import Any, ClassVar
+
+import numpy as np
+from numpy.typing import NDArray
+
+from autointent.context.embedder import EmbeddingFunction
+
+from .kmeans import normalize
+from .labels import LabelStore
+from .quantization import QuantizedEmbeddings
+
+
+class BaseIndex(ABC):
+    """
+    Vector index over train utterances embedded with one sentence transformer.
+
+    Items are identified by integer row ids `0..count()-1` in the order they were added. \
+    Distances are cosine distances `1 - cos`. All embeddings an index hands out are L2-normalized: \
+    `embed` returns unit vectors and so does `get_all_embeddings` (up to quantization error) for every backend, \
+    so features of stored items and of queries come from the same distribution. \
+    Labels are kept in a columnar `LabelStore` indexed by row id, \
+    so backends only need to return ids of the closest items.
+
+    `supported_params` lists backend-specific keyword arguments that can be tuned in the search space, \
+    `search_params` are the ones that affect only search and are changed on a built index with `set_search_params`. \
+    `exact` tells whether the index always returns the true nearest neighbours.
+
+    Queries are processed in chunks of `query_chunk_size`: each chunk is embedded, searched \
+    and written into preallocated result arrays, so memory stays bounded for any number of queries.
+    """
+
+    supported_params: ClassVar[tuple[str, ...]] = ()
+    search_params: ClassVar[tuple[str, ...]] = ()
+    exact: bool = False
+
+    def __init__(
+        self,
+        name: str,
+        embedding_function: EmbeddingFunction,
+        multilabel: bool,
+        n_classes: int,
+    ) -> None:
+        self.name = name
+        self.multilabel = multilabel
+        self.n_classes = n_classes
+        self._embedding_function: EmbeddingFunction | None = embedding_function
+        self._labels = LabelStore(multilabel, n_classes)
+        self.build_time = 0.0
+        self.query_chunk_size = 1024
+        self.fingerprint: str | None = None
+        self._default_search_params: dict[str, Any] | None = None
+
+    def embed(self, utterances: list[str]) -> NDArray[np.float32]:
+        """L2-normalized embeddings of utterances made with the model this index is built with"""
+        if self._embedding_function is None:
+            msg = f"index {self.name} is released"
+            raise RuntimeError(msg)
+        return normalize(np.asarray(self._embedding_function(utterances), dtype=np.float32))
+
+    def get_search_params(self) -> dict[str, Any]:
+        """current values of `search_params`"""
+        return {name: getattr(self, name) for name in self.search_params}
+
+    def set_search_params(self, **params: Any) -> None:  # noqa: ANN401
+        """set `search_params`, the ones not given are reset to the values the index was created with"""
+        if self._default_search_params is None:
+            self._default_search_params = self.get_search_params()
+        for name in self.search_params:
+            setattr(self, name, params.get(name, self._default_search_params[name]))
+
+    def _as_embeddings(self, queries: list[str] | NDArray[Any]) -> NDArray[np.float32]:
+        if isinstance(queries, np.ndarray):
+            return queries.astype(np.float32, copy=False)
+        return self.embed(queries)
+
+    def _as_added(self, utterances: list[str], embeddings: NDArray[np.float32] | None) -> NDArray[np.float32]:
+        return self.embed(utterances) if embeddings is None else np.asarray(embeddings, dtype=np.float32)
+
+    @abstractmethod
+    def count(self) -> int:
+        """number of items stored in the index"""
+
+    @abstractmethod
+    def add(
+        self,
+        utterances: list[str],
+        labels: list[int] | list[list[int]],
+        embeddings: NDArray[np.float32] | None = None,
+    ) -> None:
+        """
+        Arguments
+        ---
+        - `utterances`: texts to store
+        - `labels`: integer labels (multiclass case) or binary labels (multilabel case)
+        - `embeddings`: L2-normalized embeddings of utterances (see `embed`), computed if not given
+        """
+
+    @abstractmethod
+    def _search(self, embeddings: NDArray[np.float32], k: int) -> tuple[NDArray[np.int64], NDArray[Any]]:
+        """
+        Arguments
+        ---
+        - `embeddings`: L2-normalized float32 array of shape (n_queries, dim)
+        - `k`: number of neighbors to retrieve for each query, not greater than `count()`
+
+        Return
+        ---
+        - row ids of the closest items, array of shape (n_queries, k) (from most to least similar)
+        - cosine distances to them, array of shape (n_queries, k)
+        """
+
+    def iter_query(
+        self, queries: list[str] | NDArray[Any], k: int
+    ) -> Iterator[tuple[int, NDArray[np.int64], NDArray[Any]]]:
+        """
+        Yield
+        ---
+        - position of the chunk's first query in `queries`
+        - row ids of the closest items for the chunk's queries, array of shape (chunk_size, k)
+        - cosine distances to them, array of shape (chunk_size, k)
+        """
+        k = min(k, self.count())
+        for start in range(0, len(queries), self.query_chunk_size):
+            chunk = queries[start : start + self.query_chunk_size]
+            ids, distances = self._search(self._as_embeddings(chunk), k)
+            yield start, ids, distances
+
+    def query(self, queries: list[str] | NDArray[Any], k: int) -> tuple[NDArray[np.int64], NDArray[np.float32]]:
+        """
+        Arguments
+        ---
+        - `queries`: list of utterances or L2-normalized embeddings of shape (n_queries, dim) (see `embed`)
+        - `k`: number of neighbors to retrieve for each query
+
+        Return
+        ---
+        - row ids of the closest items, array of shape (n_queries, k) (from most to least similar)
+        - cosine distances to them, array of shape (n_queries, k)
+        """
+        k = min(k, self.count())
+        ids = np.empty((len(queries), k), dtype=np.int64)
+        distances = np.empty((len(queries), k), dtype=np.float32)
+        for start, chunk_ids, chunk_distances in self.iter_query(queries, k):
+            ids[start : start + len(chunk_ids)] = chunk_ids
+            distances[start : start + len(chunk_ids)] = chunk_distances
+        return ids, distances
+
+    def query_labels(self, queries: list[str] | NDArray[Any], k: int) -> tuple[NDArray[Any], NDArray[np.float32]]:
+        """
+        Same as `query` followed by `get_labels`, without keeping ids of all queries in memory
+
+        Return
+        ---
+        - labels of the closest items, array of shape (n_queries, k) or (n_queries, k, n_classes)
+        - cosine distances to them, array of shape (n_queries, k)
+        """
+        k = min(k, self.count())
+        template = self.get_labels(np.empty((0, k), dtype=np.int64))
+        labels = np.empty((len(queries), *template.shape[1:]), dtype=template.dtype)
+        distances = np.empty((len(queries), k), dtype=np.float32)
+        for start, chunk_ids, chunk_distances in self.iter_query(queries, k):
+            labels[start : start + len(chunk_ids)] = self.get_labels(chunk_ids)
+            distances[start : start + len(chunk_ids)] = chunk_distances
+        return labels, distances
+
+    @property
+    @abstractmethod
+    def dim(self) -> int:
+        """dimension of stored embeddings, 0 for an empty index"""
+
+    @abstractmethod
+    def get_all_embeddings(self) -> NDArray[np.float32]:
+        """array of shape (count(), dim) with L2-normalized embeddings of stored items in row id order"""
+
+    def true_neighbours(self, queries: NDArray[np.float32], k: int) -> NDArray[np.int64]:
+        """
+        Row ids of the `k` stored items closest to L2-normalized `queries` by exact search over stored embeddings, \
+        array of shape (n_queries, k). The embeddings are scanned in blocks (see `QuantizedEmbeddings.search`).
+        """
+        ids, _ = QuantizedEmbeddings(self.get_all_embeddings()).search(queries, k)
+        return ids
+
+    def get_labels(self, ids: NDArray[np.int64]) -> NDArray[Any]:
+        """
+        Return
+        ---
+        - multiclass case: integer labels of the given items, array of the same shape as `ids`
+        - multilabel case: binary labels of the given items, array of shape `(*ids.shape, n_classes)`
+        """
+        return self._labels.get(ids)
+
+    @abstractmethod
+    def get_utterances(self, ids: NDArray[np.int64]) -> list[list[str]]:
+        """texts of the given items, `ids` is an array of shape (n_queries, k)"""
+
+    def set_fingerprint(self, fingerprint: str) -> None:
+        """remember the fingerprint of the data the index is filled with (see `get_fingerprint`)"""
+        self.fingerprint = fingerprint
+
+    def get_all_labels(self) -> NDArray[Any]:
+        return self.get_labels(np.arange(self.count()))
+
+    def release(self) -> None:
+        """
+        free memory held by the index and drop the reference to the embedding function \
+        (which can be shared with other indexes and is closed by its owner)
+        """
+        self._embedding_function = None
+
+    def delete(self) -> None:
+        """remove the index from persistent storage (if any) and release it"""
+        self.release()
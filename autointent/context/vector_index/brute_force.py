@@ -0,0 +1,162 @@
+import logging
+
+import numpy as np
+from numpy.typing import NDArray
+
+from autointent.context.embedder import EmbeddingFunction
+
+from .base import BaseIndex
+from .labels import LabelStore
+from .quantization import QuantizedEmbeddings, quantization_recall
+
+
+class BruteForceIndex(BaseIndex):
+    """
+    Exhaustive in-process vector index.
+
+    L2-normalized embeddings are kept in a contiguous float32, float16 or int8 matrix (see `QuantizedEmbeddings`), \
+    top-k cosine queries are answered with blocked matrix multiplication and `np.argpartition`. \
+    Search is exact only without quantization.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        embedding_function: EmbeddingFunction,
+        multilabel: bool,
+        n_classes: int,
+        chunk_size: int = 1024,
+        quantization: str = "none",
+    ) -> None:
+        super().__init__(name, embedding_function, multilabel, n_classes)
+        self._logger = logging.getLogger(__name__)
+        self.chunk_size = chunk_size
+        self.quantization = quantization
+        self.exact = quantization == "none"
+
+        self._utterances: list[str] = []
+        self._embeddings: QuantizedEmbeddings | None = None
+
+    def count(self) -> int:
+        return len(self._utterances)
+
+    def add(
+        self,
+        utterances: list[str],
+        labels: list[int] | list[list[int]],
+        embeddings: NDArray[np.float32] | None = None,
+    ) -> None:
+        embeddings = self._as_added(utterances, embeddings)
+        if self._embeddings is not None:
+            embeddings = np.concatenate([self._embeddings.dequantize(), embeddings])
+        self._utterances.extend(utterances)
+        self._labels.add(labels)
+        self._embeddings = QuantizedEmbeddings.quantize(embeddings, self.quantization)
+
+        if self.quantization != "none":
+            recall = quantization_recall(embeddings, self._embeddings)
+            self._logger.info(
+                "%s quantization of %s index: %.1fx less memory, recall@10 against exact search %.4f",
+                self.quantization,
+                self.name,
+                embeddings.nbytes / self._embeddings.nbytes,
+                recall,
+            )
+
+    def _search(self, embeddings: NDArray[np.float32], k: int) -> tuple[NDArray[np.int64], NDArray[np.float32]]:
+        return self.search(embeddings, k)
+
+    def search(self, queries: NDArray[np.float32], k: int) -> tuple[NDArray[np.int64], NDArray[np.float32]]:
+        """
+        Arguments
+        ---
+        `queries`: L2-normalized array of shape (n_queries, dim)
+
+        Return
+        ---
+        - indices of the closest items, array of shape (n_queries, k)
+        - cosine distances to them, array of shape (n_queries, k)
+        """
+        if self._embeddings is None:
+            msg = "Cannot query an empty index"
+            raise ValueError(msg)
+        return exact_search(self._embeddings, queries, k, self.chunk_size)
+
+    @property
+    def dim(self) -> int:
+        return 0 if self._embeddings is None else self._embeddings.codes.shape[1]  # type: ignore[no-any-return]
+
+    def true_neighbours(self, queries: NDArray[np.float32], k: int) -> NDArray[np.int64]:
+        """exact search over the stored (possibly quantized) matrix itself, without dequantizing it"""
+        return self.search(queries, k)[0]
+
+    def get_all_embeddings(self) -> NDArray[np.float32]:
+        """read-only view of the stored float32 matrix or a dequantized copy of it"""
+        if self._embeddings is None:
+            return np.empty((0, 0), dtype=np.float32)
+        view = self._embeddings.dequantize().view()
+        view.flags.writeable = False
+        return view
+
+    def get_utterances(self, ids: NDArray[np.int64]) -> list[list[str]]:
+        return [[self._utterances[i] for i in row] for row in ids]
+
+    def release(self) -> None:
+        super().release()
+        self._embeddings = None
+        self._utterances = []
+        self._labels = LabelStore(self.multilabel, self.n_classes)
+
+
+def exact_search(
+    database: QuantizedEmbeddings, queries: NDArray[np.float32], k: int, chunk_size: int = 1024
+) -> tuple[NDArray[np.int64], NDArray[np.float32]]:
+    """
+    Arguments
+    ---
+    - `database`: L2-normalized stored embeddings, scanned in blocks (see `QuantizedEmbeddings.search`)
+    - `queries`: L2-normalized array of shape (n_queries, dim), searched in chunks of `chunk_size`
+
+    Return
+    ---
+    - indices of the closest items, array of shape (n_queries, k)
+    - cosine distances to them, array of shape (n_queries, k)
+    """
+    k = min(k, len(database))
+    n_queries = len(queries)
+    indices = np.empty((n_queries, k), dtype=np.int64)
+    distances = np.empty((n_queries, k), dtype=np.float32)
+
+    for start in range(0, n_queries, chunk_size):
+        end = start + chunk_size
+        top, top_similarities = database.search(queries[start:end], k)
+        indices[start:end] = top
+        distances[start:end] = 1 - top_similarities
+
+    return indices, distances
+
+
+def search_recall(
+    collection: BaseIndex,
+    queries: NDArray[np.float32],
+    ids: NDArray[np.int64],
+    max_queries: int = 1000,
+    seed: int = 0,
+) -> float:
+    """
+    Share of the true nearest neighbours found by the index, 1.0 for exact indexes.
+
+    Arguments
+    ---
+    - `collection`: index that was queried
+    - `queries`: L2-normalized embeddings of shape (n_queries, dim) the index was queried with
+    - `ids`: row ids returned by the index, array of shape (n_queries, k)
+    - `max_queries`: size of the random sample of queries the recall is estimated on
+    """
+    if collection.exact or ids.size == 0:
+        return 1.0
+    rng = np.random.default_rng(seed)
+    sample = rng.choice(len(queries), size=min(max_queries, len(queries)), replace=False)
+    exact_ids = collection.true_neighbours(np.asarray(queries[sample], dtype=np.float32), ids.shape[1])
+    hits = [len(np.intersect1d(a, b)) for a, b in zip(exact_ids, ids[sample], strict=True)]
+    return float(np.mean(hits)) / ids.shape[1]
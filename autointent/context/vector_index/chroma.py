@@ -0,0 +1,137 @@
+from pathlib import Path
+from typing import Any, ClassVar
+
+import numpy as np
+from chromadb import ClientAPI
+from numpy.typing import NDArray
+
+from autointent.context.embedder import EmbeddingFunction
+
+from .base import BaseIndex
+from .embeddings import EmbeddingStore
+from .labels import LabelStore
+
+
+class ChromaIndex(BaseIndex):
+    """
+    Vector index stored in a persistent chroma collection (HNSW with cosine space).
+
+    Items have ids `"{row_id}-{name}"`. Labels, train embeddings and the data fingerprint are saved \
+    next to the chroma database as `{name}.labels.npy`, memory-mapped `{name}.embeddings.npy` \
+    and `{name}.fingerprint`. Quantization applies only to the embeddings file, \
+    chroma keeps its own float32 copy for HNSW search.
+
+    HNSW parameters left as None take chroma defaults. Chroma applies all of them, `hnsw_search_ef` included, \
+    only when the collection is created, so none of them is a search parameter here.
+    """
+
+    supported_params: ClassVar[tuple[str, ...]] = ("hnsw_m", "hnsw_construction_ef", "hnsw_search_ef")
+
+    def __init__(
+        self,
+        name: str,
+        embedding_function: EmbeddingFunction,
+        multilabel: bool,
+        n_classes: int,
+        client: ClientAPI,
+        db_dir: str,
+        quantization: str = "none",
+        hnsw_m: int | None = None,
+        hnsw_construction_ef: int | None = None,
+        hnsw_search_ef: int | None = None,
+    ) -> None:
+        super().__init__(name, embedding_function, multilabel, n_classes)
+        self._client = client
+        hnsw_params = {"hnsw:M": hnsw_m, "hnsw:construction_ef": hnsw_construction_ef, "hnsw:search_ef": hnsw_search_ef}
+        self._collection = client.get_or_create_collection(
+            name=name,
+            # embeddings are always passed explicitly, converted to lists only here
+            embedding_function=None,
+            metadata={"multilabel": multilabel, "n_classes": n_classes, "hnsw:space": "cosine"}
+            | {key: value for key, value in hnsw_params.items() if value is not None},
+        )
+        self._utterances: list[str] | None = None
+
+        self._labels_path = Path(db_dir) / f"{name}.labels.npy"
+        if self._labels_path.exists():
+            self._labels.load(self._labels_path)
+        self._embeddings = EmbeddingStore(Path(db_dir) / f"{name}.embeddings.npy", quantization)
+        self._fingerprint_path = Path(db_dir) / f"{name}.fingerprint"
+        if self._fingerprint_path.exists():
+            self.fingerprint = self._fingerprint_path.read_text()
+
+    def count(self) -> int:
+        return self._collection.count()
+
+    def add(
+        self,
+        utterances: list[str],
+        labels: list[int] | list[list[int]],
+        embeddings: NDArray[np.float32] | None = None,
+    ) -> None:
+        start = self.count()
+        embeddings = self._as_added(utterances, embeddings)
+        self._collection.add(
+            documents=utterances,
+            embeddings=embeddings.tolist(),
+            ids=[f"{i}-{self.name}" for i in range(start, start + len(utterances))],
+        )
+        self._embeddings.add(embeddings)
+        self._labels.add(labels)
+        self._labels.save(self._labels_path)
+        self._utterances = None
+
+    def _search(self, embeddings: NDArray[np.float32], k: int) -> tuple[NDArray[np.int64], NDArray[Any]]:
+        query_res = self._collection.query(
+            query_embeddings=embeddings.tolist(),
+            n_results=k,
+            include=["distances"],
+        )
+        ids = np.array([[self._row_id(id_) for id_ in candidates] for candidates in query_res["ids"]])
+        return ids, np.array(query_res["distances"])
+
+    def _row_id(self, id_: str) -> int:
+        return int(id_.split("-", maxsplit=1)[0])
+
+    def _get_all(self, include: list[str]) -> dict[str, Any]:
+        """all stored items in row id order"""
+        dataset = self._collection.get(include=include)  # type: ignore[arg-type]
+        order = np.argsort([self._row_id(id_) for id_ in dataset["ids"]])
+        return {field: [dataset[field][i] for i in order] for field in include}
+
+    @property
+    def dim(self) -> int:
+        if len(self._embeddings) == self.count():
+            return self._embeddings.dim
+        embeddings = self._collection.get(limit=1, include=["embeddings"])["embeddings"]  # type: ignore[list-item]
+        return 0 if embeddings is None or len(embeddings) == 0 else len(embeddings[0])
+
+    def get_all_embeddings(self) -> NDArray[np.float32]:
+        """
+        read-only memory-mapped array, falls back to chroma if the collection was filled without the store \
+        (chroma keeps the normalized embeddings it was given in `add`)
+        """
+        if len(self._embeddings) == self.count():
+            return self._embeddings.get()
+        return np.array(self._get_all(["embeddings"])["embeddings"], dtype=np.float32)
+
+    def get_utterances(self, ids: NDArray[np.int64]) -> list[list[str]]:
+        if self._utterances is None:
+            self._utterances = self._get_all(["documents"])["documents"]
+        return [[self._utterances[i] for i in row] for row in ids]
+
+    def set_fingerprint(self, fingerprint: str) -> None:
+        super().set_fingerprint(fingerprint)
+        self._fingerprint_path.write_text(fingerprint)
+
+    def release(self) -> None:
+        super().release()
+        self._utterances = None
+        self._labels = LabelStore(self.multilabel, self.n_classes)
+
+    def delete(self) -> None:
+        self._client.delete_collection(self.name)
+        self._labels_path.unlink(missing_ok=True)
+        self._embeddings.delete()
+        self._fingerprint_path.unlink(missing_ok=True)
+        self.release()
@@ -0,0 +1,73 @@
+from pathlib import Path
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .quantization import QuantizedEmbeddings
+
+
+class EmbeddingStore:
+    """
+    Train embeddings persisted as a `.npy` file.
+
+    Without quantization the file holds float32 embeddings and is opened memory-mapped, so readers get \
+    a read-only float32 view of the whole matrix without copying it and without creating per-element python objects. \
+    With float16 or int8 quantization the file holds the codes (and `.scale.npy` next to it the int8 scales), \
+    readers get a dequantized float32 copy.
+    """
+
+    def __init__(self, path: Path, quantization: str = "none") -> None:
+        self.path = path
+        self.scale_path = path.with_name(f"{path.name.removesuffix('.npy')}.scale.npy")
+        self.quantization = quantization
+        self._data: QuantizedEmbeddings | None = None
+
+    def __len__(self) -> int:
+        data = self._load()
+        return 0 if data is None else len(data)
+
+    def add(self, embeddings: NDArray[np.float32]) -> None:
+        """append embeddings of shape (n_samples, dim) to the store"""
+        new = np.asarray(embeddings, dtype=np.float32)
+        old = self.get()
+        if len(old) > 0:
+            new = np.concatenate([old, new])
+        data = QuantizedEmbeddings.quantize(new, self.quantization)
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.stem}.tmp.npy")
+        np.save(tmp_path, data.codes)
+        tmp_path.replace(self.path)
+        if data.scale is not None:
+            np.save(self.scale_path, data.scale)
+        else:
+            self.scale_path.unlink(missing_ok=True)
+        self._data = None
+
+    def _load(self) -> QuantizedEmbeddings | None:
+        if self._data is None and self.path.exists():
+            scale = np.load(self.scale_path) if self.scale_path.exists() else None
+            self._data = QuantizedEmbeddings(np.load(self.path, mmap_mode="r"), scale)
+        return self._data
+
+    def get(self) -> NDArray[np.float32]:
+        """float32 array of shape (n_samples, dim), read-only memory-mapped if there is no quantization"""
+        data = self._load()
+        if data is None:
+            return np.empty((0, 0), dtype=np.float32)
+        return data.dequantize()
+
+    @property
+    def dim(self) -> int:
+        data = self._load()
+        return 0 if data is None else data.codes.shape[1]  # type: ignore[no-any-return]
+
+    @property
+    def nbytes(self) -> int:
+        data = self._load()
+        return 0 if data is None else data.nbytes
+
+    def delete(self) -> None:
+        self._data = None
+        self.path.unlink(missing_ok=True)
+        self.scale_path.unlink(missing_ok=True)
@@ -0,0 +1,149 @@
+import logging
+from typing import ClassVar
+
+import numpy as np
+from numpy.typing import NDArray
+
+from autointent.context.embedder import EmbeddingFunction
+
+from .base import BaseIndex
+from .brute_force import exact_search
+from .kmeans import assign, kmeans
+from .labels import LabelStore
+from .quantization import QuantizedEmbeddings, top_k
+
+
+class IVFIndex(BaseIndex):
+    """
+    Approximate in-process vector index with an inverted file.
+
+    L2-normalized embeddings are partitioned with spherical k-means into `n_lists` lists, \
+    embeddings of each list are kept in a contiguous block (float32, float16 or int8, see `QuantizedEmbeddings`). \
+    A query is compared only with embeddings of the `nprobe` lists with the closest centroids.
+
+    The whole index is rebuilt on every `add`.
+    """
+
+    supported_params: ClassVar[tuple[str, ...]] = ("n_lists", "nprobe")
+    search_params: ClassVar[tuple[str, ...]] = ("nprobe",)
+
+    def __init__(
+        self,
+        name: str,
+        embedding_function: EmbeddingFunction,
+        multilabel: bool,
+        n_classes: int,
+        quantization: str = "none",
+        n_lists: int | None = None,
+        nprobe: int = 8,
+        n_iter: int = 10,
+        seed: int = 0,
+    ) -> None:
+        """
+        Arguments
+        ---
+        - `n_lists`: number of k-means clusters, `sqrt(count())` by default
+        - `nprobe`: number of the closest lists searched for each query
+        - `n_iter`: number of k-means iterations
+        """
+        super().__init__(name, embedding_function, multilabel, n_classes)
+        self._logger = logging.getLogger(__name__)
+        self.quantization = quantization
+        self.n_lists = n_lists
+        self.nprobe = nprobe
+        self.n_iter = n_iter
+        self.seed = seed
+
+        self._utterances: list[str] = []
+        self._centroids: NDArray[np.float32] | None = None
+        self._blocks: QuantizedEmbeddings | None = None
+        self._offsets: NDArray[np.int64] = np.zeros(1, dtype=np.int64)
+        self._row_ids: NDArray[np.int64] = np.empty(0, dtype=np.int64)
+
+    def count(self) -> int:
+        return len(self._utterances)
+
+    def add(
+        self,
+        utterances: list[str],
+        labels: list[int] | list[list[int]],
+        embeddings: NDArray[np.float32] | None = None,
+    ) -> None:
+        embeddings = self._as_added(utterances, embeddings)
+        if self._blocks is not None:
+            embeddings = np.concatenate([self.get_all_embeddings(), embeddings])
+        self._utterances.extend(utterances)
+        self._labels.add(labels)
+        self._build(embeddings)
+
+    def _build(self, embeddings: NDArray[np.float32]) -> None:
+        n_lists = self.n_lists if self.n_lists is not None else int(np.sqrt(len(embeddings)))
+        n_lists = max(1, min(n_lists, len(embeddings)))
+        self._centroids = kmeans(embeddings, n_lists, self.n_iter, self.seed)
+
+        assignment = assign(embeddings, self._centroids)
+        self._row_ids = np.argsort(assignment, kind="stable")
+        self._offsets = np.zeros(n_lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assignment, minlength=n_lists), out=self._offsets[1:])
+        self._blocks = QuantizedEmbeddings.quantize(embeddings[self._row_ids], self.quantization)
+        self._logger.debug("built %s lists over %s embeddings for %s", n_lists, len(embeddings), self.name)
+
+    def _search(self, queries: NDArray[np.float32], k: int) -> tuple[NDArray[np.int64], NDArray[np.float32]]:
+        if self._blocks is None or self._centroids is None:
+            msg = "Cannot query an empty index"
+            raise ValueError(msg)
+        nprobe = min(self.nprobe, len(self._centroids))
+        probed, _ = top_k(queries @ self._centroids.T, nprobe)
+
+        best_ids = np.full((len(queries), k), -1, dtype=np.int64)
+        best_similarities = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        for list_id in np.unique(probed):
+            query_ids = np.flatnonzero((probed == list_id).any(axis=1))
+            start, end = self._offsets[list_id], self._offsets[list_id + 1]
+            if start == end:
+                continue
+            block = QuantizedEmbeddings(self._blocks.codes[start:end], self._blocks.scale)
+            candidates = np.concatenate([best_similarities[query_ids], block.dot(queries[query_ids])], axis=1)
+            candidate_ids = np.concatenate(
+                [best_ids[query_ids], np.broadcast_to(self._row_ids[start:end], (len(query_ids), end - start))], axis=1
+            )
+            top, best_similarities[query_ids] = top_k(candidates, k)
+            best_ids[query_ids] = np.take_along_axis(candidate_ids, top, axis=1)
+
+        # probed lists can hold fewer than k items in total
+        incomplete = np.flatnonzero(best_ids[:, -1] == -1)
+        if len(incomplete) > 0:
+            ids, distances = exact_search(self._blocks, queries[incomplete], k)
+            best_ids[incomplete] = self._row_ids[ids]
+            best_similarities[incomplete] = 1 - distances
+
+        return best_ids, 1 - best_similarities
+
+    @property
+    def dim(self) -> int:
+        return 0 if self._blocks is None else self._blocks.codes.shape[1]  # type: ignore[no-any-return]
+
+    def true_neighbours(self, queries: NDArray[np.float32], k: int) -> NDArray[np.int64]:
+        """exact search over all lists, without putting embeddings back in row id order"""
+        if self._blocks is None:
+            return np.empty((len(queries), 0), dtype=np.int64)
+        ids, _ = self._blocks.search(queries, k)
+        return self._row_ids[ids]
+
+    def get_all_embeddings(self) -> NDArray[np.float32]:
+        """L2-normalized embeddings (dequantized if needed) in row id order"""
+        if self._blocks is None:
+            return np.empty((0, 0), dtype=np.float32)
+        res = np.empty((len(self._row_ids), self._blocks.codes.shape[1]), dtype=np.float32)
+        res[self._row_ids] = self._blocks.dequantize()
+        return res
+
+    def get_utterances(self, ids: NDArray[np.int64]) -> list[list[str]]:
+        return [[self._utterances[i] for i in row] for row in ids]
+
+    def release(self) -> None:
+        super().release()
+        self._utterances = []
+        self._centroids = None
+        self._blocks = None
+        self._labels = LabelStore(self.multilabel, self.n_classes)
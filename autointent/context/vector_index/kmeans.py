@@ -0,0 +1,58 @@
+import numpy as np
+import scipy.sparse as sp
+from numpy.typing import NDArray
+
+KMEANS_SAMPLES_PER_CLUSTER = 256
+
+
+def normalize(embeddings: NDArray[np.float32]) -> NDArray[np.float32]:
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return embeddings / np.maximum(norms, np.finfo(np.float32).tiny)  # type: ignore[no-any-return]
+
+
+def assign(
+    embeddings: NDArray[np.float32], centroids: NDArray[np.float32], spherical: bool = True, chunk_size: int = 4096
+) -> NDArray[np.int64]:
+    """
+    Index of the closest centroid for each embedding: by cosine for L2-normalized `spherical` inputs, \
+    by euclidean distance otherwise.
+    """
+    # argmin |x - c|^2 == argmax (x . c - |c|^2 / 2)
+    bias = np.zeros(len(centroids), dtype=np.float32) if spherical else -0.5 * np.sum(centroids**2, axis=1)
+    res = np.empty(len(embeddings), dtype=np.int64)
+    for start in range(0, len(embeddings), chunk_size):
+        res[start : start + chunk_size] = np.argmax(embeddings[start : start + chunk_size] @ centroids.T + bias, axis=1)
+    return res
+
+
+def kmeans(
+    embeddings: NDArray[np.float32], n_clusters: int, n_iter: int, seed: int, spherical: bool = True
+) -> NDArray[np.float32]:
+    """
+    Lloyd's k-means on a random sample of at most `256 * n_clusters` embeddings. \
+    Spherical k-means expects L2-normalized embeddings and keeps centroids L2-normalized.
+
+    Return
+    ---
+    centroids, float32 array of shape (n_clusters, dim)
+    """
+    rng = np.random.default_rng(seed)
+    if len(embeddings) > KMEANS_SAMPLES_PER_CLUSTER * n_clusters:
+        embeddings = embeddings[rng.choice(len(embeddings), KMEANS_SAMPLES_PER_CLUSTER * n_clusters, replace=False)]
+    centroids = np.array(embeddings[rng.choice(len(embeddings), n_clusters, replace=False)], dtype=np.float32)
+
+    for _ in range(n_iter):
+        assignment = assign(embeddings, centroids, spherical)
+        membership = sp.csr_matrix(
+            (np.ones(len(embeddings), dtype=np.float32), (assignment, np.arange(len(embeddings)))),
+            shape=(n_clusters, len(embeddings)),
+        )
+        sums = np.asarray(membership @ embeddings, dtype=np.float32)
+        counts = np.bincount(assignment, minlength=n_clusters)
+        # empty clusters keep their centroids
+        non_empty = counts > 0
+        if spherical:
+            centroids[non_empty] = normalize(sums[non_empty])
+        else:
+            centroids[non_empty] = sums[non_empty] / counts[non_empty, None]
+    return centroids
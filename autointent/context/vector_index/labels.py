@@ -0,0 +1,55 @@
+from pathlib import Path
+
+import numpy as np
+from numpy.typing import NDArray
+
+
+class LabelStore:
+    """
+    Columnar storage of train labels indexed by row id.
+
+    Multiclass labels are kept as an integer vector, multilabel ones as a bit-packed matrix \
+    of shape (n_samples, ceil(n_classes / 8)). Gathering labels of query results is a single fancy-index.
+    """
+
+    def __init__(self, multilabel: bool, n_classes: int) -> None:
+        self.multilabel = multilabel
+        self.n_classes = n_classes
+        n_bytes = (n_classes + 7) // 8
+        self._data: NDArray[np.int64] | NDArray[np.uint8] = (
+            np.empty((0, n_bytes), dtype=np.uint8) if multilabel else np.empty(0, dtype=np.int64)
+        )
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def add(self, labels: list[int] | list[list[int]] | NDArray[np.int64]) -> None:
+        """
+        Arguments
+        ---
+        `labels`: integer labels (multiclass case) or binary labels of shape (n_samples, n_classes) (multilabel case)
+        """
+        new = np.asarray(labels)
+        if self.multilabel:
+            new = np.packbits(new.astype(bool).reshape(-1, self.n_classes), axis=1)
+        else:
+            new = new.astype(np.int64)
+        self._data = np.concatenate([self._data, new])
+
+    def get(self, ids: NDArray[np.int64]) -> NDArray[np.int64] | NDArray[np.uint8]:
+        """
+        Return
+        ---
+        - multiclass case: integer labels, array of the same shape as `ids`
+        - multilabel case: binary labels, uint8 array of shape `(*ids.shape, n_classes)`
+        """
+        gathered = self._data[ids]
+        if self.multilabel:
+            return np.unpackbits(gathered, axis=-1, count=self.n_classes)
+        return gathered
+
+    def save(self, path: Path) -> None:
+        np.save(path, self._data)
+
+    def load(self, path: Path) -> None:
+        self._data = np.load(path)
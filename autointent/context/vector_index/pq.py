@@ -0,0 +1,186 @@
+import logging
+from pathlib import Path
+from typing import ClassVar
+
+import numpy as np
+from numpy.typing import NDArray
+
+from autointent.context.embedder import EmbeddingFunction
+
+from .base import BaseIndex
+from .embeddings import EmbeddingStore
+from .kmeans import assign, kmeans
+from .labels import LabelStore
+from .quantization import top_k
+
+
+class ProductQuantizer:
+    """
+    Product quantization of embeddings.
+
+    Dimensions are split into `n_subvectors` contiguous groups, each group gets its own codebook \
+    of `n_centroids` (at most 256) k-means centroids, an embedding is encoded as `n_subvectors` one-byte centroid ids.
+    """
+
+    def __init__(self, n_subvectors: int, n_centroids: int = 256, n_iter: int = 10, seed: int = 0) -> None:
+        self.n_subvectors = n_subvectors
+        self.n_centroids = n_centroids
+        self.n_iter = n_iter
+        self.seed = seed
+        self.codebooks: list[NDArray[np.float32]] = []
+        self._bounds: NDArray[np.int64] = np.zeros(1, dtype=np.int64)
+
+    def fit(self, embeddings: NDArray[np.float32]) -> "ProductQuantizer":
+        """train codebooks on embeddings of shape (n_samples, dim)"""
+        n_subvectors = min(self.n_subvectors, embeddings.shape[1])
+        n_centroids = min(self.n_centroids, len(embeddings))
+        self._bounds = np.linspace(0, embeddings.shape[1], n_subvectors + 1).astype(np.int64)
+        self.codebooks = [
+            kmeans(np.ascontiguousarray(embeddings[:, start:end]), n_centroids, self.n_iter, self.seed, spherical=False)
+            for start, end in self._subspaces()
+        ]
+        return self
+
+    def _subspaces(self) -> list[tuple[int, int]]:
+        return list(zip(self._bounds[:-1].tolist(), self._bounds[1:].tolist(), strict=True))
+
+    def encode(self, embeddings: NDArray[np.float32]) -> NDArray[np.uint8]:
+        """uint8 array of shape (n_samples, n_subvectors)"""
+        codes = np.empty((len(embeddings), len(self.codebooks)), dtype=np.uint8)
+        for j, ((start, end), codebook) in enumerate(zip(self._subspaces(), self.codebooks, strict=True)):
+            codes[:, j] = assign(np.ascontiguousarray(embeddings[:, start:end]), codebook, spherical=False)
+        return codes
+
+    def decode(self, codes: NDArray[np.uint8]) -> NDArray[np.float32]:
+        """float32 array of shape (n_samples, dim) with the reconstructed embeddings"""
+        return np.concatenate([codebook[codes[:, j]] for j, codebook in enumerate(self.codebooks)], axis=1)
+
+    def dot(self, queries: NDArray[np.float32], codes: NDArray[np.uint8]) -> NDArray[np.float32]:
+        """
+        Asymmetric distance computation: dot products of raw queries with encoded embeddings, \
+        summed from per-subvector lookup tables of query-centroid dot products.
+
+        Return
+        ---
+        float32 array of shape (n_queries, n_samples)
+        """
+        res = np.zeros((len(queries), len(codes)), dtype=np.float32)
+        for j, ((start, end), codebook) in enumerate(zip(self._subspaces(), self.codebooks, strict=True)):
+            table = queries[:, start:end] @ codebook.T
+            res += table[:, codes[:, j]]
+        return res
+
+    @property
+    def nbytes(self) -> int:
+        return sum(codebook.nbytes for codebook in self.codebooks)
+
+
+class PQIndex(BaseIndex):
+    """
+    Compressed in-process vector index with product quantization.
+
+    Only one-byte PQ codes of L2-normalized embeddings (`n_subvectors` bytes per item) and the codebooks are held \
+    in memory, top-k candidates are found with asymmetric distance computation. With `rerank` > 0 the top `rerank` \
+    candidates are re-scored exactly against float32 embeddings kept in a memory-mapped `.npy` file in `db_dir`, \
+    so only the touched rows are read from disk.
+
+    Embeddings quantization of `VectorIndexConfig` does not apply to this backend.
+    """
+
+    supported_params: ClassVar[tuple[str, ...]] = ("pq_subvectors", "pq_centroids", "rerank")
+    search_params: ClassVar[tuple[str, ...]] = ("rerank",)
+
+    def __init__(
+        self,
+        name: str,
+        embedding_function: EmbeddingFunction,
+        multilabel: bool,
+        n_classes: int,
+        db_dir: str,
+        pq_subvectors: int = 8,
+        pq_centroids: int = 256,
+        rerank: int = 0,
+        seed: int = 0,
+    ) -> None:
+        """
+        Arguments
+        ---
+        - `db_dir`: directory for the float32 embeddings used for re-ranking
+        - `pq_subvectors`: number of sub-vectors (bytes per encoded embedding)
+        - `pq_centroids`: size of each sub-vector codebook, at most 256
+        - `rerank`: number of candidates re-scored exactly (at least `k` of a query), 0 disables re-ranking
+        """
+        super().__init__(name, embedding_function, multilabel, n_classes)
+        self._logger = logging.getLogger(__name__)
+        if not 1 <= pq_centroids <= np.iinfo(np.uint8).max + 1:
+            msg = f"pq_centroids must be in [1, 256], got {pq_centroids}"
+            self._logger.error(msg)
+            raise ValueError(msg)
+        self.rerank = rerank
+        self._quantizer = ProductQuantizer(pq_subvectors, pq_centroids, seed=seed)
+
+        self._utterances: list[str] = []
+        self._codes: NDArray[np.uint8] | None = None
+        self._embeddings = EmbeddingStore(Path(db_dir) / f"{name}.pq.embeddings.npy")
+        # the index lives in memory, embeddings left on disk by a previous process are stale
+        self._embeddings.delete()
+
+    def count(self) -> int:
+        return len(self._utterances)
+
+    def add(
+        self,
+        utterances: list[str],
+        labels: list[int] | list[list[int]],
+        embeddings: NDArray[np.float32] | None = None,
+    ) -> None:
+        self._embeddings.add(self._as_added(utterances, embeddings))
+        self._utterances.extend(utterances)
+        self._labels.add(labels)
+
+        # codebooks are retrained on all embeddings, the float store is read through the memory map
+        embeddings = self._embeddings.get()
+        self._codes = self._quantizer.fit(embeddings).encode(embeddings)
+        self._logger.info(
+            "product quantization of %s index: %.1fx less memory",
+            self.name,
+            embeddings.nbytes / (self._codes.nbytes + self._quantizer.nbytes),
+        )
+
+    def _search(self, queries: NDArray[np.float32], k: int) -> tuple[NDArray[np.int64], NDArray[np.float32]]:
+        if self._codes is None:
+            msg = "Cannot query an empty index"
+            raise ValueError(msg)
+        similarities = self._quantizer.dot(queries, self._codes)
+        if self.rerank == 0:
+            ids, top_similarities = top_k(similarities, k)
+            return ids, 1 - top_similarities
+
+        # the returned distances are always exact, even if fewer than k candidates are asked to be re-ranked
+        candidates, _ = top_k(similarities, min(max(self.rerank, k), self.count()))
+        # sorted row ids make reads from the memory map more sequential
+        candidates.sort(axis=1)
+        exact = np.einsum("qd,qcd->qc", queries, self._embeddings.get()[candidates], dtype=np.float32)
+        top, top_similarities = top_k(exact, k)
+        return np.take_along_axis(candidates, top, axis=1), 1 - top_similarities
+
+    @property
+    def dim(self) -> int:
+        return self._embeddings.dim
+
+    def get_all_embeddings(self) -> NDArray[np.float32]:
+        """read-only memory-mapped float32 embeddings (L2-normalized, not quantized)"""
+        return self._embeddings.get()
+
+    def get_utterances(self, ids: NDArray[np.int64]) -> list[list[str]]:
+        return [[self._utterances[i] for i in row] for row in ids]
+
+    def release(self) -> None:
+        super().release()
+        self._utterances = []
+        self._codes = None
+        self._labels = LabelStore(self.multilabel, self.n_classes)
+
+    def delete(self) -> None:
+        super().delete()
+        self._embeddings.delete()
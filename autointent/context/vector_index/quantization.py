@@ -0,0 +1,142 @@
+import numpy as np
+from numpy.typing import NDArray
+
+QUANTIZATION_TYPES = ["none", "float16", "int8"]
+
+INT8_MAX = 127
+
+# size of the (n_queries, block) similarity matrix computed at once by `QuantizedEmbeddings.search`
+SEARCH_BLOCK_BYTES = 64 * 1024 * 1024
+
+
+def top_k(similarities: NDArray[np.float32], k: int) -> tuple[NDArray[np.int64], NDArray[np.float32]]:
+    """
+    Return
+    ---
+    - column indices of the `k` largest similarities in each row (from largest to smallest)
+    - these similarities
+    """
+    top = np.argpartition(-similarities, kth=k - 1, axis=1)[:, :k]
+    top_similarities = np.take_along_axis(similarities, top, axis=1)
+    order = np.argsort(-top_similarities, axis=1, kind="stable")
+    return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_similarities, order, axis=1)
+
+
+class QuantizedEmbeddings:
+    """
+    Embedding matrix stored as float32, float16 or int8 codes.
+
+    int8 codes use symmetric scalar quantization with per-dimension scale: `x[:, d] ~ codes[:, d] * scale[d]`. \
+    Dot products with queries are computed on the quantized form block by block, \
+    so a float32 copy of the whole matrix is never materialized.
+    """
+
+    def __init__(
+        self, codes: NDArray[np.generic], scale: NDArray[np.float32] | None = None, block_size: int = 65536
+    ) -> None:
+        self.codes = codes
+        self.scale = scale
+        self.block_size = block_size
+
+    @classmethod
+    def quantize(cls, embeddings: NDArray[np.float32], quantization: str) -> "QuantizedEmbeddings":
+        """
+        Arguments
+        ---
+        - `embeddings`: float array of shape (n_samples, dim)
+        - `quantization`: one of "none", "float16", "int8"
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if quantization == "float16":
+            return cls(embeddings.astype(np.float16))
+        if quantization == "int8":
+            scale = np.abs(embeddings).max(axis=0, initial=0) / INT8_MAX
+            scale = np.maximum(scale, np.finfo(np.float32).tiny)
+            codes = np.clip(np.rint(embeddings / scale), -INT8_MAX, INT8_MAX).astype(np.int8)
+            return cls(codes, scale.astype(np.float32))
+        return cls(np.ascontiguousarray(embeddings))
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + (self.scale.nbytes if self.scale is not None else 0)
+
+    def dequantize(self) -> NDArray[np.float32]:
+        """float32 array of shape (n_samples, dim), the stored array itself if there is no quantization"""
+        if self.codes.dtype == np.float32:
+            return self.codes  # type: ignore[return-value]
+        res = self.codes.astype(np.float32)
+        if self.scale is not None:
+            res *= self.scale
+        return res
+
+    def dot(self, queries: NDArray[np.float32]) -> NDArray[np.float32]:
+        """
+        Arguments
+        ---
+        `queries`: float32 array of shape (n_queries, dim)
+
+        Return
+        ---
+        float32 array of shape (n_queries, n_samples) with dot products of queries and stored embeddings
+        """
+        if self.codes.dtype == np.float32:
+            return queries @ self.codes.T  # type: ignore[no-any-return]
+        if self.scale is not None:
+            # (q * s) . c == q . (c * s)
+            queries = queries * self.scale
+        res = np.empty((len(queries), len(self.codes)), dtype=np.float32)
+        for start in range(0, len(self.codes), self.block_size):
+            block = self.codes[start : start + self.block_size].astype(np.float32)
+            res[:, start : start + len(block)] = queries @ block.T
+        return res
+
+    def search(self, queries: NDArray[np.float32], k: int) -> tuple[NDArray[np.int64], NDArray[np.float32]]:
+        """
+        Top-k stored embeddings by dot product. The matrix is scanned in blocks of rows that keep similarities \
+        within `SEARCH_BLOCK_BYTES`, only the running top-k of each query is kept between blocks.
+
+        Arguments
+        ---
+        `queries`: float32 array of shape (n_queries, dim)
+
+        Return
+        ---
+        - indices of the top-k embeddings, array of shape (n_queries, k) (from largest to smallest dot product)
+        - dot products with them, array of shape (n_queries, k)
+        """
+        k = min(k, len(self.codes))
+        block_size = max(k, SEARCH_BLOCK_BYTES // (4 * max(len(queries), 1)))
+        best_ids = np.empty((len(queries), 0), dtype=np.int64)
+        best_similarities = np.empty((len(queries), 0), dtype=np.float32)
+        for start in range(0, len(self.codes), block_size):
+            block = QuantizedEmbeddings(self.codes[start : start + block_size], self.scale, self.block_size)
+            similarities = np.concatenate([best_similarities, block.dot(queries)], axis=1)
+            block_ids = np.broadcast_to(np.arange(start, start + len(block)), (len(queries), len(block)))
+            ids = np.concatenate([best_ids, block_ids], axis=1)
+            top, best_similarities = top_k(similarities, k)
+            best_ids = np.take_along_axis(ids, top, axis=1)
+        return best_ids, best_similarities
+
+
+def quantization_recall(
+    exact: NDArray[np.float32], quantized: QuantizedEmbeddings, k: int = 10, n_queries: int = 200, seed: int = 0
+) -> float:
+    """
+    Estimate how much quantization hurts retrieval: stored embeddings sampled as queries are searched \
+    in both the exact and the quantized matrix, the result is the average share of exact top-k found in quantized top-k.
+
+    Arguments
+    ---
+    - `exact`: L2-normalized float32 array of shape (n_samples, dim)
+    - `quantized`: the same embeddings after quantization
+    """
+    k = min(k, len(exact))
+    rng = np.random.default_rng(seed)
+    queries = exact[rng.choice(len(exact), size=min(n_queries, len(exact)), replace=False)]
+    exact_top, _ = QuantizedEmbeddings(exact).search(queries, k)
+    quantized_top, _ = quantized.search(queries, k)
+    hits = [len(np.intersect1d(a, b)) for a, b in zip(exact_top, quantized_top, strict=True)]
+    return float(np.mean(hits)) / k
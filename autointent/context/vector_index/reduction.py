@@ -0,0 +1,81 @@
+import logging
+
+import numpy as np
+from numpy.typing import NDArray
+
+from autointent.context.embedder import EmbeddingFunction
+
+from .kmeans import normalize
+
+DIM_REDUCTION_TYPES = ["none", "pca", "matryoshka"]
+
+logger = logging.getLogger(__name__)
+
+
+def get_reduced_name(name: str, dim_reduction: str, n_components: int) -> str:
+    """name of the index over embeddings reduced with the given method"""
+    return f"{name}_{dim_reduction}{n_components}"
+
+
+class DimReduction:
+    """
+    Projection of embeddings to `n_components` dimensions.
+
+    - `pca`: principal components of train embeddings (fitted with SVD)
+    - `matryoshka`: first `n_components` dimensions, for models trained with matryoshka representation learning
+    """
+
+    def __init__(self, dim_reduction: str, n_components: int) -> None:
+        if dim_reduction not in DIM_REDUCTION_TYPES[1:]:
+            msg = f"unexpected dimensionality reduction: {dim_reduction}, choose one of {DIM_REDUCTION_TYPES[1:]}"
+            logger.error(msg)
+            raise ValueError(msg)
+        self.dim_reduction = dim_reduction
+        self.n_components = n_components
+        self._mean: NDArray[np.float32] | None = None
+        self._components: NDArray[np.float32] | None = None
+
+    def fit(self, embeddings: NDArray[np.float32]) -> "DimReduction":
+        """
+        Arguments
+        ---
+        `embeddings`: train embeddings of shape (n_samples, dim)
+        """
+        max_components = min(embeddings.shape) if self.dim_reduction == "pca" else embeddings.shape[1]
+        if self.n_components > max_components:
+            msg = f"cannot reduce {embeddings.shape} embeddings to {self.n_components} dims with {self.dim_reduction}"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        if self.dim_reduction == "pca":
+            mean = embeddings.mean(axis=0, dtype=np.float64)
+            _, _, vt = np.linalg.svd(embeddings - mean, full_matrices=False)
+            self._mean = mean.astype(np.float32)
+            self._components = np.ascontiguousarray(vt[: self.n_components].T, dtype=np.float32)
+        return self
+
+    def transform(self, embeddings: NDArray[np.float32]) -> NDArray[np.float32]:
+        """float32 array of shape (n_samples, n_components)"""
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if self.dim_reduction == "matryoshka":
+            return np.ascontiguousarray(embeddings[:, : self.n_components])
+        if self._components is None:
+            msg = "PCA is not fitted"
+            logger.error(msg)
+            raise RuntimeError(msg)
+        return (embeddings - self._mean) @ self._components  # type: ignore[no-any-return]
+
+
+class ReducedEmbeddingFunction:
+    """
+    Embedding function that applies a fitted `DimReduction` to the L2-normalized outputs of another one, \
+    the reduction is fitted on stored embeddings of an index, which are normalized too (see `BaseIndex`).
+    """
+
+    def __init__(self, embedding_function: EmbeddingFunction, reduction: DimReduction) -> None:
+        self._embedding_function = embedding_function
+        self._reduction = reduction
+
+    def __call__(self, texts: list[str]) -> NDArray[np.float32]:
+        embeddings = normalize(np.asarray(self._embedding_function(texts), dtype=np.float32))
+        return self._reduction.transform(embeddings)
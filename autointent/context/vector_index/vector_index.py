@@ -0,0 +1,328 @@
+import hashlib
+import json
+import logging
+import time
+from typing import Any
+
+import numpy as np
+from chromadb import PersistentClient
+from chromadb.config import Settings
+from numpy.typing import NDArray
+
+from autointent.configs.vector_index import VectorIndexConfig
+from autointent.context.data_handler import DataHandler
+from autointent.context.embedder import EmbeddingFunction
+from autointent.context.embedding_cache import CachedEmbeddingFunction
+from autointent.context.hashed_embedding import HASHED_CHAR_NGRAMS_MODEL, HashedCharNgramEmbeddingFunction
+from autointent.context.model_pool import model_pool
+
+from .base import BaseIndex
+from .brute_force import BruteForceIndex
+from .chroma import ChromaIndex
+from .ivf import IVFIndex
+from .kmeans import normalize
+from .pq import PQIndex
+from .quantization import QUANTIZATION_TYPES
+from .reduction import DimReduction, ReducedEmbeddingFunction, get_reduced_name
+
+VECTOR_INDEX_BACKENDS = ["chroma", "brute_force", "ivf", "pq"]
+
+# chroma rejects longer collection names
+MAX_NAME_LENGTH = 63
+
+
+def get_db_name(name: str) -> str:
+    """
+    name of the index for the embedder or derived index name, names longer than `MAX_NAME_LENGTH` are truncated \
+    and suffixed with a digest of the whole name
+    """
+    name = name.replace("/", "_")
+    if len(name) <= MAX_NAME_LENGTH:
+        return name
+    digest = hashlib.sha1(name.encode(), usedforsecurity=False).hexdigest()[:8]
+    return f"{name[: MAX_NAME_LENGTH - len(digest) - 1]}_{digest}"
+
+
+def get_params_name(name: str, index_params: dict[str, Any]) -> str:
+    """name of the index built with non-default build parameters"""
+    digest = hashlib.sha1(json.dumps(index_params, sort_keys=True).encode(), usedforsecurity=False).hexdigest()
+    return f"{name}_{digest[:8]}"
+
+
+def get_derived_name(name: str, dim_reduction: str, n_components: int | None, index_params: dict[str, Any]) -> str:
+    """name of the index derived from the plain index `name` with reduction and build parameters"""
+    if dim_reduction != "none":
+        name = get_reduced_name(name, dim_reduction, n_components)  # type: ignore[arg-type]
+    if index_params:
+        name = get_params_name(name, index_params)
+    return get_db_name(name)
+
+
+def get_fingerprint(model_name: str, utterances: list[str], labels: list[int] | list[list[int]]) -> str:
+    """sha256 of the embedder name, train utterances and their labels"""
+    hasher = hashlib.sha256()
+    hasher.update(json.dumps([model_name, utterances], ensure_ascii=False).encode())
+    labels_array = np.asarray(labels, dtype=np.int64)
+    hasher.update(str(labels_array.shape).encode())
+    hasher.update(labels_array.tobytes())
+    return hasher.hexdigest()
+
+
+class VectorIndex:
+    def __init__(
+        self, db_dir: str, device: str, multilabel: bool, n_classes: int, config: VectorIndexConfig | None = None
+    ) -> None:
+        self._logger = logging.getLogger(__name__)
+
+        self.db_dir = db_dir
+        self.config = config if config is not None else VectorIndexConfig()
+        self.device = device
+        self.multilabel = multilabel
+        self.n_classes = n_classes
+
+        if self.config.backend not in VECTOR_INDEX_BACKENDS:
+            msg = f"unexpected vector index backend: {self.config.backend}, choose one of {VECTOR_INDEX_BACKENDS}"
+            self._logger.error(msg)
+            raise ValueError(msg)
+        if self.config.quantization not in QUANTIZATION_TYPES:
+            msg = f"unexpected embeddings quantization: {self.config.quantization}, choose one of {QUANTIZATION_TYPES}"
+            self._logger.error(msg)
+            raise ValueError(msg)
+        self._collections: dict[str, BaseIndex] = {}
+        self._derived_collections: dict[str, BaseIndex] = {}
+        self._embedding_functions: dict[str, EmbeddingFunction] = {}
+
+        self._logger.debug("connecting to Chroma DB client...")
+        settings = Settings(
+            chroma_segment_cache_policy="LRU",
+            chroma_memory_limit_bytes=2 * 1024 * 1024 * 1024,  # 2 GB
+        )
+        self.client = PersistentClient(path=db_dir, settings=settings)
+
+        model_pool.set_memory_limit(self.config.model_pool_memory_limit)
+
+    def get_collection(
+        self,
+        model_name: str,
+        device: str | None = None,
+        dim_reduction: str = "none",
+        n_components: int | None = None,
+        index_params: dict[str, Any] | None = None,
+    ) -> BaseIndex:
+        """
+        Arguments
+        ---
+        - `model_name`: embedder of the index, a sentence transformer or the built-in `HASHED_CHAR_NGRAMS_MODEL`
+        - `device`: device for the embedder, `self.device` by default
+        - `dim_reduction`: "none", "pca" or "matryoshka", reduction of embeddings
+        - `n_components`: target dimension of the reduced embeddings
+        - `index_params`: backend-specific build and search parameters (see `supported_params` of backends), \
+            unsupported ones are ignored with a warning
+
+        Indexes with reduction or non-default build parameters are derived from the already filled plain index \
+        of the same embedder and are filled right away with its stored embeddings. Only the last requested \
+        derived index is kept, the others are released (and rebuilt if they are requested again). \
+        Search parameters (see `search_params` of backends) are set on the returned index, \
+        the ones not given are reset to defaults.
+        """
+        index_params = self._filter_params(index_params)
+        search_names = self._backend_class().search_params
+        build_params = {name: value for name, value in index_params.items() if name not in search_names}
+        if dim_reduction != "none" or build_params:
+            collection = self._get_derived_collection(model_name, device, dim_reduction, n_components, build_params)
+        else:
+            collection = self._get_base_collection(model_name, device)
+        collection.set_search_params(**{name: value for name, value in index_params.items() if name in search_names})
+        return collection
+
+    def _get_base_collection(self, model_name: str, device: str | None) -> BaseIndex:
+        db_name = get_db_name(model_name)
+        if db_name in self._collections:
+            return self._collections[db_name]
+
+        device = device if device is not None else self.device
+        self._logger.info("creating %s index for %s on %s...", self.config.backend, model_name, device)
+        emb_func = self._make_embedding_function(model_name, device)
+        self._embedding_functions[db_name] = emb_func
+        collection = self._make_collection(db_name, emb_func, {})
+        self._collections[db_name] = collection
+        return collection
+
+    def _make_embedding_function(self, model_name: str, device: str) -> EmbeddingFunction:
+        if model_name == HASHED_CHAR_NGRAMS_MODEL:
+            return HashedCharNgramEmbeddingFunction()
+        return CachedEmbeddingFunction(
+            model_name=model_name,
+            device=device,
+            cache_dir=self.config.embeddings_cache_dir or None,
+            batch_size=self.config.embedding_batch_size,
+            max_seq_length=self.config.max_seq_length,
+            n_workers=self.config.embedding_workers,
+            n_threads=self.config.embedding_worker_threads,
+            trust_remote_code=True,
+            tokenizer_kwargs={"truncation": True},
+        )
+
+    def _backend_class(self) -> type[BaseIndex]:
+        backends: dict[str, type[BaseIndex]] = {
+            "chroma": ChromaIndex,
+            "brute_force": BruteForceIndex,
+            "ivf": IVFIndex,
+            "pq": PQIndex,
+        }
+        return backends[self.config.backend]
+
+    def _filter_params(self, index_params: dict[str, Any] | None) -> dict[str, Any]:
+        supported = self._backend_class().supported_params
+        res = {}
+        for name, value in (index_params or {}).items():
+            if value is None:
+                continue
+            if name not in supported:
+                self._logger.warning("%s backend does not support %s, ignoring it", self.config.backend, name)
+                continue
+            res[name] = value
+        return res
+
+    def _make_collection(self, db_name: str, emb_func: EmbeddingFunction, index_params: dict[str, Any]) -> BaseIndex:
+        collection = self._make_backend(db_name, emb_func, index_params)
+        collection.query_chunk_size = self.config.query_chunk_size
+        return collection
+
+    def _make_backend(self, db_name: str, emb_func: EmbeddingFunction, index_params: dict[str, Any]) -> BaseIndex:
+        if self.config.backend == "brute_force":
+            return BruteForceIndex(
+                db_name, emb_func, self.multilabel, self.n_classes, quantization=self.config.quantization
+            )
+        if self.config.backend == "ivf":
+            return IVFIndex(
+                db_name,
+                emb_func,
+                self.multilabel,
+                self.n_classes,
+                quantization=self.config.quantization,
+                **index_params,
+            )
+        if self.config.backend == "pq":
+            return PQIndex(db_name, emb_func, self.multilabel, self.n_classes, self.db_dir, **index_params)
+        return ChromaIndex(
+            db_name,
+            emb_func,
+            self.multilabel,
+            self.n_classes,
+            self.client,
+            self.db_dir,
+            self.config.quantization,
+            **index_params,
+        )
+
+    def _get_derived_collection(
+        self,
+        model_name: str,
+        device: str | None,
+        dim_reduction: str,
+        n_components: int | None,
+        index_params: dict[str, Any],
+    ) -> BaseIndex:
+        if dim_reduction != "none" and n_components is None:
+            msg = f"n_components must be set for {dim_reduction} dimensionality reduction"
+            self._logger.error(msg)
+            raise ValueError(msg)
+
+        base = self._get_base_collection(model_name, device)
+        db_name = get_derived_name(base.name, dim_reduction, n_components, index_params)
+        cached = self._derived_collections.get(db_name)
+        if cached is not None and cached.fingerprint == base.fingerprint:
+            return cached
+        self._release_derived_collections()
+
+        if base.count() == 0 or base.fingerprint is None:
+            msg = f"index for {model_name} must be filled before deriving other indexes from it"
+            self._logger.error(msg)
+            raise ValueError(msg)
+
+        emb_func: EmbeddingFunction = self._embedding_functions[base.name]
+        reduction = None
+        if dim_reduction != "none":
+            self._logger.info("reducing %s embeddings to %s dims with %s...", model_name, n_components, dim_reduction)
+            reduction = DimReduction(dim_reduction, n_components).fit(base.get_all_embeddings())  # type: ignore[arg-type]
+            emb_func = ReducedEmbeddingFunction(emb_func, reduction)
+
+        collection = self._make_collection(db_name, emb_func, index_params)
+        if collection.count() > 0 and collection.fingerprint != base.fingerprint:
+            self._logger.info("index %s is built from outdated data, rebuilding it...", db_name)
+            collection.delete()
+            collection = self._make_collection(db_name, emb_func, index_params)
+        if collection.count() == 0:
+            utterances = base.get_utterances(np.arange(base.count())[None, :])[0]
+            # stored embeddings are what the embedding function of the derived index would return
+            embeddings = base.get_all_embeddings()
+            if reduction is not None:
+                embeddings = normalize(reduction.transform(embeddings))
+            self._fill(collection, utterances, base.get_all_labels(), base.fingerprint, embeddings)
+        self._derived_collections[db_name] = collection
+        return collection
+
+    def _release_derived_collections(self) -> None:
+        for name in list(self._derived_collections):
+            self._logger.debug("releasing derived index %s...", name)
+            self._derived_collections.pop(name).release()
+
+    def _fill(
+        self,
+        collection: BaseIndex,
+        utterances: list[str],
+        labels: Any,  # noqa: ANN401
+        fingerprint: str,
+        embeddings: NDArray[np.float32] | None = None,
+    ) -> None:
+        if embeddings is None:
+            # embedding is not a part of the index build
+            embeddings = collection.embed(utterances)
+        start = time.perf_counter()
+        collection.add(utterances, labels, embeddings)
+        collection.build_time = time.perf_counter() - start
+        collection.set_fingerprint(fingerprint)
+
+    def create_collection(
+        self,
+        model_name: str,
+        data_handler: DataHandler,
+        device: str | None = None,
+        dim_reduction: str = "none",
+        n_components: int | None = None,
+        index_params: dict[str, Any] | None = None,
+    ) -> BaseIndex:
+        """
+        Get the index of the embedder filled with train utterances (see `get_collection` for arguments).
+
+        The index is filled only if it does not hold exactly this data yet: embedder name, train utterances \
+        and labels are fingerprinted, an index with the same fingerprint is reused as is, \
+        an index with another one is rebuilt.
+        """
+        fingerprint = get_fingerprint(model_name, data_handler.utterances_train, data_handler.labels_train)
+        collection = self._get_base_collection(model_name, device)
+        if collection.fingerprint == fingerprint and collection.count() > 0:
+            self._logger.debug("index for %s is already filled with train utterances", model_name)
+        else:
+            if collection.count() > 0:
+                self._logger.info("index for %s is built from other train data, rebuilding it...", model_name)
+                collection.delete()
+                collection = self._make_collection(collection.name, self._embedding_functions[collection.name], {})
+                self._collections[collection.name] = collection
+            self._logger.debug("adding train utterances to vector index...")
+            self._fill(collection, data_handler.utterances_train, data_handler.labels_train, fingerprint)
+
+        return self.get_collection(model_name, device, dim_reduction, n_components, index_params)
+
+    def delete_collection(self, model_name: str) -> None:
+        self._logger.debug("deleting collection for %s...", model_name)
+        db_name = get_db_name(model_name)
+        collection = self._get_base_collection(model_name, None)
+        collection.delete()
+        self._collections.pop(db_name)
+        # derived indexes can be built on this one
+        self._release_derived_collections()
+        close = getattr(self._embedding_functions.pop(db_name), "close", None)
+        if close is not None:
+            close()
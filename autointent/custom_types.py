@@ -13,3 +13,7 @@ class LogLevel(Enum):
 
 
 WEIGHT_TYPES = Literal["uniform", "distance", "closest"]
+
+QUERY_SET_TYPES = Literal["test", "oos"]
+
+FLOAT_TYPES = Literal["float32", "float64"]
@@ -0,0 +1,40 @@
+import logging
+from typing import Any, get_args
+
+import numpy as np
+import numpy.typing as npt
+
+from autointent.custom_types import FLOAT_TYPES
+
+logger = logging.getLogger(__name__)
+
+
+class DtypePolicy:
+    """
+    Process-wide floating point dtype of scores, weights and probabilities produced by scorers, \
+    consumed by predictors and metrics and stored in scorer artifacts.
+
+    float32 halves the memory taken by the score matrices of all trials kept in `OptimizationInfo` \
+    and speeds up vectorized kernels, float64 is available for the cases where precision matters more.
+    """
+
+    def __init__(self, float_dtype: FLOAT_TYPES = "float32") -> None:
+        self.set_float_dtype(float_dtype)
+
+    @property
+    def float_dtype(self) -> type[np.floating[Any]]:
+        return self._float_dtype
+
+    def set_float_dtype(self, float_dtype: FLOAT_TYPES) -> None:
+        if float_dtype not in get_args(FLOAT_TYPES):
+            msg = f"Unknown float dtype: {float_dtype}, expected one of {get_args(FLOAT_TYPES)}"
+            logger.error(msg)
+            raise ValueError(msg)
+        self._float_dtype = np.dtype(float_dtype).type
+
+    def asarray(self, array: npt.ArrayLike) -> npt.NDArray[np.floating[Any]]:
+        """convert to the policy dtype, arrays that already have it are returned without copying"""
+        return np.asarray(array, dtype=self._float_dtype)
+
+
+dtype_policy = DtypePolicy()
@@ -4,6 +4,8 @@ from typing import Protocol
 import numpy as np
 from sklearn.metrics import coverage_error, label_ranking_average_precision_score, label_ranking_loss, roc_auc_score
 
+from autointent.dtype_policy import dtype_policy
+
 from .prediction import PredictionMetricFn, prediction_accuracy, prediction_f1, prediction_precision, prediction_recall
 
 logger = logging.getLogger(__name__)
@@ -42,7 +44,7 @@ def scoring_log_likelihood(labels: list[int] | list[list[int]], scores: list[lis
     ```
     where `s[i,c]` is a predicted score of `i`th utterance having ground truth label `c`
     """
-    scores_array = np.array(scores)
+    scores_array = dtype_policy.asarray(scores)
     labels_array = np.array(labels)
 
     if np.any((scores_array <= 0) | (scores_array > 1)):
@@ -57,7 +59,7 @@ def scoring_log_likelihood(labels: list[int] | list[list[int]], scores: list[lis
         log_likelihood = labels_array * np.log(scores_array) + (1 - labels_array) * np.log(1 - scores_array)
         clipped_one = log_likelihood.clip(min=-100, max=100)
         res = clipped_one.mean()
-    return res
+    return float(res)  # mean of float32 scores is not a python float
 
 
 def scoring_roc_auc(labels: list[int] | list[list[int]], scores: list[list[float]]) -> float:
@@ -69,7 +71,7 @@ def scoring_roc_auc(labels: list[int] | list[list[int]], scores: list[list[float
     {1\\over C}\\sum_{k=1}^C ROCAUC(scores[:, k], labels[:, k])
     ```
     """
-    scores_ = np.array(scores)
+    scores_ = dtype_policy.asarray(scores)
     labels_ = np.array(labels)
 
     n_classes = scores_.shape[1]
@@ -82,7 +84,7 @@ def scoring_roc_auc(labels: list[int] | list[list[int]], scores: list[list[float
 def calculate_prediction_metric(
     func: PredictionMetricFn, labels: list[int] | list[list[int]], scores: list[list[float]]
 ) -> float:
-    scores_ = np.array(scores)
+    scores_ = dtype_policy.asarray(scores)
     labels_ = np.array(labels)
 
     if labels_.ndim == 1:
@@ -129,7 +131,7 @@ def scoring_hit_rate(labels: list[list[int]], scores: list[list[float]]) -> floa
 
     calculates fraction of cases when the top-ranked label is in the set of proper labels of the instance
     """
-    scores_ = np.array(scores)
+    scores_ = dtype_policy.asarray(scores)
     labels_ = np.array(labels)
 
     top_ranked_labels = np.argmax(scores_, axis=1)
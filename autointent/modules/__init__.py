@@ -7,10 +7,11 @@ from .prediction import (
     TunablePredictor,
 )
 from .regexp import RegExp
-from .retrieval import RetrievalModule, VectorDBModule
+from .retrieval import HybridModule, RetrievalModule, VectorDBModule
 from .scoring import DNNCScorer, KNNScorer, LinearScorer, MLKnnScorer, ScoringModule
 
 RETRIEVAL_MODULES_MULTICLASS: dict[str, type[RetrievalModule]] = {
+    "hybrid": HybridModule,
     "vector_db": VectorDBModule,
 }
 
@@ -47,6 +48,7 @@ __all__ = [
     "ThresholdPredictor",
     "TunablePredictor",
     "RegExp",
+    "HybridModule",
     "RetrievalModule",
     "VectorDBModule",
     "DNNCScorer",
@@ -1,12 +1,15 @@
 from abc import ABC, abstractmethod
 from collections.abc import Callable
-from typing import Any
+from typing import Any, ClassVar
 
 from autointent.context import Context
 from autointent.context.optimization_info.data_models import Artifact
 
 
 class Module(ABC):
+    grid_params: ClassVar[tuple[str, ...]] = ()
+    """parameters that `score_grid` can sweep after a single `fit`"""
+
     @abstractmethod
     def fit(self, context: Context) -> None:
         pass
@@ -23,6 +26,47 @@ class Module(ABC):
         return useful assets that represent intermediate data into context
         """
 
+    def score_grid(
+        self, context: Context, metric_fn: Callable[[Any], Any], grid: list[dict[str, Any]]
+    ) -> list[tuple[float, Artifact]]:
+        """
+        Score the fitted module with every combination of `grid_params` values.
+
+        Arguments
+        ---
+        `grid`: values of `grid_params` present in the search space for each combination, \
+            other parameters are the ones the module was created with
+
+        Return
+        ---
+        metric value and assets for each combination
+
+        By default the parameters are set as attributes of the same names and combinations are scored one by one, \
+        modules override this to share work between combinations.
+        """
+        res = []
+        for params in grid:
+            for name, value in params.items():
+                setattr(self, name, value)
+            res.append((self.score(context, metric_fn), self.get_assets()))
+        return res
+
+    def get_extra_info(self) -> dict[str, Any]:
+        """statistics of the trial to log besides the metric value"""
+        return {}
+
+    def get_grid_extra_info(self, grid: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """
+        statistics of each scored combination of `grid_params` values (see `score_grid`) that differ between them, \
+        logged next to `get_extra_info`
+        """
+        return [{} for _ in grid]
+
     @abstractmethod
     def clear_cache(self) -> None:
-        """clear GPU/CPU memory"""
+        """
+        clear GPU/CPU memory
+
+        Embedding models are owned by the process-wide model pool, modules drop their references to them
+        instead of moving them off the device.
+        """
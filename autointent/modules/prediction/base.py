@@ -7,6 +7,7 @@ import numpy.typing as npt
 from autointent import Context
 from autointent.context.data_handler import Tag
 from autointent.context.optimization_info import PredictorArtifact
+from autointent.dtype_policy import dtype_policy
 from autointent.metrics import PredictionMetricFn
 from autointent.modules.base import Module
 
@@ -44,7 +45,7 @@ def get_prediction_evaluation_data(
         labels = np.concatenate([labels, oos_labels])
         scores = np.concatenate([scores, oos_scores])
 
-    return labels, scores
+    return labels, dtype_policy.asarray(scores)
 
 
 def apply_tags(labels: npt.NDArray[Any], scores: npt.NDArray[Any], tags: list[Tag]) -> npt.NDArray[Any]:
@@ -6,6 +6,7 @@ import numpy.typing as npt
 
 from autointent import Context
 from autointent.context.data_handler.tags import Tag
+from autointent.dtype_policy import dtype_policy
 
 from .base import PredictionModule, apply_tags
 
@@ -28,7 +29,7 @@ class ThresholdPredictor(PredictionModule):
                 msg = "Wrong number of thresholds provided doesn't match with number of classes"
                 logger.error(msg)
                 raise ValueError(msg)
-            self.thresh = np.array(self.thresh)
+            self.thresh = dtype_policy.asarray(self.thresh)
 
         if not context.data_handler.has_oos_samples():
             logger.warning(
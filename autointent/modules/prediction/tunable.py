@@ -1,7 +1,6 @@
 import logging
 from typing import Any
 
-import numpy as np
 import numpy.typing as npt
 import optuna
 from optuna.trial import Trial
@@ -9,6 +8,7 @@ from sklearn.metrics import f1_score
 
 from autointent import Context
 from autointent.context.data_handler.tags import Tag
+from autointent.dtype_policy import dtype_policy
 
 from .base import PredictionModule, get_prediction_evaluation_data
 from .threshold import multiclass_predict, multilabel_predict
@@ -54,7 +54,9 @@ class ThreshOptimizer:
         self.n_trials = n_trials if n_trials is not None else n_classes * 10
 
     def objective(self, trial: Trial) -> float:
-        thresholds = np.array([trial.suggest_float(f"threshold_{i}", 0.0, 1.0) for i in range(self.n_classes)])
+        thresholds = dtype_policy.asarray(
+            [trial.suggest_float(f"threshold_{i}", 0.0, 1.0) for i in range(self.n_classes)]
+        )
         if self.multilabel:
             y_pred = multilabel_predict(self.probas, thresholds, self.tags)
         else:
@@ -76,4 +78,6 @@ class ThreshOptimizer:
         optuna.logging.set_verbosity(optuna.logging.WARNING)
         study.optimize(self.objective, n_trials=self.n_trials)
 
-        self.best_thresholds = np.array([study.best_params[f"threshold_{i}"] for i in range(self.n_classes)])
+        self.best_thresholds = dtype_policy.asarray(
+            [study.best_params[f"threshold_{i}"] for i in range(self.n_classes)]
+        )
@@ -1,4 +1,5 @@
 from .base import RetrievalModule
+from .hybrid import HybridModule
 from .vectordb import VectorDBModule
 
-__all__ = ["RetrievalModule", "VectorDBModule"]
+__all__ = ["HybridModule", "RetrievalModule", "VectorDBModule"]
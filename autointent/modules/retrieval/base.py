@@ -1,8 +1,11 @@
 from abc import ABC
+from typing import ClassVar
 
 from autointent.modules.base import Module
 
 
 class RetrievalModule(Module, ABC):
+    grid_params: ClassVar[tuple[str, ...]] = ("k",)
+
     def __init__(self, k: int) -> None:
         self.k = k
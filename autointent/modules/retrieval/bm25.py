@@ -0,0 +1,84 @@
+import numpy as np
+import numpy.typing as npt
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import CountVectorizer
+
+
+class BM25:
+    """
+    In-process Okapi BM25 index.
+
+    Documents are tokenized into lowercased words, term frequencies are kept in a sparse (n_docs, n_terms) matrix \
+    that is turned into BM25 term weights once at fit time, so scoring a batch of queries is a single sparse \
+    matrix product with their (binary) term matrix.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, chunk_size: int = 1024) -> None:
+        """
+        Arguments
+        ---
+        - `k1`: term frequency saturation
+        - `b`: document length normalization
+        - `chunk_size`: number of queries scored at once
+        """
+        self.k1 = k1
+        self.b = b
+        self.chunk_size = chunk_size
+        self._vectorizer = CountVectorizer(token_pattern=r"(?u)\b\w+\b", dtype=np.float32)  # noqa: S106
+        self._weights: sp.csr_matrix | None = None
+
+    def fit(self, documents: list[str]) -> "BM25":
+        tf = sp.csr_matrix(self._vectorizer.fit_transform(documents), dtype=np.float32)
+        n_docs = tf.shape[0]
+        doc_freqs = np.bincount(tf.indices, minlength=tf.shape[1])
+        idf = np.log1p((n_docs - doc_freqs + 0.5) / (doc_freqs + 0.5)).astype(np.float32)
+
+        doc_lengths = np.asarray(tf.sum(axis=1), dtype=np.float32).ravel()
+        norms = self.k1 * (1 - self.b + self.b * doc_lengths / max(doc_lengths.mean(), 1))
+        # tf * (k1 + 1) / (tf + norm) for every non-zero entry, row by row
+        row_norms = np.repeat(norms, np.diff(tf.indptr))
+        tf.data = idf[tf.indices] * tf.data * (self.k1 + 1) / (tf.data + row_norms)
+        self._weights = tf.T.tocsr()
+        return self
+
+    def sparse_scores(self, queries: list[str]) -> sp.csr_matrix:
+        """BM25 scores of all documents, sparse matrix of shape (n_queries, n_docs) without the zero scores"""
+        if self._weights is None:
+            msg = "BM25 index is not fitted"
+            raise RuntimeError(msg)
+        query_terms = sp.csr_matrix(self._vectorizer.transform(queries), dtype=np.float32)
+        query_terms.data[:] = 1
+        return sp.csr_matrix(query_terms @ self._weights, dtype=np.float32)
+
+    def scores(self, queries: list[str]) -> npt.NDArray[np.float32]:
+        """BM25 scores of all documents, dense array of shape (n_queries, n_docs)"""
+        return self.sparse_scores(queries).toarray()
+
+    def query(self, queries: list[str], k: int) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.float32]]:
+        """
+        Return
+        ---
+        - indices of the top-k documents by BM25 score, array of shape (n_queries, k) (from best to worst)
+        - their scores, array of shape (n_queries, k), documents sharing no terms with the query score 0
+        """
+        n_docs = 0 if self._weights is None else self._weights.shape[1]
+        k = min(k, n_docs)
+        ids = np.empty((len(queries), k), dtype=np.int64)
+        scores = np.zeros((len(queries), k), dtype=np.float32)
+        for start in range(0, len(queries), self.chunk_size):
+            chunk_scores = self.sparse_scores(queries[start : start + self.chunk_size])
+            # only the documents sharing terms with a query are ranked, the product is never densified
+            for i in range(chunk_scores.shape[0]):
+                row = slice(chunk_scores.indptr[i], chunk_scores.indptr[i + 1])
+                doc_ids, doc_scores = chunk_scores.indices[row], chunk_scores.data[row]
+                if len(doc_ids) > k:
+                    top = np.argpartition(-doc_scores, kth=k - 1)[:k]
+                    doc_ids, doc_scores = doc_ids[top], doc_scores[top]
+                order = np.argsort(-doc_scores, kind="stable")
+                n_matched = len(order)
+                ids[start + i, :n_matched] = doc_ids[order]
+                scores[start + i, :n_matched] = doc_scores[order]
+                # pad with the first documents scoring 0
+                padding = np.setdiff1d(np.arange(k + len(doc_ids)), doc_ids)[: k - n_matched]
+                ids[start + i, n_matched:] = padding
+        return ids, scores
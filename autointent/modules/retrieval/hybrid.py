@@ -0,0 +1,150 @@
+import time
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from autointent.context import Context
+from autointent.context.optimization_info import RetrieverArtifact
+from autointent.metrics import RetrievalMetricFn
+
+from .base import RetrievalModule
+from .bm25 import BM25
+
+
+class HybridModule(RetrievalModule):
+    """
+    Retrieval with BM25 and a dense vector index fused by reciprocal rank: \
+    each document gets `sum 1 / (rrf_k + rank)` over the candidate lists it appears in.
+    """
+
+    def __init__(
+        self,
+        k: int,
+        model_name: str,
+        n_candidates: int | None = None,
+        rrf_k: int = 60,
+        bm25_k1: float = 1.5,
+        bm25_b: float = 0.75,
+    ) -> None:
+        """
+        Arguments
+        ---
+        - `k`: number of candidates to retrieve
+        - `model_name`: embedder to build the vector index with
+        - `n_candidates`: number of candidates taken from each retriever before fusion, at least `k`
+        - `rrf_k`: rank offset of reciprocal rank fusion, larger values flatten the contribution of top ranks
+        - `bm25_k1`, `bm25_b`: term frequency saturation and document length normalization of BM25
+        """
+        self.k = k
+        self.model_name = model_name
+        self.n_candidates = n_candidates
+        self.rrf_k = rrf_k
+        self.bm25_k1 = bm25_k1
+        self.bm25_b = bm25_b
+
+    def fit(self, context: Context) -> None:
+        self.collection = context.vector_index.create_collection(self.model_name, context.data_handler)
+        start = time.perf_counter()
+        self.bm25 = BM25(self.bm25_k1, self.bm25_b).fit(context.data_handler.utterances_train)
+        self._bm25_build_time = time.perf_counter() - start
+
+    def score(self, context: Context, metric_fn: RetrievalMetricFn) -> float:
+        utterances = context.query_cache.get_utterances("test")
+        embeddings = context.query_cache.get_embeddings(self.collection, "test")
+        start = time.perf_counter()
+        ids = self.retrieve(utterances, embeddings)
+        self._query_latency = (time.perf_counter() - start) / len(utterances)
+        return metric_fn(context.data_handler.labels_test, self.collection.get_labels(ids))
+
+    def retrieve(self, utterances: list[str], embeddings: npt.NDArray[Any] | None = None) -> npt.NDArray[np.int64]:
+        """
+        Arguments
+        ---
+        - `utterances`: query texts
+        - `embeddings`: their embeddings, computed with the vector index embedder if not given
+
+        Return
+        ---
+        row ids of the fused top-k train utterances, array of shape (n_queries, k)
+        """
+        queries = embeddings if embeddings is not None else utterances
+        n_candidates = max(self.n_candidates, self.k) if self.n_candidates is not None else self.k
+        dense_ids, _ = self.collection.query(queries, n_candidates)
+        sparse_ids, sparse_scores = self.bm25.query(utterances, n_candidates)
+        return reciprocal_rank_fusion(
+            [dense_ids, sparse_ids],
+            [np.ones(dense_ids.shape, dtype=bool), sparse_scores > 0],
+            self.collection.count(),
+            min(self.k, self.collection.count()),
+            self.rrf_k,
+        )
+
+    def get_assets(self) -> RetrieverArtifact:
+        return RetrieverArtifact(embedder_name=self.model_name)
+
+    def get_extra_info(self) -> dict[str, Any]:
+        return {"bm25_build_time": self._bm25_build_time, "query_latency": self._query_latency}
+
+    def clear_cache(self) -> None:
+        del self.collection
+        del self.bm25
+
+
+def reciprocal_rank_fusion(
+    rankings: list[npt.NDArray[np.int64]],
+    masks: list[npt.NDArray[np.bool_]],
+    n_docs: int,
+    k: int,
+    rrf_k: int = 60,
+    chunk_size: int = 1024,
+) -> npt.NDArray[np.int64]:
+    """
+    Only the candidates of each query are fused, so memory does not grow with the number of documents.
+
+    Arguments
+    ---
+    - `rankings`: row ids ranked by each retriever, arrays of shape (n_queries, n_candidates_i) (from best to worst)
+    - `masks`: boolean arrays of the same shapes, False marks candidates that were not actually retrieved
+    - `n_docs`: total number of documents
+    - `k`: number of fused candidates to return, every query needs at least `k` distinct candidates
+
+    Return
+    ---
+    row ids of the top-k documents by fused score, array of shape (n_queries, k) (ties are broken by lower id)
+    """
+    n_queries = len(rankings[0])
+    res = np.empty((n_queries, k), dtype=np.int64)
+    for start in range(0, n_queries, chunk_size):
+        end = min(start + chunk_size, n_queries)
+        ids = np.concatenate([ranking[start:end] for ranking in rankings], axis=1)
+        contributions = np.concatenate(
+            [
+                np.where(mask[start:end], 1 / (rrf_k + np.arange(1, ranking.shape[1] + 1)), 0)
+                for ranking, mask in zip(rankings, masks, strict=True)
+            ],
+            axis=1,
+        )
+
+        # sum the contributions of every distinct (query, document) pair
+        keys = np.repeat(np.arange(end - start), ids.shape[1]) * n_docs + ids.ravel()
+        order = np.argsort(keys, kind="stable")
+        keys, contributions = keys[order], contributions.ravel()[order]
+        first = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        fused, keys = np.add.reduceat(contributions, first), keys[first]
+
+        # lay the distinct candidates of each query out in a row padded with -inf scores
+        rows = keys // n_docs
+        counts = np.bincount(rows, minlength=end - start)
+        if counts.min() < k:
+            msg = f"Every query needs at least {k} distinct candidates to fuse"
+            raise ValueError(msg)
+        positions = np.arange(len(keys)) - np.repeat(np.cumsum(counts) - counts, counts)
+        row_scores = np.full((end - start, counts.max()), -np.inf)
+        row_ids = np.zeros((end - start, counts.max()), dtype=np.int64)
+        row_scores[rows, positions] = fused
+        row_ids[rows, positions] = keys % n_docs
+
+        top = np.argsort(-row_scores, axis=1, kind="stable")[:, :k]
+        res[start:end] = np.take_along_axis(row_ids, top, axis=1)
+    return res
@@ -1,60 +1,127 @@
-from collections.abc import Callable
+import time
 from typing import Any
 
-import numpy as np
 import numpy.typing as npt
-from chromadb import Collection
 
 from autointent.context import Context
 from autointent.context.optimization_info import RetrieverArtifact
+from autointent.context.optimization_info.data_models import Artifact
+from autointent.context.vector_index import BaseIndex, search_recall
 from autointent.metrics import RetrievalMetricFn
 
 from .base import RetrievalModule
 
 
 class VectorDBModule(RetrievalModule):
-    def __init__(self, k: int, model_name: str) -> None:
+    def __init__(  # noqa: PLR0913
+        self,
+        k: int,
+        model_name: str,
+        dim_reduction: str = "none",
+        n_components: int | None = None,
+        hnsw_m: int | None = None,
+        hnsw_construction_ef: int | None = None,
+        hnsw_search_ef: int | None = None,
+        n_lists: int | None = None,
+        nprobe: int | None = None,
+        pq_subvectors: int | None = None,
+        pq_centroids: int | None = None,
+        rerank: int | None = None,
+    ) -> None:
+        """
+        Arguments
+        ---
+        - `k`: number of candidates to retrieve
+        - `model_name`: embedder to build the vector index with, "autointent/hashed-char-ngrams" for the built-in \
+            offline embedder
+        - `dim_reduction`: "none", "pca" or "matryoshka", reduction of embeddings passed to the scoring node
+        - `n_components`: target dimension of the reduced embeddings
+        - `hnsw_m`, `hnsw_construction_ef`, `hnsw_search_ef`: HNSW graph parameters of the chroma backend, \
+            None means chroma default
+        - `n_lists`, `nprobe`: number of k-means lists and number of lists searched per query of the ivf backend, \
+            None means backend default
+        - `pq_subvectors`, `pq_centroids`, `rerank`: number of sub-vectors, codebook size and number of candidates \
+            re-ranked with exact embeddings of the pq backend, None means backend default
+        """
         self.model_name = model_name
         self.k = k
+        self.dim_reduction = dim_reduction
+        self.n_components = n_components
+        self.index_params = {
+            "hnsw_m": hnsw_m,
+            "hnsw_construction_ef": hnsw_construction_ef,
+            "hnsw_search_ef": hnsw_search_ef,
+            "n_lists": n_lists,
+            "nprobe": nprobe,
+            "pq_subvectors": pq_subvectors,
+            "pq_centroids": pq_centroids,
+            "rerank": rerank,
+        }
 
     def fit(self, context: Context) -> None:
-        self.collection = context.vector_index.create_collection(self.model_name, context.data_handler)
+        self.collection = context.vector_index.create_collection(
+            self.model_name,
+            context.data_handler,
+            dim_reduction=self.dim_reduction,
+            n_components=self.n_components,
+            index_params=self.index_params,
+        )
 
     def score(self, context: Context, metric_fn: RetrievalMetricFn) -> float:
-        labels_pred = retrieve_candidates(
-            self.collection,
-            self.k,
-            context.data_handler.utterances_test,
-            converter=context.vector_index.metadata_as_labels,
-        )
-        return metric_fn(context.data_handler.labels_test, labels_pred)
+        return self.score_grid(context, metric_fn, [{"k": self.k}])[0][0]
+
+    def score_grid(
+        self, context: Context, metric_fn: RetrievalMetricFn, grid: list[dict[str, Any]]
+    ) -> list[tuple[float, Artifact]]:
+        """query the index once with the largest `k`, candidates for smaller `k` are its prefixes"""
+        ks = [params["k"] for params in grid]
+        queries = context.query_cache.get_embeddings(self.collection, "test")
+        start = time.perf_counter()
+        ids, _ = self.collection.query(queries, max(ks))
+        self._query_latency = (time.perf_counter() - start) / len(queries)
+        self._query_k = max(ks)
+        self._recalls = {k: search_recall(self.collection, queries, ids[:, :k]) for k in ks}
+
+        labels_pred = self.collection.get_labels(ids)
+        assets = self.get_assets()
+        return [(metric_fn(context.data_handler.labels_test, labels_pred[:, :k]), assets) for k in ks]
 
     def get_assets(self) -> RetrieverArtifact:
-        return RetrieverArtifact(embedder_name=self.model_name)
+        return RetrieverArtifact(
+            embedder_name=self.model_name,
+            dim_reduction=self.dim_reduction,
+            n_components=self.n_components,
+            index_params={name: value for name, value in self.index_params.items() if value is not None},
+        )
+
+    def get_extra_info(self) -> dict[str, Any]:
+        """query latency of all trials of a grid is measured with the largest `k` of the grid (`query_k`)"""
+        return {
+            "embedding_dim": self.collection.dim,
+            "build_time": self.collection.build_time,
+            "query_k": self._query_k,
+            "query_latency": self._query_latency,
+            "queries_per_second": 1 / self._query_latency if self._query_latency > 0 else float("inf"),
+        }
+
+    def get_grid_extra_info(self, grid: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        return [{"recall": self._recalls[params.get("k", self.k)]} for params in grid]
 
     def clear_cache(self) -> None:
-        model = self.collection._embedding_function._model  # noqa: SLF001
-        model.to(device="cpu")
-        del model
+        del self.collection
 
 
-def retrieve_candidates(
-    collection: Collection,
-    k: int,
-    utterances: list[str],
-    converter: Callable[[Any], Any],
-) -> npt.NDArray[Any]:
+def retrieve_candidates(collection: BaseIndex, k: int, utterances: list[str] | npt.NDArray[Any]) -> npt.NDArray[Any]:
     """
+    Arguments
+    ---
+    `utterances`: list of utterances or array of their embeddings
+
     Return
     ---
     `labels`:
         - multiclass case: np.ndarray of shape (n_samples, n_candidates) with integer labels from `[0,n_classes-1]`
         - multilabel case: np.ndarray of shape (n_samples, n_candidates, n_classes) with binary labels
     """
-    query_res = collection.query(
-        query_texts=utterances,
-        n_results=k,
-        include=["metadatas", "documents", "distances"],  # one can add "embeddings"
-    )
-
-    return np.array([converter(candidates) for candidates in query_res["metadatas"]])
+    labels, _ = collection.query_labels(utterances, k)
+    return labels
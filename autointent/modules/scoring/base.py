@@ -6,6 +6,7 @@ import numpy.typing as npt
 
 from autointent import Context
 from autointent.context.optimization_info import ScorerArtifact
+from autointent.custom_types import QUERY_SET_TYPES
 from autointent.metrics import ScoringMetricFn
 from autointent.modules.base import Module
 
@@ -18,13 +19,53 @@ class ScoringModule(Module):
         - metric calculcated on test set
         - predicted scores of test set and oos utterances
         """
-        self._test_scores = self.predict(context.data_handler.utterances_test)
+        self._test_scores = self.predict_query_set(context, "test")
         res = metric_fn(context.data_handler.labels_test, self._test_scores)
         self._oos_scores = None
         if context.data_handler.has_oos_samples():
-            self._oos_scores = self.predict(context.data_handler.oos_utterances)
+            self._oos_scores = self.predict_query_set(context, "oos")
         return res
 
+    def score_grid(
+        self, context: Context, metric_fn: ScoringMetricFn, grid: list[dict[str, Any]]
+    ) -> list[tuple[float, ScorerArtifact]]:
+        """
+        Score the fitted module with every combination of `grid_params` values (see `Module.score_grid`).
+
+        Return
+        ---
+        metric calculated on test set and predicted scores of test set and oos utterances for each combination
+        """
+        test_scores = self.predict_query_set_grid(context, "test", grid)
+        oos_scores: list[npt.NDArray[Any] | None] = [None] * len(grid)
+        if context.data_handler.has_oos_samples():
+            oos_scores = self.predict_query_set_grid(context, "oos", grid)  # type: ignore[assignment]
+        return [
+            (metric_fn(context.data_handler.labels_test, test), ScorerArtifact(test_scores=test, oos_scores=oos))
+            for test, oos in zip(test_scores, oos_scores, strict=True)
+        ]
+
+    def predict_query_set_grid(
+        self, context: Context, query_set: QUERY_SET_TYPES, grid: list[dict[str, Any]]
+    ) -> list[npt.NDArray[Any]]:
+        """
+        predict scores of the test or oos utterances with every combination of `grid_params` values, \
+        by default the parameters are set as attributes and combinations are predicted one by one
+        """
+        res = []
+        for params in grid:
+            for name, value in params.items():
+                setattr(self, name, value)
+            res.append(self.predict_query_set(context, query_set))
+        return res
+
+    def predict_query_set(self, context: Context, query_set: QUERY_SET_TYPES) -> npt.NDArray[Any]:
+        """
+        predict scores of the test or oos utterances, scorers override it \
+        to reuse query results cached in the context instead of querying the vector index in every trial
+        """
+        return self.predict(context.query_cache.get_utterances(query_set))
+
     def get_assets(self) -> ScorerArtifact:
         return ScorerArtifact(test_scores=self._test_scores, oos_scores=self._oos_scores)
 
@@ -7,6 +7,8 @@ import numpy.typing as npt
 from sentence_transformers import CrossEncoder
 
 from autointent import Context
+from autointent.custom_types import QUERY_SET_TYPES
+from autointent.dtype_policy import dtype_policy
 from autointent.modules.scoring.base import ScoringModule
 
 from .head_training import CrossEncoderWithLogreg
@@ -42,18 +44,21 @@ class DNNCScorer(ScoringModule):
         ---
         `(n_queries, n_classes)` matrix with zeros everywhere except the class of the best neighbor utterance
         """
-        query_res = self._collection.query(
-            query_texts=utterances,
-            n_results=self.k,
-            include=["metadatas", "documents"],  # one can add "embeddings", "distances"
-        )
+        ids, _ = self._collection.query(utterances, self.k)
 
-        cross_encoder_scores = self._get_cross_encoder_scores(utterances, query_res["documents"])
+        cross_encoder_scores = self._get_cross_encoder_scores(utterances, self._collection.get_utterances(ids))
 
-        labels_pred = [[cand["intent_id"] for cand in candidates] for candidates in query_res["metadatas"]]
+        labels_pred = self._collection.get_labels(ids)
 
         return self._build_result(cross_encoder_scores, labels_pred)
 
+    def predict_query_set(self, context: Context, query_set: QUERY_SET_TYPES) -> npt.NDArray[Any]:
+        utterances = context.query_cache.get_utterances(query_set)
+        neighbours = context.get_neighbours(query_set, self.k)
+        candidates = self._collection.get_utterances(neighbours.ids)
+        cross_encoder_scores = self._get_cross_encoder_scores(utterances, candidates)
+        return self._build_result(cross_encoder_scores, neighbours.labels)
+
     def _get_cross_encoder_scores(self, utterances: list[str], candidates: list[list[str]]) -> list[list[float]]:
         """
         Arguments
@@ -86,7 +91,7 @@ class DNNCScorer(ScoringModule):
             for i in range(0, len(flattened_cross_encoder_scores), self.k)
         ]
 
-    def _build_result(self, scores: list[list[float]], labels: list[list[int]]) -> npt.NDArray[Any]:
+    def _build_result(self, scores: list[list[float]], labels: npt.NDArray[Any]) -> npt.NDArray[Any]:
         """
         Arguments
         ---
@@ -97,18 +102,15 @@ class DNNCScorer(ScoringModule):
         ---
         `(n_queries, n_classes)` matrix with zeros everywhere except the class of the best neighbor utterance
         """
-        n_classes = self._collection.metadata["n_classes"]
-
-        return build_result(np.array(scores), np.array(labels), n_classes)
+        return build_result(np.array(scores), labels, self._collection.n_classes)
 
     def clear_cache(self) -> None:
-        model = self._collection._embedding_function._model  # noqa: SLF001
-        model.to(device="cpu")
-        del model
+        del self._collection
+        del self.model
 
 
 def build_result(scores: npt.NDArray[Any], labels: npt.NDArray[Any], n_classes: int) -> npt.NDArray[Any]:
-    res = np.zeros((len(scores), n_classes))
+    res = np.zeros((len(scores), n_classes), dtype=dtype_policy.float_dtype)
     best_neighbors = np.argmax(scores, axis=1)
     idx_helper = np.arange(len(res))
     best_classes = labels[idx_helper, best_neighbors]
@@ -1,8 +1,12 @@
+from typing import Any
+
 import numpy as np
 from numpy.typing import NDArray
 
 
-def get_counts(labels: NDArray[np.int_], n_classes: int, weights: NDArray[np.float64]) -> NDArray[np.float64]:
+def get_counts(
+    labels: NDArray[np.int_], n_classes: int, weights: NDArray[np.floating[Any]]
+) -> NDArray[np.floating[Any]]:
     """
     Arguments
     ---
@@ -14,13 +18,13 @@ def get_counts(labels: NDArray[np.int_], n_classes: int, weights: NDArray[np.flo
     np.ndarray of shape (n_samples, n_classes) with statistics of how many times each class label occured in candidates
     """
     n_queries = labels.shape[0]
-    labels += n_classes * np.arange(n_queries)[:, None]
-    return np.bincount(labels.ravel(), minlength=n_classes * n_queries, weights=weights.ravel()).reshape(
+    offset_labels = labels + n_classes * np.arange(n_queries)[:, None]
+    return np.bincount(offset_labels.ravel(), minlength=n_classes * n_queries, weights=weights.ravel()).reshape(
         n_queries, n_classes
     )
 
 
-def get_counts_multilabel(labels: NDArray[np.int_], weights: NDArray[np.float64]) -> NDArray[np.float64]:
+def get_counts_multilabel(labels: NDArray[np.int_], weights: NDArray[np.floating[Any]]) -> NDArray[np.floating[Any]]:
     """
     Arguments
     ---
@@ -1,18 +1,18 @@
-from collections.abc import Callable
-from typing import Any
+from typing import Any, ClassVar
 
-import numpy as np
 import numpy.typing as npt
-from chromadb import Collection
 
 from autointent import Context
-from autointent.custom_types import WEIGHT_TYPES
+from autointent.context.vector_index import BaseIndex
+from autointent.custom_types import QUERY_SET_TYPES, WEIGHT_TYPES
 from autointent.modules.scoring.base import ScoringModule
 
-from .weighting import apply_weights
+from .weighting import apply_weights, apply_weights_grid
 
 
 class KNNScorer(ScoringModule):
+    grid_params: ClassVar[tuple[str, ...]] = ("k", "weights")
+
     def __init__(self, k: int, weights: WEIGHT_TYPES | bool) -> None:
         """
         Arguments
@@ -25,29 +25,43 @@ class KNNScorer(ScoringModule):
         - `device`: str, something like "cuda:0" or "cuda:0,1,2", a device to store embedding function
         """
         self.k = k
-        if isinstance(weights, bool):
-            weights = "distance" if weights else "uniform"
-        self.weights = weights
+        self.weights = get_weights_type(weights)
 
     def fit(self, context: Context) -> None:
         self._multilabel = context.multilabel
         self._collection = context.get_best_collection()
         self._n_classes = context.n_classes
-        self._converter = context.vector_index.metadata_as_labels
 
     def predict(self, utterances: list[str]) -> npt.NDArray[Any]:
-        labels, distances = query(self._collection, self.k, utterances, self._converter)
+        labels, distances = query(self._collection, self.k, utterances)
         return apply_weights(labels, distances, self.weights, self._n_classes, self._multilabel)
 
+    def predict_query_set(self, context: Context, query_set: QUERY_SET_TYPES) -> npt.NDArray[Any]:
+        neighbours = context.get_neighbours(query_set, self.k)
+        return apply_weights(neighbours.labels, neighbours.distances, self.weights, self._n_classes, self._multilabel)
+
+    def predict_query_set_grid(
+        self, context: Context, query_set: QUERY_SET_TYPES, grid: list[dict[str, Any]]
+    ) -> list[npt.NDArray[Any]]:
+        """one neighbour table at the largest `k`, all (k, weights) combinations are computed from its prefixes"""
+        neighbours = context.get_neighbours(query_set, max(params["k"] for params in grid))
+        combinations = [(params["k"], get_weights_type(params["weights"])) for params in grid]
+        return apply_weights_grid(
+            neighbours.labels, neighbours.distances, combinations, self._n_classes, self._multilabel
+        )
+
     def clear_cache(self) -> None:
-        model = self._collection._embedding_function._model  # noqa: SLF001
-        model.to(device="cpu")
-        del model
+        del self._collection
+
 
+def get_weights_type(weights: WEIGHT_TYPES | bool) -> WEIGHT_TYPES:
+    """`True` means distance weighting, `False` means uniform weighting"""
+    if isinstance(weights, bool):
+        return "distance" if weights else "uniform"
+    return weights
 
-def query(
-    collection: Collection, k: int, utterances: list[str], converter: Callable[[Any], Any]
-) -> tuple[npt.NDArray[Any], npt.NDArray[Any]]:
+
+def query(collection: BaseIndex, k: int, utterances: list[str]) -> tuple[npt.NDArray[Any], npt.NDArray[Any]]:
     """
     Return
     ---
@@ -58,13 +72,4 @@ def query(
 
     `distances`: np.ndarray of shape (n_samples, n_neighbors) with integer labels from 0..n_classes-1
     """
-    query_res = collection.query(
-        query_texts=utterances,
-        n_results=k,
-        include=["metadatas", "documents", "distances"],  # one can add "embeddings"
-    )
-
-    res_labels = np.array([converter(candidates) for candidates in query_res["metadatas"]])
-    res_distances = np.array(query_res["distances"])
-
-    return res_labels, res_distances
+    return collection.query_labels(utterances, k)
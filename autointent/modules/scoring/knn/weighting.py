@@ -4,6 +4,7 @@ import numpy as np
 from numpy.typing import NDArray
 
 from autointent.custom_types import WEIGHT_TYPES
+from autointent.dtype_policy import dtype_policy
 
 from .count_neighbors import get_counts, get_counts_multilabel
 
@@ -29,18 +30,19 @@ def apply_weights(
 
     Return
     ---
-    np.ndarray of shape (n_samples, n_classes)
+    np.ndarray of shape (n_samples, n_classes) of the dtype set by `dtype_policy`
     """
     n_samples, n_candidates = distances.shape
+    dtype = dtype_policy.float_dtype
 
     if weights == "closest":
         return closest_weighting(labels, distances, multilabel, n_classes)
 
     if weights == "uniform":
-        weights_ = np.ones((n_samples, n_candidates))
+        weights_ = np.ones((n_samples, n_candidates), dtype=dtype)
 
     elif weights == "distance":
-        weights_ = 1 / (distances + 1e-5)
+        weights_ = 1 / (distances.astype(dtype, copy=False) + 1e-5)
 
     if multilabel:
         counts = get_counts_multilabel(labels, weights_)
@@ -49,39 +51,100 @@ def apply_weights(
         counts = get_counts(labels, n_classes, weights_)
         probs = counts / counts.sum(axis=1, keepdims=True)
 
-    return probs
+    return probs.astype(dtype, copy=False)
 
 
-def closest_weighting(labels: NDArray[Any], distances: NDArray[Any], multilabel: bool, n_classes: int) -> NDArray[Any]:
-    if not multilabel:
-        labels = to_onehot(labels, n_classes)
-    return _closest_weighting(labels, distances)
+def apply_weights_grid(
+    labels: NDArray[Any],
+    distances: NDArray[Any],
+    grid: list[tuple[int, WEIGHT_TYPES]],
+    n_classes: int,
+    multilabel: bool,
+) -> list[NDArray[Any]]:
+    """
+    Same as `apply_weights` on the first `k` candidates for every `(k, weights)` of the grid.
 
+    Closest weighting of all `k` values is computed incrementally with a running per-class maximum.
+    In the multiclass case, class counts of all uniform and distance combinations are computed with one `np.bincount` \
+    over the stacked candidates, summing weights in the same order as `apply_weights`, so results are identical.
 
-def _closest_weighting(labels: NDArray[Any], distances: NDArray[Any]) -> NDArray[Any]:
+    Return
+    ---
+    list of np.ndarray of shape (n_samples, n_classes), one for each combination
+    """
+    res: list[NDArray[Any] | None] = [None] * len(grid)
+    closest = sorted((i for i, (_, weights) in enumerate(grid) if weights == "closest"), key=lambda i: grid[i][0])
+    stacked = [i for i, (_, weights) in enumerate(grid) if weights != "closest" and not multilabel]
+    for i, (k, weights) in enumerate(grid):
+        if i not in stacked and i not in closest:
+            res[i] = apply_weights(labels[:, :k], distances[:, :k], weights, n_classes, multilabel)
+
+    if closest:
+        # combinations sorted by `k` only add candidates between the previous `k` and their own
+        similarities = 1 - distances.astype(dtype_policy.float_dtype, copy=False)
+        running = np.full((len(distances), n_classes), -1, dtype=similarities.dtype)
+        prev_k = 0
+        for i in closest:
+            k = grid[i][0]
+            update_closest(running, labels[:, prev_k:k], similarities[:, prev_k:k], multilabel)
+            prev_k = k
+            res[i] = (running + 1) / 2
+    if not stacked:
+        return res  # type: ignore[return-value]
+
+    n_samples = len(labels)
+    bins, bin_weights = [], []
+    for j, i in enumerate(stacked):
+        k, weights = grid[i]
+        # bin of (combination j, sample, class)
+        bins.append((labels[:, :k] + n_classes * (np.arange(n_samples)[:, None] + j * n_samples)).ravel())
+        if weights == "uniform":
+            bin_weights.append(np.ones(n_samples * labels[:, :k].shape[1], dtype=dtype_policy.float_dtype))
+        else:
+            bin_weights.append((1 / (distances[:, :k].astype(dtype_policy.float_dtype, copy=False) + 1e-5)).ravel())
+    counts = np.bincount(
+        np.concatenate(bins), minlength=len(stacked) * n_samples * n_classes, weights=np.concatenate(bin_weights)
+    ).reshape(len(stacked), n_samples, n_classes)
+    probs = (counts / counts.sum(axis=2, keepdims=True)).astype(dtype_policy.float_dtype, copy=False)
+    for j, i in enumerate(stacked):
+        res[i] = probs[j]
+    return res  # type: ignore[return-value]
+
+
+def closest_weighting(labels: NDArray[Any], distances: NDArray[Any], multilabel: bool, n_classes: int) -> NDArray[Any]:
     """
     Arguments
     ---
-    `labels`: array of shape (n_samples, n_candidates, n_classes) with binary labels
+    `labels`:
+    - multiclass case: np.ndarray of shape (n_samples, n_candidates) with integer labels from [0,n_classes-1]
+    - multilabel case: np.ndarray of shape (n_samples, n_candidates, n_classes) with binary labels
+
     `distances`: array of shape (n_samples, n_candidates) with cosine distances
 
     Return
     ---
     array of shape (n_samples, n_classes) with probabilities
     """
-    # broadcast to (n_samples, n_candidates, n_classes)
-    broadcasted_similarities = np.broadcast_to(1 - distances[..., None], shape=labels.shape)
-    expanded_distances_view = np.where(labels != 0, broadcasted_similarities, -1)
-
-    # select closest candidate for each query-class pair
-    similarities = np.max(expanded_distances_view, axis=1)
-    return (similarities + 1) / 2  # cosine [-1,+1] -> prob [0,1]
-
-
-def to_onehot(labels: NDArray[Any], n_classes: int) -> NDArray[Any]:
-    """convert nd array of ints to (n+1)d array of zeros and ones"""
-    new_shape = (*labels.shape, n_classes)
-    onehot_labels = np.zeros(shape=new_shape)
-    indices = (*tuple(np.indices(labels.shape)), labels)
-    onehot_labels[indices] = 1
-    return onehot_labels
+    similarities = 1 - distances.astype(dtype_policy.float_dtype, copy=False)
+    closest = np.full((len(distances), n_classes), -1, dtype=similarities.dtype)
+    update_closest(closest, labels, similarities, multilabel)
+    return (closest + 1) / 2  # cosine [-1,+1] -> prob [0,1]
+
+
+def update_closest(closest: NDArray[Any], labels: NDArray[Any], similarities: NDArray[Any], multilabel: bool) -> None:
+    """
+    Segment max: raise `closest[sample, class]` to the similarity of every candidate of the sample having the class, \
+    without materializing a (n_samples, n_candidates, n_classes) tensor of similarities.
+
+    Arguments
+    ---
+    - `closest`: array of shape (n_samples, n_classes), updated in place
+    - `labels`: labels of the candidates (see `closest_weighting`)
+    - `similarities`: array of shape (n_samples, n_candidates) with cosine similarities
+    """
+    if multilabel:
+        samples, candidates, classes = np.nonzero(labels)
+        np.maximum.at(closest, (samples, classes), similarities[samples, candidates])
+    else:
+        samples = np.broadcast_to(np.arange(len(labels))[:, None], labels.shape)
+        np.maximum.at(closest, (samples, labels), similarities)
@@ -6,6 +6,8 @@ from sklearn.linear_model import LogisticRegression, LogisticRegressionCV
 from sklearn.multioutput import MultiOutputClassifier
 
 from autointent import Context
+from autointent.custom_types import QUERY_SET_TYPES
+from autointent.dtype_policy import dtype_policy
 
 from .base import ScoringModule
 
@@ -34,10 +36,8 @@ class LinearScorer(ScoringModule):
     def fit(self, context: Context) -> None:
         self._multilabel = context.multilabel
         collection = context.get_best_collection()
-        dataset = collection.get(include=["embeddings", "metadatas"])
-        features = dataset["embeddings"]
-
-        labels = context.vector_index.metadata_as_labels(dataset["metadatas"])
+        features = collection.get_all_embeddings()
+        labels = collection.get_all_labels()
         if self._multilabel:
             base_clf = LogisticRegression()
             clf = MultiOutputClassifier(base_clf)
@@ -47,17 +47,19 @@ class LinearScorer(ScoringModule):
         clf.fit(features, labels)
 
         self._clf = clf
-        self._emb_func = collection._embedding_function  # noqa: SLF001
+        self._collection = collection
 
     def predict(self, utterances: list[str]) -> npt.NDArray[Any]:
-        features = self._emb_func(utterances)
+        return self._predict_from_features(self._collection.embed(utterances))
+
+    def predict_query_set(self, context: Context, query_set: QUERY_SET_TYPES) -> npt.NDArray[Any]:
+        return self._predict_from_features(context.get_query_embeddings(query_set))
+
+    def _predict_from_features(self, features: npt.NDArray[Any]) -> npt.NDArray[Any]:
         probas = self._clf.predict_proba(features)
         if self._multilabel:
             probas = np.stack(probas, axis=1)[..., 1]
-        return probas  # type: ignore[no-any-return]
+        return dtype_policy.asarray(probas)
 
     def clear_cache(self) -> None:
-        model = self._emb_func._model  # noqa: SLF001
-        model.to(device="cpu")
-        del model
-        self.collection = None
+        del self._collection
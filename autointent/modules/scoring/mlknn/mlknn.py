@@ -1,23 +1,35 @@
-from collections.abc import Callable
-from typing import Any
+from itertools import groupby
+from typing import Any, ClassVar
 
 import numpy as np
-from chromadb.api.models.Collection import Collection
 from numpy.typing import NDArray
 
 from autointent import Context
+from autointent.context.vector_index import BaseIndex
+from autointent.custom_types import QUERY_SET_TYPES
+from autointent.dtype_policy import dtype_policy
 from autointent.modules.scoring.base import ScoringModule
 
 
 class MLKnnScorer(ScoringModule):
+    """
+    ML-kNN: for every label, posterior of having it given how many of the `k` neighbours have it.
+
+    Neighbours of train items are taken from the self-neighbour table cached in the context \
+    (see `Context.get_train_neighbours`), so trials with different `k`, `s` and `ignore_first_neighbours` \
+    do not query the index again.
+    """
+
+    grid_params: ClassVar[tuple[str, ...]] = ("k", "s", "ignore_first_neighbours")
+
     _multilabel: bool
-    _collection: Collection
+    _collection: BaseIndex
     _n_classes: int
-    _converter: Callable[[Any], Any]
-    _prior_prob_true: NDArray[np.float64]
-    _prior_prob_false: NDArray[np.float64]
-    _cond_prob_true: NDArray[np.float64]
-    _cond_prob_false: NDArray[np.float64]
+    _train_labels: NDArray[np.int64]
+    _prior_prob_true: NDArray[np.floating[Any]]
+    _prior_prob_false: NDArray[np.floating[Any]]
+    _cond_prob_true: NDArray[np.floating[Any]]
+    _cond_prob_false: NDArray[np.floating[Any]]
 
     def __init__(self, k: int, s: float = 1.0, ignore_first_neighbours: int = 0) -> None:
         self.k = k
@@ -28,83 +40,174 @@ class MLKnnScorer(ScoringModule):
         self._multilabel = context.multilabel
         self._collection = context.get_best_collection()
         self._n_classes = context.n_classes
-        self._converter = context.vector_index.metadata_as_labels
-
-        dataset = self._collection.get(include=["embeddings", "metadatas"])
-        features = np.array(dataset["embeddings"])
-        labels = np.array(self._converter(dataset["metadatas"]))
-        self._prior_prob_true, self._prior_prob_false = self._compute_prior(labels)
-        self._cond_prob_true, self._cond_prob_false = self._compute_cond(features, labels)
-
-    def _compute_prior(self, y: NDArray[np.float64]) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
-        prior_prob_true = (self.s + y.sum(axis=0)) / (self.s * 2 + y.shape[0])
-        prior_prob_false = 1 - prior_prob_true
-        return prior_prob_true, prior_prob_false
-
-    def _compute_cond(
-        self, x: NDArray[np.str_], y: NDArray[np.float64]
-    ) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
-        c = np.zeros((self._n_classes, self.k + 1), dtype=int)
-        cn = np.zeros((self._n_classes, self.k + 1), dtype=int)
-
-        neighbors_labels = self._get_neighbors(embeddings=x)
-
-        for i in range(x.shape[0]):
-            deltas = np.sum(neighbors_labels[i], axis=0).astype(int)
-            idx_helper = np.arange(self._n_classes)
-            deltas_idx = deltas[idx_helper]
-            c[idx_helper, deltas_idx] += y[i]
-            cn[idx_helper, deltas_idx] += 1 - y[i]
-
-        c_sum = c.sum(axis=1)
-        cn_sum = cn.sum(axis=1)
-
-        cond_prob_true = (self.s + c) / (self.s * (self.k + 1) + c_sum[:, None])
-        cond_prob_false = (self.s + cn) / (self.s * (self.k + 1) + cn_sum[:, None])
-
-        return cond_prob_true, cond_prob_false
-
-    def _get_neighbors(
-        self,
-        embeddings: NDArray[np.str_] | None = None,
-        texts: list[str] | None = None,
-    ) -> NDArray[np.int64]:
+
+        self._train_labels = self._collection.get_all_labels()
+        self._prior_prob_true, self._prior_prob_false = self._compute_prior(self._train_labels)
+        neighbors_labels = self._get_train_neighbors(context, self.k, self.ignore_first_neighbours)
+        self._cond_prob_true, self._cond_prob_false = self._compute_cond_from_neighbors(
+            neighbors_labels, self._train_labels
+        )
+
+    def _compute_prior(
+        self, y: NDArray[np.floating[Any]]
+    ) -> tuple[NDArray[np.floating[Any]], NDArray[np.floating[Any]]]:
+        return get_prior(y, self.s)
+
+    def _compute_cond_from_neighbors(
+        self, neighbors_labels: NDArray[np.int64], y: NDArray[np.floating[Any]]
+    ) -> tuple[NDArray[np.floating[Any]], NDArray[np.floating[Any]]]:
+        """
+        Arguments
+        ---
+        - `neighbors_labels`: binary labels of the neighbours of train items, array of shape (n_train, k, n_classes)
+        - `y`: binary labels of train items, array of shape (n_train, n_classes)
         """
-        retrieve nearest neighbors and return their labels in binary format
+        deltas = np.sum(neighbors_labels, axis=1).astype(int)
+        c, cn = count_deltas(deltas, y, self.k)
+        return get_cond(c, cn, self.k, self.s)
+
+    def _get_train_neighbors(self, context: Context, k: int, ignore_first_neighbours: int) -> NDArray[np.int64]:
+        neighbours = context.get_train_neighbours(k + ignore_first_neighbours)
+        return neighbours.labels[:, ignore_first_neighbours:]  # type: ignore[no-any-return]
+
+    def _get_neighbors(self, queries: list[str] | NDArray[np.float32]) -> NDArray[np.int64]:
+        """
+        retrieve nearest neighbors of utterances or embeddings and return their labels in binary format
 
         Return
         ---
         array of shape (n_queries, n_candidates, n_classes)
         """
-        query_res = self._collection.query(
-            query_embeddings=embeddings,
-            query_texts=texts,
-            n_results=self.k + self.ignore_first_neighbours,
-            include=["metadatas"],
-        )
-        return np.array(
-            [self._converter(candidates[self.ignore_first_neighbours :]) for candidates in query_res["metadatas"]]
-        )
+        labels, _ = self._collection.query_labels(queries, self.k + self.ignore_first_neighbours)
+        return labels[:, self.ignore_first_neighbours :]
 
     def predict_labels(self, utterances: list[str], thresh: float = 0.5) -> NDArray[np.int64]:
         probas = self.predict(utterances)
         return (probas > thresh).astype(int)
 
-    def predict(self, utterances: list[str]) -> NDArray[np.float64]:
-        result = np.zeros((len(utterances), self._n_classes), dtype=float)
-        neighbors_labels = self._get_neighbors(texts=utterances)
+    def predict(self, utterances: list[str]) -> NDArray[np.floating[Any]]:
+        return self._predict_from_neighbors(self._get_neighbors(utterances))
 
-        for instance in range(neighbors_labels.shape[0]):
-            deltas = np.sum(neighbors_labels[instance], axis=0).astype(int)
+    def predict_query_set(self, context: Context, query_set: QUERY_SET_TYPES) -> NDArray[np.floating[Any]]:
+        neighbours = context.get_neighbours(query_set, self.k + self.ignore_first_neighbours)
+        return self._predict_from_neighbors(neighbours.labels[:, self.ignore_first_neighbours :])
 
-            for label in range(self._n_classes):
-                p_true = self._prior_prob_true[label] * self._cond_prob_true[label, deltas[label]]
-                p_false = self._prior_prob_false[label] * self._cond_prob_false[label, deltas[label]]
-                result[instance, label] = p_true / (p_true + p_false)
-
-        return result
+    def predict_query_set_grid(
+        self, context: Context, query_set: QUERY_SET_TYPES, grid: list[dict[str, Any]]
+    ) -> list[NDArray[np.floating[Any]]]:
+        """
+        Count tables are built once per (k, ignore_first_neighbours) from the cached neighbour tables, \
+        priors, conditionals and posteriors of all `s` values are computed at once along a leading axis.
+        """
+        res: list[NDArray[np.floating[Any]]] = [np.empty(0)] * len(grid)
+        # parameters missing from the grid are the same for all combinations
+        grid = [{"k": self.k, "s": self.s, "ignore_first_neighbours": self.ignore_first_neighbours} | p for p in grid]
+
+        def group_key(i: int) -> tuple[int, int]:
+            return grid[i]["k"], grid[i]["ignore_first_neighbours"]
+
+        for (k, ignore), group in groupby(sorted(range(len(grid)), key=group_key), key=group_key):
+            ids = list(group)
+            smoothing = np.array([grid[i]["s"] for i in ids], dtype=float)
+
+            train_deltas = np.sum(self._get_train_neighbors(context, k, ignore), axis=1).astype(int)
+            c, cn = count_deltas(train_deltas, self._train_labels, k)
+            prior_true, prior_false = get_prior(self._train_labels, smoothing[:, None])
+            cond_true, cond_false = get_cond(c, cn, k, smoothing[:, None, None])
+
+            neighbours = context.get_neighbours(query_set, k + ignore)
+            deltas = np.sum(neighbours.labels[:, ignore:], axis=1).astype(int)
+            probs = get_posteriors(deltas, prior_true, prior_false, cond_true, cond_false)
+            for j, i in enumerate(ids):
+                res[i] = probs[j]
+        return res
+
+    def _predict_from_neighbors(self, neighbors_labels: NDArray[np.int64]) -> NDArray[np.floating[Any]]:
+        deltas = np.sum(neighbors_labels, axis=1).astype(int)
+        return get_posteriors(
+            deltas, self._prior_prob_true, self._prior_prob_false, self._cond_prob_true, self._cond_prob_false
+        )
 
     def clear_cache(self) -> None:
-        model = self._collection._embedding_function._model  # noqa: SLF001
-        model.to(device="cpu")
-        del model
+        del self._collection
+
+
+def get_prior(
+    y: NDArray[Any], s: float | NDArray[np.floating[Any]]
+) -> tuple[NDArray[np.floating[Any]], NDArray[np.floating[Any]]]:
+    """
+    Arguments
+    ---
+    - `y`: binary labels of train items, array of shape (n_train, n_classes)
+    - `s`: smoothing, a number or an array of shape (n_s, 1) to get priors of shape (n_s, n_classes)
+
+    Probabilities are of the dtype set by `dtype_policy`, and so are the posteriors computed from them.
+    """
+    prior_prob_true = dtype_policy.asarray((s + y.sum(axis=0)) / (s * 2 + y.shape[0]))
+    prior_prob_false = 1 - prior_prob_true
+    return prior_prob_true, prior_prob_false
+
+
+def get_cond(
+    c: NDArray[np.int_], cn: NDArray[np.int_], k: int, s: float | NDArray[np.floating[Any]]
+) -> tuple[NDArray[np.floating[Any]], NDArray[np.floating[Any]]]:
+    """
+    Arguments
+    ---
+    - `c`, `cn`: count tables of shape (n_classes, k + 1), see `count_deltas`
+    - `s`: smoothing, a number or an array of shape (n_s, 1, 1) to get tables of shape (n_s, n_classes, k + 1)
+    """
+    c_sum = c.sum(axis=1)
+    cn_sum = cn.sum(axis=1)
+
+    cond_prob_true = dtype_policy.asarray((s + c) / (s * (k + 1) + c_sum[:, None]))
+    cond_prob_false = dtype_policy.asarray((s + cn) / (s * (k + 1) + cn_sum[:, None]))
+
+    return cond_prob_true, cond_prob_false
+
+
+def get_posteriors(
+    deltas: NDArray[np.int_],
+    prior_true: NDArray[np.floating[Any]],
+    prior_false: NDArray[np.floating[Any]],
+    cond_true: NDArray[np.floating[Any]],
+    cond_false: NDArray[np.floating[Any]],
+) -> NDArray[np.floating[Any]]:
+    """
+    Arguments
+    ---
+    - `deltas`: number of neighbours having each label, array of shape (n_queries, n_classes)
+    - priors of shape (..., n_classes) and conditionals of shape (..., n_classes, k + 1) with the same leading axes
+
+    Return
+    ---
+    posteriors of shape (..., n_queries, n_classes)
+    """
+    # gather conditional probabilities of each (instance, label) pair from the (label, delta) tables
+    label_idx = np.arange(deltas.shape[1])
+    p_true = prior_true[..., None, :] * cond_true[..., label_idx, deltas]
+    p_false = prior_false[..., None, :] * cond_false[..., label_idx, deltas]
+    return p_true / (p_true + p_false)  # type: ignore[no-any-return]
+
+
+def count_deltas(
+    deltas: NDArray[np.int_], y: NDArray[np.floating[Any]], k: int
+) -> tuple[NDArray[np.int_], NDArray[np.int_]]:
+    """
+    Arguments
+    ---
+    - `deltas`: number of neighbours having each label, array of shape (n_train, n_classes) with values in `[0,k]`
+    - `y`: binary labels of train items, array of shape (n_train, n_classes)
+
+    Return
+    ---
+    - `c[label, delta]`: number of train items with the label and exactly `delta` neighbours having it
+    - `cn[label, delta]`: the same for train items without the label
+    """
+    n_classes = deltas.shape[1]
+    # flat index of the (label, delta) cell of each (instance, label) pair
+    cells = (np.arange(n_classes) * (k + 1) + deltas).ravel()
+    y = np.asarray(y).ravel()
+    c = np.bincount(cells, weights=y, minlength=n_classes * (k + 1))
+    cn = np.bincount(cells, weights=1 - y, minlength=n_classes * (k + 1))
+    return c.astype(int).reshape(n_classes, k + 1), cn.astype(int).reshape(n_classes, k + 1)
@@ -1,6 +1,7 @@
 import gc
 import itertools as it
 import logging
+import time
 from copy import deepcopy
 from typing import TYPE_CHECKING, Any, TypeVar
 
@@ -9,6 +10,7 @@ from hydra.utils import instantiate
 
 from autointent.configs.node import NodeOptimizerConfig
 from autointent.context import Context
+from autointent.context.optimization_info.data_models import Artifact
 from autointent.nodes.nodes_info import NODES_INFO
 
 if TYPE_CHECKING:
@@ -31,23 +33,25 @@ class NodeOptimizer:
     def fit(self, context: Context) -> None:
         self._logger.info("starting %s node optimization...", self.node_info.node_type)
 
+        # neighbour tables cached in the context are computed once at the largest k that any trial needs
+        context.query_cache.max_k = get_max_k(self.modules_search_spaces)
+
         for search_space in deepcopy(self.modules_search_spaces):
             module_type = search_space.pop("module_type")
+            combinations = [
+                dict(zip(search_space.keys(), params_combination, strict=False))
+                for params_combination in it.product(*search_space.values())
+            ]
+            grid_params = self.node_info.modules_available[module_type].grid_params
 
-            for params_combination in it.product(*search_space.values()):
-                module_kwargs = dict(zip(search_space.keys(), params_combination, strict=False))
-
-                self._logger.debug("initializing %s module...", module_type)
-                module_config = self.node_info.modules_configs[module_type]
-                module: Module = instantiate(module_config, **module_kwargs)
-
-                self._logger.debug("optimizing %s module...", module_type)
-                module.fit(context)
-
-                self._logger.debug("scoring %s module...", module_type)
-                metric_value = module.score(context, self.node_info.metrics_available[self.metric_name])
+            # trials are logged in the order of the search space regardless of grouping
+            results: dict[int, tuple[float, Artifact, dict[str, Any]]] = {}
+            for group in group_combinations(combinations, grid_params):
+                group_results = self._optimize_group(context, module_type, [combinations[i] for i in group])
+                results.update(zip(group, group_results, strict=True))
 
-                assets = module.get_assets()
+            for i, module_kwargs in enumerate(combinations):
+                metric_value, assets, extra_info = results[i]
                 context.optimization_info.log_module_optimization(
                     self.node_info.node_type,
                     module_type,
@@ -55,8 +59,68 @@ class NodeOptimizer:
                     metric_value,
                     self.metric_name,
                     assets,  # retriever name / scores / predictions
+                    extra_info,
                 )
-                module.clear_cache()
-                gc.collect()
-                torch.cuda.empty_cache()
+
+        # the next nodes query other indexes or other k, tables of this node would only hold memory until the run ends
+        context.query_cache.clear()
         self._logger.info("%s node optimization is finished!", self.node_info.node_type)
+
+    def _optimize_group(
+        self, context: Context, module_type: str, combinations: list[dict[str, Any]]
+    ) -> list[tuple[float, Artifact, dict[str, Any]]]:
+        """
+        Fit one module and score it with all combinations, which differ only in `grid_params` of the module.
+        Fit and score times of a group are split evenly between its trials.
+        """
+        self._logger.debug("initializing %s module...", module_type)
+        module_config = self.node_info.modules_configs[module_type]
+        module: Module = instantiate(module_config, **combinations[0])
+
+        self._logger.debug("optimizing %s module...", module_type)
+        start = time.perf_counter()
+        module.fit(context)
+        fit_time = time.perf_counter() - start
+
+        self._logger.debug("scoring %s module with %s parameter combinations...", module_type, len(combinations))
+        metric_fn = self.node_info.metrics_available[self.metric_name]
+        grid = [{name: params[name] for name in module.grid_params if name in params} for params in combinations]
+        start = time.perf_counter()
+        if len(combinations) == 1:
+            scores = [(module.score(context, metric_fn), module.get_assets())]
+        else:
+            scores = module.score_grid(context, metric_fn, grid)
+        score_time = time.perf_counter() - start
+
+        timings = {"fit_time": fit_time / len(combinations), "score_time": score_time / len(combinations)}
+        extra_info = timings | module.get_extra_info()
+        grid_extra_info = module.get_grid_extra_info(grid)
+        module.clear_cache()
+        gc.collect()
+        torch.cuda.empty_cache()
+        return [
+            (metric_value, assets, extra_info | info)
+            for (metric_value, assets), info in zip(scores, grid_extra_info, strict=True)
+        ]
+
+
+def group_combinations(combinations: list[dict[str, Any]], grid_params: tuple[str, ...]) -> list[list[int]]:
+    """
+    Indices of the parameter combinations grouped by values of all parameters except `grid_params`, \
+    groups and indices within them keep the order of `combinations`.
+    """
+    groups: dict[str, list[int]] = {}
+    for i, params in enumerate(combinations):
+        key = repr(sorted((name, value) for name, value in params.items() if name not in grid_params))
+        groups.setdefault(key, []).append(i)
+    return list(groups.values())
+
+
+def get_max_k(search_spaces: list[dict[str, Any]]) -> int:
+    """largest number of neighbours any module from the search spaces retrieves"""
+    res = 0
+    for search_space in search_spaces:
+        k = max(search_space.get("k", [0]))
+        ignored = max(search_space.get("ignore_first_neighbours", [0]))
+        res = max(res, k + ignored)
+    return res
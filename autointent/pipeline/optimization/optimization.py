@@ -138,6 +138,8 @@ def optimization(cfg: OptimizationConfig) -> None:
         db_dir,
         cfg.regex_sampling,
         cfg.seed,
+        cfg.vector_index,
+        cfg.float_dtype,  # type: ignore[arg-type]
     )
 
     # run optimization
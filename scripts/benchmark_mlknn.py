@@ -0,0 +1,85 @@
+"""
+Compare the vectorized MLKnn counting and inference with the former per-row python loops on synthetic data.
+
+    python scripts/benchmark_mlknn.py --n-train 50000 --n-classes 300 --k 10
+"""
+
+import time
+
+import numpy as np
+from numpy.typing import NDArray
+
+from autointent.dtype_policy import dtype_policy
+from autointent.modules.scoring.mlknn.mlknn import MLKnnScorer
+
+
+def compute_cond_loop(
+    scorer: MLKnnScorer, neighbors_labels: NDArray[np.int64], y: NDArray[np.int64]
+) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+    c = np.zeros((scorer._n_classes, scorer.k + 1), dtype=int)
+    cn = np.zeros((scorer._n_classes, scorer.k + 1), dtype=int)
+    for i in range(y.shape[0]):
+        deltas = np.sum(neighbors_labels[i], axis=0).astype(int)
+        idx_helper = np.arange(scorer._n_classes)
+        c[idx_helper, deltas[idx_helper]] += y[i]
+        cn[idx_helper, deltas[idx_helper]] += 1 - y[i]
+    cond_prob_true = (scorer.s + c) / (scorer.s * (scorer.k + 1) + c.sum(axis=1)[:, None])
+    cond_prob_false = (scorer.s + cn) / (scorer.s * (scorer.k + 1) + cn.sum(axis=1)[:, None])
+    return cond_prob_true, cond_prob_false
+
+
+def predict_loop(scorer: MLKnnScorer, neighbors_labels: NDArray[np.int64]) -> NDArray[np.float64]:
+    result = np.zeros((neighbors_labels.shape[0], scorer._n_classes), dtype=float)
+    for instance in range(neighbors_labels.shape[0]):
+        deltas = np.sum(neighbors_labels[instance], axis=0).astype(int)
+        for label in range(scorer._n_classes):
+            p_true = scorer._prior_prob_true[label] * scorer._cond_prob_true[label, deltas[label]]
+            p_false = scorer._prior_prob_false[label] * scorer._cond_prob_false[label, deltas[label]]
+            result[instance, label] = p_true / (p_true + p_false)
+    return result
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    res = fn(*args)
+    return res, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    from argparse import ArgumentParser
+
+    parser = ArgumentParser()
+    parser.add_argument("--n-train", type=int, default=5000)
+    parser.add_argument("--n-test", type=int, default=1000)
+    parser.add_argument("--n-classes", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # the reference loops compute in double precision, results are compared exactly
+    dtype_policy.set_float_dtype("float64")
+
+    rng = np.random.default_rng(args.seed)
+    y = (rng.random((args.n_train, args.n_classes)) < 3 / args.n_classes).astype(int)
+    train_neighbors = y[rng.integers(0, args.n_train, size=(args.n_train, args.k))]
+    test_neighbors = y[rng.integers(0, args.n_train, size=(args.n_test, args.k))]
+
+    scorer = MLKnnScorer(k=args.k)
+    scorer._n_classes = args.n_classes
+    scorer._prior_prob_true, scorer._prior_prob_false = scorer._compute_prior(y)
+
+    expected_cond, loop_fit_time = timed(compute_cond_loop, scorer, train_neighbors, y)
+    cond, fit_time = timed(scorer._compute_cond_from_neighbors, train_neighbors, y)
+    for expected, actual in zip(expected_cond, cond, strict=True):
+        np.testing.assert_array_equal(actual, expected)
+    scorer._cond_prob_true, scorer._cond_prob_false = cond
+
+    expected_probs, loop_predict_time = timed(predict_loop, scorer, test_neighbors)
+    probs, predict_time = timed(scorer._predict_from_neighbors, test_neighbors)
+    np.testing.assert_array_equal(probs, expected_probs)
+
+    print(f"n_train={args.n_train} n_test={args.n_test} n_classes={args.n_classes} k={args.k}, results are identical")
+    print(f"fit counts: loop {loop_fit_time:.3f}s, vectorized {fit_time:.3f}s ({loop_fit_time / fit_time:.0f}x)")
+    print(
+        f"predict:    loop {loop_predict_time:.3f}s, vectorized {predict_time:.3f}s ({loop_predict_time / predict_time:.0f}x)"
+    )
@@ -5,6 +5,7 @@ from uuid import uuid4
 import pytest
 
 from autointent import Context
+from autointent.dtype_policy import dtype_policy
 from autointent.pipeline.optimization.utils import get_run_name, load_data, setup_logging
 from autointent.pipeline.utils import get_db_dir
 
@@ -38,3 +39,11 @@ def context(load_clinic_subset):
         regex_sampling=0,
         seed=0,
     )
+
+
+@pytest.fixture
+def float64_policy():
+    """exact comparisons with reference values computed in double precision"""
+    dtype_policy.set_float_dtype("float64")
+    yield
+    dtype_policy.set_float_dtype("float32")
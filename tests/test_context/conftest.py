@@ -0,0 +1,73 @@
+from collections.abc import Callable
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from autointent.configs.vector_index import VectorIndexConfig
+from autointent.context.vector_index import BaseIndex, VectorIndex
+
+N_UTTERANCES = 300
+N_QUERIES = 30
+DIM = 16
+
+
+class MockEmbeddingFunction:
+    """looks embeddings of utterances up in a dictionary and counts calls"""
+
+    def __init__(self, embeddings: dict[str, np.ndarray]):
+        self.embeddings = embeddings
+        self.n_calls = 0
+
+    def __call__(self, texts):
+        self.n_calls += 1
+        dim = len(next(iter(self.embeddings.values())))
+        return np.array([self.embeddings[text] for text in texts], dtype=np.float32).reshape(len(texts), dim)
+
+
+@pytest.fixture
+def mock_embedding_function() -> type[MockEmbeddingFunction]:
+    return MockEmbeddingFunction
+
+
+@pytest.fixture
+def embeddings() -> dict[str, np.ndarray]:
+    """random embeddings of "utterance {i}" and "query {i}" strings"""
+    rng = np.random.default_rng(0)
+    utterances = [f"utterance {i}" for i in range(N_UTTERANCES)]
+    queries = [f"query {i}" for i in range(N_QUERIES)]
+    return dict(zip(utterances + queries, rng.normal(size=(N_UTTERANCES + N_QUERIES, DIM)), strict=True))
+
+
+@pytest.fixture
+def make_index(embeddings) -> Callable[..., BaseIndex]:
+    """factory of indexes of the given class filled with the first `n_items` utterances labeled `i % 3` (if any)"""
+
+    def make(cls: type[BaseIndex], n_items: int, name: str = "test", **kwargs) -> BaseIndex:
+        index = cls(name, MockEmbeddingFunction(embeddings), multilabel=False, n_classes=3, **kwargs)
+        if n_items > 0:
+            index.add([f"utterance {i}" for i in range(n_items)], [i % 3 for i in range(n_items)])
+        return index
+
+    return make
+
+
+@pytest.fixture
+def make_vector_index(tmp_path, embeddings) -> Callable[..., VectorIndex]:
+    """factory of vector indexes with the given backend, all their embedders look texts up in `embeddings`"""
+
+    def make(backend: str, embedding_function: MockEmbeddingFunction | None = None) -> VectorIndex:
+        vector_index = VectorIndex(str(tmp_path), "cpu", False, 3, VectorIndexConfig(backend=backend))
+        embedding_function = embedding_function if embedding_function is not None else MockEmbeddingFunction(embeddings)
+        vector_index._make_embedding_function = lambda model_name, device: embedding_function  # noqa: ARG005
+        return vector_index
+
+    return make
+
+
+@pytest.fixture
+def train_data() -> SimpleNamespace:
+    """data handler stand-in with the first 200 utterances of `embeddings` labeled `i % 3`"""
+    return SimpleNamespace(
+        utterances_train=[f"utterance {i}" for i in range(200)], labels_train=[i % 3 for i in range(200)]
+    )
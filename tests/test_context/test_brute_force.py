@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from autointent.context.vector_index import BruteForceIndex
+
+
+@pytest.fixture
+def index(make_index):
+    return make_index(BruteForceIndex, 50, chunk_size=7)
+
+
+def test_query_matches_exact_search(index, embeddings):
+    queries = [f"query {i}" for i in range(20)]
+    ids, distances = index.query(queries, k=5)
+
+    train = np.stack([embeddings[f"utterance {i}"] for i in range(50)])
+    query_embeddings = np.stack([embeddings[q] for q in queries])
+    train /= np.linalg.norm(train, axis=1, keepdims=True)
+    query_embeddings /= np.linalg.norm(query_embeddings, axis=1, keepdims=True)
+    similarities = query_embeddings @ train.T
+    expected_ids = np.argsort(-similarities, axis=1)[:, :5]
+    expected_distances = 1 - np.take_along_axis(similarities, expected_ids, axis=1)
+
+    assert ids.shape == (20, 5)
+    np.testing.assert_array_equal(ids, expected_ids)
+    np.testing.assert_allclose(distances, expected_distances, rtol=1e-5, atol=1e-5)
+    np.testing.assert_array_equal(index.get_labels(ids), expected_ids % 3)
+    assert index.get_utterances(ids[:1, :2]) == [[f"utterance {expected_ids[0, 0]}", f"utterance {expected_ids[0, 1]}"]]
+
+
+def test_query_more_than_count(index):
+    ids, distances = index.query(["query 0", "query 1"], k=100)
+    assert ids.shape == (2, 50)
+    assert np.all(np.diff(distances, axis=1) >= 0)
+
+
+def test_get_all(index):
+    assert index.count() == 50
+    assert index.get_all_embeddings().shape == (50, 16)
+    np.testing.assert_array_equal(index.get_all_labels(), np.arange(50) % 3)
+
+
+def test_int8_quantization(make_index):
+    exact = make_index(BruteForceIndex, 50, name="exact")
+    quantized = make_index(BruteForceIndex, 50, name="quantized", quantization="int8")
+
+    queries = [f"query {i}" for i in range(20)]
+    exact_ids, exact_distances = exact.query(queries, k=1)
+    ids, distances = quantized.query(queries, k=1)
+    assert (ids == exact_ids).mean() > 0.9
+    np.testing.assert_allclose(distances, exact_distances, atol=0.05)
+    np.testing.assert_allclose(quantized.get_all_embeddings(), exact.get_all_embeddings(), atol=0.05)
+
+
+def test_chunked_query(index):
+    queries = [f"query {i}" for i in range(20)]
+    ids, distances = index.query(queries, k=5)
+
+    index.query_chunk_size = 3
+    chunked_ids, chunked_distances = index.query(queries, k=5)
+    np.testing.assert_array_equal(chunked_ids, ids)
+    np.testing.assert_allclose(chunked_distances, distances, rtol=1e-5)
+
+    starts = [start for start, _, _ in index.iter_query(queries, k=5)]
+    assert starts == list(range(0, 20, 3))
+
+    labels, label_distances = index.query_labels(queries, k=5)
+    np.testing.assert_array_equal(labels, index.get_labels(ids))
+    np.testing.assert_allclose(label_distances, distances, rtol=1e-5)
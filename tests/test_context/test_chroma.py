@@ -0,0 +1,62 @@
+import numpy as np
+from chromadb import PersistentClient
+
+from autointent.context.vector_index import ChromaIndex
+from autointent.context.vector_index.vector_index import get_fingerprint, get_params_name
+
+
+def test_hnsw_params(tmp_path, mock_embedding_function):
+    rng = np.random.default_rng(0)
+    utterances = [f"utterance {i}" for i in range(20)]
+    embedding_function = mock_embedding_function(dict(zip(utterances, rng.normal(size=(20, 8)), strict=True)))
+
+    client = PersistentClient(path=str(tmp_path))
+    index = ChromaIndex(
+        "test",
+        embedding_function,
+        False,
+        2,
+        client,
+        str(tmp_path),
+        hnsw_m=8,
+        hnsw_construction_ef=50,
+        hnsw_search_ef=20,
+    )
+    index.add(utterances, [i % 2 for i in range(20)])
+
+    assert index._collection.metadata["hnsw:M"] == 8
+    assert index._collection.metadata["hnsw:search_ef"] == 20
+    ids, _ = index.query(utterances[:5], k=1)
+    np.testing.assert_array_equal(ids[:, 0], np.arange(5))
+    expected = np.stack([embedding_function.embeddings[u] for u in utterances])
+    np.testing.assert_allclose(
+        index.get_all_embeddings(), expected / np.linalg.norm(expected, axis=1, keepdims=True), rtol=1e-6
+    )
+
+
+def test_params_name():
+    assert get_params_name("model", {"hnsw_m": 8}) == get_params_name("model", {"hnsw_m": 8})
+    assert get_params_name("model", {"hnsw_m": 8}) != get_params_name("model", {"hnsw_m": 16})
+
+
+def test_fingerprint_is_persisted(tmp_path, mock_embedding_function):
+    embedding_function = mock_embedding_function({"hello": np.ones(4)})
+    client = PersistentClient(path=str(tmp_path))
+    index = ChromaIndex("test", embedding_function, False, 2, client, str(tmp_path))
+    assert index.fingerprint is None
+
+    index.add(["hello"], [1])
+    index.set_fingerprint("abc")
+    assert ChromaIndex("test", embedding_function, False, 2, client, str(tmp_path)).fingerprint == "abc"
+
+    index.delete()
+    assert ChromaIndex("test", embedding_function, False, 2, client, str(tmp_path)).fingerprint is None
+
+
+def test_get_fingerprint():
+    fingerprint = get_fingerprint("model", ["a", "b"], [0, 1])
+    assert fingerprint == get_fingerprint("model", ["a", "b"], [0, 1])
+    assert fingerprint != get_fingerprint("other-model", ["a", "b"], [0, 1])
+    assert fingerprint != get_fingerprint("model", ["a", "c"], [0, 1])
+    assert fingerprint != get_fingerprint("model", ["a", "b"], [1, 1])
+    assert get_fingerprint("model", ["a"], [[0, 1]]) != get_fingerprint("model", ["a"], [[1, 0]])
@@ -3,13 +3,7 @@ from unittest.mock import Mock
 import pytest
 
 from autointent.context.data_handler import DataHandler
-from autointent.context.vector_index import (
-    VectorIndex,
-    _multiclass_labels_as_metadata,
-    _multiclass_metadata_as_labels,
-    _multilabel_labels_as_metadata,
-    _multilabel_metadata_as_labels,
-)
+from autointent.context.vector_index import VectorIndex
 
 
 @pytest.fixture
@@ -30,53 +24,3 @@ def test_vector_index_initialization():
     assert index.device == "cpu"
     assert index.multilabel is False
     assert index.n_classes == 2
-
-
-def test_metadata_as_labels_multiclass(vector_index):
-    metadata = [{"intent_id": 0}, {"intent_id": 1}, {"intent_id": 0}]
-    labels = vector_index.metadata_as_labels(metadata)
-    assert labels == [0, 1, 0]
-
-
-def test_metadata_as_labels_multilabel(tmp_path):
-    index = VectorIndex(db_dir=str(tmp_path), device="cpu", multilabel=True, n_classes=3)
-    metadata = [{"0": 1, "1": 0, "2": 1}, {"0": 0, "1": 1, "2": 0}]
-    labels = index.metadata_as_labels(metadata)
-    assert labels == [[1, 0, 1], [0, 1, 0]]
-
-
-def test_labels_as_metadata_multiclass(vector_index):
-    labels = [0, 1, 0]
-    metadata = vector_index.labels_as_metadata(labels)
-    assert metadata == [{"intent_id": 0}, {"intent_id": 1}, {"intent_id": 0}]
-
-
-def test_labels_as_metadata_multilabel():
-    index = VectorIndex(db_dir="/tmp/test_db", device="cpu", multilabel=True, n_classes=3)
-    labels = [[1, 0, 1], [0, 1, 0]]
-    metadata = index.labels_as_metadata(labels)
-    assert metadata == [{"0": 1, "1": 0, "2": 1}, {"0": 0, "1": 1, "2": 0}]
-
-
-def test_multiclass_labels_as_metadata():
-    labels = [0, 1, 2]
-    metadata = _multiclass_labels_as_metadata(labels)
-    assert metadata == [{"intent_id": 0}, {"intent_id": 1}, {"intent_id": 2}]
-
-
-def test_multilabel_labels_as_metadata():
-    labels = [[1, 0, 1], [0, 1, 0]]
-    metadata = _multilabel_labels_as_metadata(labels)
-    assert metadata == [{"0": 1, "1": 0, "2": 1}, {"0": 0, "1": 1, "2": 0}]
-
-
-def test_multiclass_metadata_as_labels():
-    metadata = [{"intent_id": 0}, {"intent_id": 1}, {"intent_id": 2}]
-    labels = _multiclass_metadata_as_labels(metadata)
-    assert labels == [0, 1, 2]
-
-
-def test_multilabel_metadata_as_labels():
-    metadata = [{"0": 1, "1": 0, "2": 1}, {"0": 0, "1": 1, "2": 0}]
-    labels = _multilabel_metadata_as_labels(metadata, 3)
-    assert labels == [[1, 0, 1], [0, 1, 0]]
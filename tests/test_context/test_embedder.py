@@ -0,0 +1,53 @@
+import numpy as np
+
+from autointent.context.embedder import EmbeddingProcessPool, encode_bucketed
+
+
+class MockTokenizer:
+    def __call__(self, texts, add_special_tokens=True):  # noqa: ARG002
+        return {"input_ids": [text.split() for text in texts]}
+
+
+class MockModel:
+    def __init__(self):
+        self.tokenizer = MockTokenizer()
+        self.max_seq_length = 512
+        self.batches = []
+
+    def encode(self, texts, batch_size, convert_to_numpy, normalize_embeddings):  # noqa: ARG002
+        self.batches.append((texts, self.max_seq_length))
+        return np.array([[len(text.split()), len(text)] for text in texts], dtype=np.float32)
+
+
+def test_encode_bucketed():
+    texts = ["a", "a b c d e", "a b", "a b c d e f g h", "a b c", "a"]
+    model = MockModel()
+
+    res = encode_bucketed(model, texts, batch_size=2)
+
+    expected = np.array([[len(text.split()), len(text)] for text in texts], dtype=np.float32)
+    np.testing.assert_array_equal(res, expected)
+    assert [batch for batch, _ in model.batches] == [["a b c d e f g h", "a b c d e"], ["a b c", "a b"], ["a", "a"]]
+
+
+def test_max_seq_length_is_restored():
+    model = MockModel()
+    encode_bucketed(model, ["a b c", "a"], batch_size=8, max_seq_length=2)
+    assert model.batches[0][1] == 2
+    assert model.max_seq_length == 512
+
+
+def load_mock_model(model_name, device):  # noqa: ARG001
+    return MockModel()
+
+
+def test_process_pool_keeps_order():
+    texts = [" ".join("a" * (i % 7 + 1)) for i in range(50)]
+    pool = EmbeddingProcessPool("mock", n_workers=2, n_threads=1, loader=load_mock_model)
+    try:
+        res = pool.encode(texts, batch_size=4)
+    finally:
+        pool.close()
+
+    expected = np.array([[len(text.split()), len(text)] for text in texts], dtype=np.float32)
+    np.testing.assert_array_equal(res, expected)
@@ -0,0 +1,105 @@
+import gc
+import weakref
+
+import numpy as np
+from torch import nn
+
+from autointent.context import embedding_cache
+from autointent.context.embedding_cache import CachedEmbeddingFunction, EmbeddingCache, hash_text
+from autointent.context.model_pool import ModelPool, get_model_size
+
+
+def test_hash_text_normalization():
+    assert hash_text("hello world") == hash_text("  hello world\n")
+    assert hash_text("café") == hash_text("café")
+    assert hash_text("hello world") != hash_text("hello  world")
+
+
+def test_lookup_missing(tmp_path):
+    cache = EmbeddingCache("bert-base-uncased", "unknown", tmp_path)
+    assert len(cache) == 0
+    assert cache.lookup([hash_text("Hello")]) == [None]
+
+
+def test_update_persists(tmp_path):
+    keys = [hash_text("Hello"), hash_text("Goodbye")]
+    embeddings = np.array([[0.1, 0.2, 0.3], [0.4, 0.5, 0.6]], dtype=np.float32)
+
+    cache = EmbeddingCache("sergeyzh/rubert-tiny-turbo", "rev1", tmp_path)
+    cache.update(keys, embeddings)
+
+    restored = EmbeddingCache("sergeyzh/rubert-tiny-turbo", "rev1", tmp_path)
+    assert len(restored) == 2
+    np.testing.assert_array_equal(np.stack(restored.lookup(keys)), embeddings)
+
+    other_revision = EmbeddingCache("sergeyzh/rubert-tiny-turbo", "rev2", tmp_path)
+    assert other_revision.lookup(keys) == [None, None]
+
+
+def test_shards_are_compacted_on_load(tmp_path):
+    rng = np.random.default_rng(0)
+    keys = [hash_text(f"text {i}") for i in range(10)]
+    embeddings = rng.normal(size=(10, 4)).astype(np.float32)
+
+    cache = EmbeddingCache("bert-base-uncased", "rev1", tmp_path)
+    concurrent_cache = EmbeddingCache("bert-base-uncased", "rev1", tmp_path)
+    for start in range(0, 10, 3):
+        cache.update(keys[start : start + 3], embeddings[start : start + 3])
+    # the same text embedded by a concurrent run
+    concurrent_cache.update(keys[:1], embeddings[:1])
+    assert len(list(cache.path.glob("*.embeddings.npy"))) == 5
+
+    restored = EmbeddingCache("bert-base-uncased", "rev1", tmp_path)
+    assert len(list(cache.path.glob("*.embeddings.npy"))) == 1
+    assert len(list(cache.path.iterdir())) == 2
+    assert len(restored) == 10
+    assert isinstance(restored.lookup(keys[:1])[0].base, np.memmap)
+    np.testing.assert_array_equal(np.stack(restored.lookup(keys)), embeddings)
+    np.testing.assert_array_equal(
+        np.stack(EmbeddingCache("bert-base-uncased", "rev1", tmp_path).lookup(keys)), embeddings
+    )
+
+
+def test_evicted_model_is_freed(tmp_path, monkeypatch):
+    loaded = []
+
+    def loader(model_name, device, **kwargs):  # noqa: ARG001
+        model = nn.Sequential(nn.Linear(10, 10))
+        loaded.append(weakref.ref(model))
+        return model
+
+    def encode(model, texts, **kwargs):  # noqa: ARG001
+        return np.zeros((len(texts), 10), dtype=np.float32)
+
+    model_size = get_model_size(loader("", ""))
+    loaded.clear()
+    pool = ModelPool(memory_limit=model_size, loader=loader)
+    monkeypatch.setattr(embedding_cache, "model_pool", pool)
+    monkeypatch.setattr(embedding_cache, "encode_bucketed", encode)
+
+    embedding_functions = [CachedEmbeddingFunction(name, cache_dir=tmp_path) for name in ["a", "b", "c"]]
+    gc.collect()
+    # embedding functions keep no references to evicted models
+    assert len(pool) == 1
+    assert [ref() is not None for ref in loaded] == [False, False, True]
+
+    # a model evicted from the pool is loaded again when it is needed
+    embedding_functions[0](["hello"])
+    assert ("a", "cpu") in pool
+    assert len(loaded) == 4
+
+
+def test_returns_float32_arrays(tmp_path, monkeypatch):
+    def encode(model, texts, **kwargs):  # noqa: ARG001
+        return np.ones((len(texts), 10), dtype=np.float32)
+
+    pool = ModelPool(loader=lambda model_name, device, **kwargs: nn.Sequential(nn.Linear(10, 10)))  # noqa: ARG005
+    monkeypatch.setattr(embedding_cache, "model_pool", pool)
+    monkeypatch.setattr(embedding_cache, "encode_bucketed", encode)
+    embed = CachedEmbeddingFunction("a", cache_dir=tmp_path)
+
+    embeddings = embed(["hello", "world"])
+    assert isinstance(embeddings, np.ndarray)
+    assert embeddings.dtype == np.float32
+    assert embeddings.shape == (2, 10)
+    assert embed([]).shape == (0, 10)
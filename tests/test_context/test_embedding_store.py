@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from autointent.context.vector_index import EmbeddingStore
+
+
+def test_empty_store(tmp_path):
+    store = EmbeddingStore(tmp_path / "model.embeddings.npy")
+    assert len(store) == 0
+
+
+def test_add_and_get(tmp_path):
+    embeddings = np.random.default_rng(0).normal(size=(10, 4))
+
+    store = EmbeddingStore(tmp_path / "model.embeddings.npy")
+    store.add(embeddings[:6])
+    store.add(embeddings[6:])
+
+    restored = EmbeddingStore(tmp_path / "model.embeddings.npy")
+    res = restored.get()
+    assert isinstance(res, np.memmap)
+    assert res.dtype == np.float32
+    np.testing.assert_allclose(res, embeddings.astype(np.float32))
+    with pytest.raises(ValueError, match="read-only"):
+        res[0, 0] = 1
+
+
+def test_delete(tmp_path):
+    store = EmbeddingStore(tmp_path / "model.embeddings.npy")
+    store.add(np.ones((2, 3)))
+    store.delete()
+    assert len(store) == 0
+    assert not (tmp_path / "model.embeddings.npy").exists()
@@ -0,0 +1,57 @@
+import numpy as np
+
+from autointent.configs.vector_index import VectorIndexConfig
+from autointent.context import Context
+from autointent.context.hashed_embedding import HASHED_CHAR_NGRAMS_MODEL, HashedCharNgramEmbeddingFunction
+from autointent.metrics import retrieval_hit_rate
+from autointent.modules import VectorDBModule
+
+
+def test_embeddings_are_normalized_and_deterministic():
+    embed = HashedCharNgramEmbeddingFunction(dim=64)
+    embeddings = np.array(embed(["book a flight to paris", "Book a flight to Paris", "what is my balance"]))
+
+    assert embeddings.shape == (3, 64)
+    np.testing.assert_allclose(np.linalg.norm(embeddings, axis=1), 1, rtol=1e-5)
+    np.testing.assert_allclose(embeddings[0], embeddings[1])
+    np.testing.assert_allclose(
+        embeddings,
+        np.array(
+            HashedCharNgramEmbeddingFunction(dim=64)(
+                ["book a flight to paris", "Book a flight to Paris", "what is my balance"]
+            )
+        ),
+    )
+
+
+def test_returns_float32_arrays():
+    embed = HashedCharNgramEmbeddingFunction(dim=64)
+    assert embed(["hello"]).dtype == np.float32
+    assert embed([]).shape == (0, 64)
+
+
+def test_similar_texts_are_closer():
+    embeddings = np.array(HashedCharNgramEmbeddingFunction()(["cancel my order", "cancel the order", "weather today"]))
+    assert embeddings[0] @ embeddings[1] > embeddings[0] @ embeddings[2]
+
+
+def test_retrieval_without_download(tmp_path, load_clinic_subset):
+    context = Context(
+        multiclass_intent_records=load_clinic_subset,
+        multilabel_utterance_records=[],
+        test_utterance_records=[],
+        device="cpu",
+        mode="multiclass",
+        multilabel_generation_config="",
+        db_dir=str(tmp_path),
+        regex_sampling=0,
+        seed=0,
+        vector_index_config=VectorIndexConfig(backend="brute_force"),
+    )
+    module = VectorDBModule(k=5, model_name=HASHED_CHAR_NGRAMS_MODEL)
+    module.fit(context)
+    assert module.collection.count() == len(context.data_handler.utterances_train)
+    assert module.score(context, retrieval_hit_rate) > 0.5
+
+    ids, _ = module.collection.query(context.data_handler.utterances_train[:3], k=1)
+    np.testing.assert_array_equal(ids[:, 0], np.arange(3))
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+from chromadb import PersistentClient
+
+from autointent.context.vector_index import BruteForceIndex, ChromaIndex, IVFIndex, PQIndex
+
+
+def make_backend(make_index, backend, n_items, tmp_path, **kwargs):
+    if backend == "chroma":
+        return make_index(
+            ChromaIndex, n_items, client=PersistentClient(path=str(tmp_path)), db_dir=str(tmp_path), **kwargs
+        )
+    if backend == "pq":
+        return make_index(PQIndex, n_items, db_dir=str(tmp_path), **kwargs)
+    return make_index({"brute_force": BruteForceIndex, "ivf": IVFIndex}[backend], n_items, **kwargs)
+
+
+@pytest.mark.parametrize("backend", ["chroma", "brute_force", "ivf", "pq"])
+def test_stored_and_query_embeddings_match(tmp_path, make_index, backend):
+    index = make_backend(make_index, backend, 100, tmp_path)
+
+    # scorers train on stored embeddings and predict on query embeddings, both must be L2-normalized
+    stored = index.get_all_embeddings()
+    np.testing.assert_allclose(np.linalg.norm(stored, axis=1), 1, rtol=1e-5)
+    np.testing.assert_allclose(stored, index.embed([f"utterance {i}" for i in range(100)]), rtol=1e-5, atol=1e-6)
+
+
+@pytest.mark.parametrize(
+    ("backend", "kwargs"),
+    [
+        ("chroma", {"quantization": "int8"}),
+        ("brute_force", {"quantization": "int8"}),
+        ("ivf", {"quantization": "float16"}),
+        ("pq", {}),
+    ],
+)
+def test_dim(tmp_path, make_index, backend, kwargs):
+    assert make_backend(make_index, backend, 0, tmp_path, **kwargs).dim == 0
+    assert make_backend(make_index, backend, 100, tmp_path / "filled", **kwargs).dim == 16
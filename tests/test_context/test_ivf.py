@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from autointent.context.vector_index import BruteForceIndex, IVFIndex, search_recall
+
+
+@pytest.mark.parametrize("quantization", ["none", "int8"])
+def test_all_lists_probed_is_exact(make_index, quantization):
+    queries = [f"query {i}" for i in range(30)]
+    ivf = make_index(IVFIndex, 200, n_lists=10, nprobe=10, quantization=quantization)
+    exact = make_index(BruteForceIndex, 200, quantization=quantization)
+
+    ids, distances = ivf.query(queries, k=5)
+    expected_ids, expected_distances = exact.query(queries, k=5)
+    np.testing.assert_array_equal(ids, expected_ids)
+    np.testing.assert_allclose(distances, expected_distances, rtol=1e-5, atol=1e-5)
+    np.testing.assert_array_equal(ivf.get_labels(ids), expected_ids % 3)
+
+
+def test_recall_grows_with_nprobe(make_index, embeddings):
+    queries = np.stack([embeddings[f"query {i}"] for i in range(30)]).astype(np.float32)
+    recalls = []
+    for nprobe in [1, 4, 16]:
+        index = make_index(IVFIndex, 200, n_lists=16, nprobe=nprobe)
+        ids, distances = index.query(queries, k=10)
+        assert np.all(np.diff(distances, axis=1) >= 0)
+        recalls.append(search_recall(index, queries, ids))
+    assert recalls[0] < 1.0
+    assert recalls == sorted(recalls)
+    assert recalls[-1] == 1.0
+
+
+def test_small_lists_fall_back_to_exact_search(make_index):
+    index = make_index(IVFIndex, 200, n_lists=50, nprobe=1)
+    ids, _ = index.query(["query 0", "query 1"], k=20)
+    assert ids.shape == (2, 20)
+    assert len(np.unique(ids[0])) == 20
+
+
+def test_get_all_keeps_row_order(make_index, embeddings):
+    index = make_index(IVFIndex, 200, n_lists=8)
+    expected = np.stack([embeddings[f"utterance {i}"] for i in range(200)])
+    expected /= np.linalg.norm(expected, axis=1, keepdims=True)
+    np.testing.assert_allclose(index.get_all_embeddings(), expected, rtol=1e-5, atol=1e-6)
+    np.testing.assert_array_equal(index.get_all_labels(), np.arange(200) % 3)
+    assert index.get_utterances(np.array([[0, 199]])) == [["utterance 0", "utterance 199"]]
+
+
+def test_exact_backend_recall(make_index):
+    index = make_index(BruteForceIndex, 200)
+    assert search_recall(index, np.zeros((2, 16), dtype=np.float32), np.zeros((2, 3), dtype=np.int64)) == 1.0
+
+
+def test_recall_on_a_sample_of_queries(make_index, embeddings):
+    queries = np.stack([embeddings[f"query {i}"] for i in range(30)]).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    index = make_index(IVFIndex, 200, n_lists=16, nprobe=1, quantization="int8")
+    ids, _ = index.query(queries, k=10)
+
+    full = search_recall(index, queries, ids)
+    exact_ids = BruteForceIndex.search(make_index(BruteForceIndex, 200, quantization="int8"), queries, 10)[0]
+    assert full == np.mean([len(np.intersect1d(a, b)) for a, b in zip(exact_ids, ids, strict=True)]) / 10
+    assert 0 < search_recall(index, queries, ids, max_queries=5) <= 1
+
+
+@pytest.mark.parametrize(("quantization", "exact"), [("none", True), ("float16", False), ("int8", False)])
+def test_quantized_brute_force_is_not_exact(make_index, quantization, exact):
+    assert make_index(BruteForceIndex, 10, quantization=quantization).exact is exact
@@ -0,0 +1,33 @@
+import numpy as np
+
+from autointent.context.vector_index import LabelStore
+
+
+def test_multiclass_labels():
+    store = LabelStore(multilabel=False, n_classes=3)
+    store.add([0, 1, 2])
+    store.add([2])
+    assert len(store) == 4
+    np.testing.assert_array_equal(store.get(np.array([[3, 0], [1, 1]])), np.array([[2, 0], [1, 1]]))
+
+
+def test_multilabel_labels():
+    labels = np.random.default_rng(0).integers(0, 2, size=(20, 11))
+    store = LabelStore(multilabel=True, n_classes=11)
+    store.add(labels.tolist())
+    assert len(store) == 20
+
+    ids = np.array([[4, 2, 19], [0, 0, 7]])
+    res = store.get(ids)
+    assert res.shape == (2, 3, 11)
+    np.testing.assert_array_equal(res, labels[ids])
+
+
+def test_save_load(tmp_path):
+    store = LabelStore(multilabel=True, n_classes=3)
+    store.add([[1, 0, 1], [0, 1, 1]])
+    store.save(tmp_path / "labels.npy")
+
+    restored = LabelStore(multilabel=True, n_classes=3)
+    restored.load(tmp_path / "labels.npy")
+    np.testing.assert_array_equal(restored.get(np.arange(2)), np.array([[1, 0, 1], [0, 1, 1]]))
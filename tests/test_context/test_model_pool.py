@@ -0,0 +1,36 @@
+from torch import nn
+
+from autointent.context.model_pool import ModelPool, get_model_size
+
+
+def fake_loader(model_name: str, device: str, **kwargs) -> nn.Module:  # noqa: ARG001
+    return nn.Linear(10, 10)
+
+
+def test_same_instance_is_shared():
+    pool = ModelPool(loader=fake_loader)
+    model = pool.get("bert-base-uncased", "cpu")
+    assert pool.get("bert-base-uncased", "cpu") is model
+    assert pool.get("bert-base-uncased", "cuda:0") is not model
+    assert len(pool) == 2
+
+
+def test_lru_eviction():
+    model_size = get_model_size(fake_loader("", ""))
+    pool = ModelPool(memory_limit=2 * model_size, loader=fake_loader)
+    pool.get("a", "cpu")
+    pool.get("b", "cpu")
+    pool.get("a", "cpu")  # now "b" is the least recently used
+    pool.get("c", "cpu")
+    assert ("a", "cpu") in pool
+    assert ("b", "cpu") not in pool
+    assert ("c", "cpu") in pool
+    assert pool.memory_usage() == 2 * model_size
+
+
+def test_requested_model_is_never_evicted():
+    pool = ModelPool(memory_limit=0, loader=fake_loader)
+    pool.get("a", "cpu")
+    pool.get("b", "cpu")
+    assert len(pool) == 1
+    assert ("b", "cpu") in pool
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from autointent.context.vector_index import BruteForceIndex, PQIndex, ProductQuantizer, search_recall
+
+
+def test_product_quantizer_adc():
+    rng = np.random.default_rng(0)
+    embeddings = rng.normal(size=(500, 12)).astype(np.float32)
+    queries = rng.normal(size=(5, 12)).astype(np.float32)
+    quantizer = ProductQuantizer(n_subvectors=5, n_centroids=16).fit(embeddings)
+    codes = quantizer.encode(embeddings)
+
+    assert codes.shape == (500, 5)
+    assert codes.dtype == np.uint8
+    assert codes.max() < 16
+    decoded = quantizer.decode(codes)
+    assert np.mean((decoded - embeddings) ** 2) < np.mean(embeddings**2)
+    np.testing.assert_allclose(quantizer.dot(queries, codes), queries @ decoded.T, rtol=1e-4, atol=1e-4)
+
+
+def test_exact_codebooks_are_lossless(tmp_path, embeddings, mock_embedding_function):
+    # with fewer items than codebook entries every item is its own centroid
+    index = PQIndex("test", mock_embedding_function(embeddings), False, 3, str(tmp_path), pq_subvectors=4)
+    index.add([f"utterance {i}" for i in range(200)], [i % 3 for i in range(200)])
+    exact = BruteForceIndex("exact", mock_embedding_function(embeddings), False, 3)
+    exact.add([f"utterance {i}" for i in range(200)], [i % 3 for i in range(200)])
+
+    queries = [f"query {i}" for i in range(20)]
+    ids, distances = index.query(queries, k=5)
+    expected_ids, expected_distances = exact.query(queries, k=5)
+    np.testing.assert_array_equal(ids, expected_ids)
+    np.testing.assert_allclose(distances, expected_distances, rtol=1e-4, atol=1e-4)
+
+
+def test_rerank_improves_recall(tmp_path, embeddings, make_index):
+    queries = np.stack([embeddings[f"query {i}"] for i in range(20)]).astype(np.float32)
+    recalls = {}
+    for rerank in [0, 100]:
+        index = make_index(PQIndex, 300, db_dir=str(tmp_path), pq_subvectors=4, pq_centroids=8, rerank=rerank)
+        ids, distances = index.query(queries, k=5)
+        assert ids.shape == (20, 5)
+        assert np.all(np.diff(distances, axis=1) >= -1e-6)
+        recalls[rerank] = search_recall(index, queries, ids)
+    assert recalls[0] < recalls[100]
+    assert recalls[100] > 0.9
+
+
+@pytest.mark.parametrize("rerank", [1, 5])
+def test_small_rerank_returns_exact_distances(tmp_path, make_index, rerank):
+    queries = [f"query {i}" for i in range(20)]
+    index = make_index(PQIndex, 300, db_dir=str(tmp_path), pq_subvectors=4, pq_centroids=8, rerank=rerank)
+    ids, distances = index.query(queries, k=5)
+
+    stored = index.get_all_embeddings()
+    expected = 1 - np.einsum("qd,qkd->qk", index.embed(queries), stored[ids])
+    np.testing.assert_allclose(distances, expected, rtol=1e-5, atol=1e-5)
+
+
+def test_float_store(tmp_path, embeddings, make_index, mock_embedding_function):
+    index = make_index(PQIndex, 300, db_dir=str(tmp_path), pq_subvectors=4, pq_centroids=8, rerank=20)
+    expected = np.stack([embeddings[f"utterance {i}"] for i in range(300)])
+    expected /= np.linalg.norm(expected, axis=1, keepdims=True)
+    np.testing.assert_allclose(index.get_all_embeddings(), expected, rtol=1e-5, atol=1e-6)
+    assert isinstance(index.get_all_embeddings(), np.memmap)
+    np.testing.assert_array_equal(index.get_all_labels(), np.arange(300) % 3)
+
+    # an index with the same name starts empty
+    assert len(PQIndex("test", mock_embedding_function(embeddings), False, 3, str(tmp_path)).get_all_embeddings()) == 0
+
+    index = make_index(PQIndex, 300, db_dir=str(tmp_path))
+    index.delete()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_invalid_codebook_size(tmp_path, embeddings, mock_embedding_function):
+    with pytest.raises(ValueError, match="pq_centroids"):
+        PQIndex("test", mock_embedding_function(embeddings), False, 3, str(tmp_path), pq_centroids=1000)
@@ -0,0 +1,71 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from autointent.context.vector_index import EmbeddingStore, quantization
+from autointent.context.vector_index.quantization import QuantizedEmbeddings, quantization_recall
+
+
+@pytest.fixture
+def embeddings():
+    x = np.random.default_rng(0).normal(size=(500, 32)).astype(np.float32)
+    return x / np.linalg.norm(x, axis=1, keepdims=True)
+
+
+@pytest.mark.parametrize(("quantization", "ratio"), [("none", 1), ("float16", 2), ("int8", 4)])
+def test_quantize(embeddings, quantization, ratio):
+    quantized = QuantizedEmbeddings.quantize(embeddings, quantization)
+    assert embeddings.nbytes / quantized.nbytes == pytest.approx(ratio, rel=0.05)
+    np.testing.assert_allclose(quantized.dequantize(), embeddings, atol=1e-2)
+
+
+@pytest.mark.parametrize("quantization", ["float16", "int8"])
+def test_dot_on_quantized_form(embeddings, quantization):
+    quantized = QuantizedEmbeddings.quantize(embeddings, quantization)
+    quantized.block_size = 64
+    queries = embeddings[:10]
+    np.testing.assert_allclose(quantized.dot(queries), queries @ quantized.dequantize().T, atol=1e-5)
+    assert quantization_recall(embeddings, quantized) > 0.9
+
+
+@pytest.mark.parametrize("quantization_type", ["none", "int8"])
+def test_search_in_blocks(embeddings, quantization_type, monkeypatch):
+    quantized = QuantizedEmbeddings.quantize(embeddings, quantization_type)
+    queries = embeddings[:10]
+    expected = np.argsort(-quantized.dot(queries), axis=1, kind="stable")[:, :5]
+
+    # 10 queries by 64 rows per block
+    monkeypatch.setattr(quantization, "SEARCH_BLOCK_BYTES", 10 * 64 * 4)
+    ids, similarities = quantized.search(queries, k=5)
+    np.testing.assert_array_equal(ids, expected)
+    np.testing.assert_allclose(similarities, np.take_along_axis(quantized.dot(queries), expected, axis=1), rtol=1e-6)
+    assert quantization_recall(embeddings, QuantizedEmbeddings(embeddings)) == 1.0
+
+
+def test_quantized_store(tmp_path, embeddings):
+    store = EmbeddingStore(tmp_path / "model.embeddings.npy", quantization="int8")
+    store.add(embeddings[:200])
+    store.add(embeddings[200:])
+
+    restored = EmbeddingStore(tmp_path / "model.embeddings.npy", quantization="int8")
+    assert len(restored) == 500
+    assert restored.nbytes < embeddings.nbytes / 3
+    np.testing.assert_allclose(restored.get(), embeddings, atol=1e-2)
+
+    restored.delete()
+    assert not restored.scale_path.exists()
+
+
+def test_recall_memory_is_bounded(monkeypatch):
+    x = np.random.default_rng(0).normal(size=(20000, 32)).astype(np.float32)
+    x /= np.linalg.norm(x, axis=1, keepdims=True)
+    quantized = QuantizedEmbeddings.quantize(x, "int8")
+    monkeypatch.setattr(quantization, "SEARCH_BLOCK_BYTES", 1024 * 1024)
+
+    tracemalloc.start()
+    quantization_recall(x, quantized)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # a full (n_queries, n_samples) similarity matrix alone would take 16 MB
+    assert peak < 8 * 1024 * 1024
@@ -0,0 +1,70 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from autointent.context.query_cache import QueryCache
+from autointent.context.vector_index import BruteForceIndex, IVFIndex
+
+
+@pytest.fixture
+def setup(mock_embedding_function):
+    rng = np.random.default_rng(0)
+    train = [f"utterance {i}" for i in range(30)]
+    test = [f"test {i}" for i in range(10)]
+    oos = [f"oos {i}" for i in range(4)]
+    embedding_function = mock_embedding_function(dict(zip(train + test + oos, rng.normal(size=(44, 8)), strict=True)))
+
+    index = BruteForceIndex("test", embedding_function, multilabel=False, n_classes=3)
+    index.add(train, [i % 3 for i in range(30)])
+    data_handler = SimpleNamespace(utterances_test=test, oos_utterances=oos)
+    return QueryCache(data_handler), index, embedding_function
+
+
+def test_neighbours_are_sliced_from_max_k(setup):
+    cache, index, embedding_function = setup
+    cache.max_k = 10
+    n_calls = embedding_function.n_calls
+
+    for k in [1, 3, 5, 10]:
+        neighbours = cache.get_neighbours(index, "test", k)
+        ids, distances = index.query(cache.get_utterances("test"), k)
+        np.testing.assert_array_equal(neighbours.ids, ids)
+        np.testing.assert_allclose(neighbours.distances, distances)
+        np.testing.assert_array_equal(neighbours.labels, index.get_labels(ids))
+
+    # one query for the cached table plus one for each reference query above
+    assert embedding_function.n_calls == n_calls + 5
+
+
+def test_larger_k_recomputes(setup):
+    cache, index, _ = setup
+    cache.max_k = 3
+    assert cache.get_neighbours(index, "oos", 3).k == 3
+    assert cache.get_neighbours(index, "oos", 5).k == 5
+    assert cache.get_neighbours(index, "oos", 100).k == 30
+
+
+def test_query_embeddings_are_computed_once(setup):
+    cache, index, embedding_function = setup
+    cache.max_k = 5
+    n_calls = embedding_function.n_calls
+
+    embeddings = cache.get_embeddings(index, "test")
+    np.testing.assert_allclose(embeddings, index.embed(cache.get_utterances("test")))
+    cache.get_neighbours(index, "test", 5)
+    cache.get_neighbours(index, "test", 10)
+    assert cache.get_embeddings(index, "test") is embeddings
+
+    # one call for the cached embeddings and one for the reference above
+    assert embedding_function.n_calls == n_calls + 2
+
+
+def test_neighbours_depend_on_search_params(make_index):
+    cache = QueryCache(SimpleNamespace(utterances_test=[f"query {i}" for i in range(30)]))
+    index = make_index(IVFIndex, 200, n_lists=16, nprobe=1)
+    approximate = cache.get_neighbours(index, "test", 10)
+    index.set_search_params(nprobe=16)
+    exact = cache.get_neighbours(index, "test", 10)
+    assert not np.array_equal(approximate.ids, exact.ids)
+    np.testing.assert_array_equal(exact.ids, index.query(cache.get_utterances("test"), 10)[0])
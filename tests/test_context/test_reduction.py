@@ -0,0 +1,59 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from sklearn.decomposition import PCA
+
+from autointent.context.vector_index import DimReduction
+
+
+@pytest.fixture
+def embeddings():
+    return np.random.default_rng(0).normal(size=(100, 16)).astype(np.float32)
+
+
+def test_pca(embeddings):
+    reduction = DimReduction("pca", 4).fit(embeddings)
+    res = reduction.transform(embeddings[:10])
+    expected = PCA(n_components=4).fit(embeddings).transform(embeddings[:10])
+    assert res.shape == (10, 4)
+    assert res.dtype == np.float32
+    # principal components are defined up to sign
+    np.testing.assert_allclose(np.abs(res), np.abs(expected), atol=1e-4)
+
+
+def test_matryoshka(embeddings):
+    reduction = DimReduction("matryoshka", 8).fit(embeddings)
+    np.testing.assert_array_equal(reduction.transform(embeddings), embeddings[:, :8])
+
+
+def test_invalid_parameters(embeddings):
+    with pytest.raises(ValueError, match="unexpected dimensionality reduction"):
+        DimReduction("umap", 8)
+    with pytest.raises(ValueError, match="cannot reduce"):
+        DimReduction("matryoshka", 32).fit(embeddings)
+
+
+@pytest.mark.parametrize("backend", ["chroma", "brute_force"])
+def test_reduced_index_matches_centered_search(make_vector_index, mock_embedding_function, backend):
+    # an embedder with unnormalized outputs, full-rank pca is a rotation of centered normalized embeddings
+    rng = np.random.default_rng(0)
+    raw = rng.normal(size=(130, 16)) * rng.uniform(0.1, 10, size=(130, 1))
+    utterances = [f"utterance {i}" for i in range(100)]
+    queries = [f"query {i}" for i in range(30)]
+    embedding_function = mock_embedding_function(dict(zip(utterances + queries, raw, strict=True)))
+
+    vector_index = make_vector_index(backend, embedding_function)
+    data_handler = SimpleNamespace(utterances_train=utterances, labels_train=[i % 3 for i in range(100)])
+    # chroma searches the whole graph with a large enough ef, so both backends are exact here
+    index_params = {"hnsw_search_ef": 100} if backend == "chroma" else None
+    index = vector_index.create_collection(
+        "model", data_handler, dim_reduction="pca", n_components=16, index_params=index_params
+    )
+    ids, _ = index.query(queries, k=5)
+
+    normalized = raw / np.linalg.norm(raw, axis=1, keepdims=True)
+    centered = normalized - normalized[:100].mean(axis=0)
+    centered /= np.linalg.norm(centered, axis=1, keepdims=True)
+    expected_ids = np.argsort(-centered[100:] @ centered[:100].T, axis=1)[:, :5]
+    np.testing.assert_array_equal(ids, expected_ids)
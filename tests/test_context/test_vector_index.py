@@ -1,7 +1,10 @@
+import time
+
+import numpy as np
 import pytest
-from chromadb import Collection
 
-from autointent.context.vector_index import VectorIndex
+from autointent.context.vector_index import ChromaIndex, IVFIndex, VectorIndex
+from autointent.context.vector_index.vector_index import MAX_NAME_LENGTH, get_db_name
 
 
 @pytest.fixture
@@ -24,14 +27,14 @@ def test_vector_index_initialization(tmp_path):
 def test_get_collection(tmp_path):
     vector_index = VectorIndex(str(tmp_path), "cpu", False, 3)
     collection = vector_index.get_collection("bert-base-uncased")
-    assert isinstance(collection, Collection)
+    assert isinstance(collection, ChromaIndex)
     assert collection.name == "bert-base-uncased"
 
 
 def test_create_collection(tmp_path, data_handler):
     vector_index = VectorIndex(str(tmp_path), "cpu", False, 3)
     collection = vector_index.create_collection("bert-base-uncased", data_handler)
-    assert isinstance(collection, Collection)
+    assert isinstance(collection, ChromaIndex)
     assert collection.name == "bert-base-uncased"
     assert collection.count() == 3  # Number of utterances in data_handler
 
@@ -43,29 +46,64 @@ def test_delete_collection(tmp_path):
     assert "bert-base-uncased" not in vector_index.client.list_collections()
 
 
-def test_metadata_as_labels_multiclass(tmp_path):
-    vector_index = VectorIndex(str(tmp_path), "cpu", False, 3)
-    metadata = [{"intent_id": 0}, {"intent_id": 1}, {"intent_id": 2}]
-    labels = vector_index.metadata_as_labels(metadata)
-    assert labels == [0, 1, 2]
-
-
-def test_metadata_as_labels_multilabel(tmp_path):
-    vector_index = VectorIndex(str(tmp_path), "cpu", True, 3)
-    metadata = [{"0": 1, "1": 0, "2": 1}, {"0": 0, "1": 1, "2": 1}]
-    labels = vector_index.metadata_as_labels(metadata)
-    assert labels == [[1, 0, 1], [0, 1, 1]]
-
-
-def test_labels_as_metadata_multiclass(tmp_path):
-    vector_index = VectorIndex(str(tmp_path), "cpu", False, 3)
-    labels = [0, 1, 2]
-    metadata = vector_index.labels_as_metadata(labels)
-    assert metadata == [{"intent_id": 0}, {"intent_id": 1}, {"intent_id": 2}]
-
-
-def test_labels_as_metadata_multilabel(tmp_path):
-    vector_index = VectorIndex(str(tmp_path), "cpu", True, 3)
-    labels = [[1, 0, 1], [0, 1, 1]]
-    metadata = vector_index.labels_as_metadata(labels)
-    assert metadata == [{"0": 1, "1": 0, "2": 1}, {"0": 0, "1": 1, "2": 1}]
+def test_long_names_fit_chroma(make_vector_index, train_data):
+    vector_index = make_vector_index("chroma")
+    model_name = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+    collections = [
+        vector_index.create_collection(model_name, train_data),
+        vector_index.create_collection(model_name, train_data, index_params={"hnsw_m": 8}),
+        vector_index.create_collection(model_name, train_data, dim_reduction="pca", n_components=8),
+        vector_index.create_collection(
+            model_name, train_data, dim_reduction="pca", n_components=8, index_params={"hnsw_m": 8}
+        ),
+    ]
+    names = [collection.name for collection in collections]
+    assert all(len(name) <= MAX_NAME_LENGTH for name in names)
+    assert len(set(names)) == len(names)
+    assert get_db_name(model_name) == "sentence-transformers_paraphrase-multilingual-MiniLM-L12-v2"
+
+
+def test_build_time_excludes_embedding(make_vector_index, train_data, embeddings, mock_embedding_function):
+    class SlowEmbeddingFunction(mock_embedding_function):
+        def __call__(self, texts):
+            time.sleep(0.5)
+            return super().__call__(texts)
+
+    vector_index = make_vector_index("brute_force", SlowEmbeddingFunction(embeddings))
+    collection = vector_index.create_collection("model", train_data)
+    assert 0 < collection.build_time < 0.5
+
+
+def test_search_params_reuse_the_index(make_vector_index, train_data, monkeypatch):
+    n_builds = []
+    build = IVFIndex._build
+    monkeypatch.setattr(IVFIndex, "_build", lambda self, embeddings: n_builds.append(1) or build(self, embeddings))
+    vector_index = make_vector_index("ivf")
+
+    collections = [
+        vector_index.create_collection("model", train_data, index_params={"nprobe": nprobe}) for nprobe in [1, 2, 4]
+    ]
+    assert all(collection is collections[0] for collection in collections)
+    assert len(n_builds) == 1
+    assert collections[0].nprobe == 4
+    # parameters that are not given are reset to defaults
+    assert vector_index.get_collection("model").nprobe == 8
+
+
+def test_derived_indexes_reuse_stored_embeddings(make_vector_index, train_data, embeddings, mock_embedding_function):
+    embedding_function = mock_embedding_function(embeddings)
+    vector_index = make_vector_index("ivf", embedding_function)
+    base = vector_index.create_collection("model", train_data)
+    n_calls = embedding_function.n_calls
+
+    first = vector_index.create_collection("model", train_data, index_params={"n_lists": 4})
+    np.testing.assert_allclose(first.get_all_embeddings(), base.get_all_embeddings())
+    reduced = vector_index.create_collection("model", train_data, dim_reduction="matryoshka", n_components=8)
+    expected = base.get_all_embeddings()[:, :8]
+    np.testing.assert_allclose(reduced.get_all_embeddings(), expected / np.linalg.norm(expected, axis=1, keepdims=True))
+    assert embedding_function.n_calls == n_calls
+
+    # only the last derived index is kept
+    assert first.count() == 0
+    assert base.count() == 200
+    assert vector_index.get_collection("model", dim_reduction="matryoshka", n_components=8) is reduced
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from autointent.context.optimization_info.data_models import ScorerArtifact
+from autointent.dtype_policy import DtypePolicy, dtype_policy
+from autointent.metrics import scoring_log_likelihood
+from autointent.modules.prediction.threshold import multiclass_predict
+from autointent.modules.scoring.dnnc.dnnc import build_result
+from autointent.modules.scoring.knn.weighting import apply_weights, apply_weights_grid
+from autointent.modules.scoring.mlknn.mlknn import count_deltas, get_cond, get_posteriors, get_prior
+
+
+@pytest.fixture
+def scorer_inputs():
+    rng = np.random.default_rng(0)
+    labels = rng.integers(0, 3, size=(5, 4))
+    distances = np.sort(rng.uniform(0, 1, size=(5, 4)).astype(np.float32), axis=1)
+    return labels, distances
+
+
+def test_default_is_float32():
+    assert DtypePolicy().float_dtype is np.float32
+    assert dtype_policy.float_dtype is np.float32
+
+
+def test_unknown_dtype():
+    with pytest.raises(ValueError, match="Unknown float dtype"):
+        DtypePolicy("float16")  # type: ignore[arg-type]
+
+
+@pytest.mark.parametrize("weights", ["uniform", "distance", "closest"])
+@pytest.mark.parametrize("multilabel", [False, True])
+def test_knn_scores_follow_policy(scorer_inputs, weights, multilabel):
+    labels, distances = scorer_inputs
+    if multilabel:
+        labels = np.eye(3, dtype=int)[labels]
+    assert apply_weights(labels, distances, weights, 3, multilabel).dtype == np.float32
+    (grid_scores,) = apply_weights_grid(labels, distances, [(2, weights)], 3, multilabel)
+    assert grid_scores.dtype == np.float32
+
+
+@pytest.mark.usefixtures("float64_policy")
+def test_float64_opt_in(scorer_inputs):
+    labels, distances = scorer_inputs
+    assert apply_weights(labels, distances, "distance", 3, False).dtype == np.float64
+    assert build_result(np.ones((5, 4)), labels, 3).dtype == np.float64
+    artifact = ScorerArtifact(test_scores=np.ones((5, 3), dtype=np.float32))
+    assert artifact.test_scores.dtype == np.float64
+
+
+def test_other_scorers_follow_policy(scorer_inputs):
+    labels, _ = scorer_inputs
+    assert build_result(np.ones((5, 4)), labels, 3).dtype == np.float32
+
+    y = np.eye(3, dtype=int)[labels[:, 0]]
+    deltas = np.eye(3, dtype=int)[labels].sum(axis=1)
+    prior_true, prior_false = get_prior(y, 1.0)
+    cond_true, cond_false = get_cond(*count_deltas(deltas, y, 4), 4, 1.0)
+    assert get_posteriors(deltas, prior_true, prior_false, cond_true, cond_false).dtype == np.float32
+
+
+def test_artifacts_predictors_and_metrics():
+    scores = np.array([[0.2, 0.8], [0.6, 0.4]])
+    artifact = ScorerArtifact(test_scores=scores, oos_scores=None)
+    assert artifact.test_scores.dtype == np.float32
+    assert artifact.oos_scores is None
+
+    thresh = dtype_policy.asarray([0.7, 0.7])
+    np.testing.assert_array_equal(multiclass_predict(artifact.test_scores, thresh), [1, -1])
+    assert isinstance(scoring_log_likelihood([1, 0], artifact.test_scores), float)
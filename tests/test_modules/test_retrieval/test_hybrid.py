@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from autointent.modules.retrieval.bm25 import BM25
+from autointent.modules.retrieval.hybrid import reciprocal_rank_fusion
+
+
+def test_bm25_ranks_keyword_matches_first():
+    documents = [
+        "please block my credit card",
+        "what is the weather today",
+        "card declined at the shop",
+        "weather forecast for tomorrow in paris",
+    ]
+    bm25 = BM25().fit(documents)
+    ids, scores = bm25.query(["my card", "weather in paris", "unknown words"], k=2)
+
+    assert ids.shape == (3, 2)
+    assert ids[0, 0] == 0
+    assert set(ids[0]) == {0, 2}
+    assert ids[1, 0] == 3
+    assert np.all(scores[:2] > 0)
+    np.testing.assert_array_equal(scores[2], [0, 0])
+
+
+def test_bm25_matches_reference_formula():
+    documents = ["a b b", "b c", "c c c d"]
+    bm25 = BM25(k1=1.2, b=0.75).fit(documents)
+    scores = bm25.scores(["b", "c d"])
+
+    def score(query, doc):
+        words, avgdl = doc.split(), np.mean([len(d.split()) for d in documents])
+        res = 0.0
+        for term in set(query.split()):
+            doc_freq = sum(term in d.split() for d in documents)
+            idf = np.log(1 + (len(documents) - doc_freq + 0.5) / (doc_freq + 0.5))
+            tf = words.count(term)
+            res += idf * tf * 2.2 / (tf + 1.2 * (1 - 0.75 + 0.75 * len(words) / avgdl))
+        return res
+
+    expected = [[score(q, d) for d in documents] for q in ["b", "c d"]]
+    np.testing.assert_allclose(scores, expected, rtol=1e-5)
+
+
+def test_reciprocal_rank_fusion():
+    dense = np.array([[0, 1, 2], [3, 2, 1]])
+    sparse = np.array([[2, 3, 1], [0, 1, 2]])
+    mask = np.array([[True, True, True], [False, False, False]])
+    fused = reciprocal_rank_fusion([dense, sparse], [np.ones_like(mask), mask], n_docs=4, k=2, rrf_k=0)
+
+    # query 0: doc 2 gets 1/3 + 1/1, doc 0 gets 1/1, doc 1 gets 1/2 + 1/3, doc 3 gets 1/2
+    np.testing.assert_array_equal(fused[0], [2, 0])
+    # query 1: sparse candidates are masked out, dense order is kept
+    np.testing.assert_array_equal(fused[1], [3, 2])
+
+
+def test_bm25_query_matches_dense_scores():
+    rng = np.random.default_rng(0)
+    vocabulary = [f"w{i}" for i in range(30)]
+    documents = [" ".join(rng.choice(vocabulary, size=rng.integers(1, 8))) for _ in range(50)]
+    queries = [" ".join(rng.choice(vocabulary, size=rng.integers(1, 3))) for _ in range(20)] + ["unknown"]
+    bm25 = BM25(chunk_size=8).fit(documents)
+    ids, scores = bm25.query(queries, k=10)
+
+    dense_scores = bm25.scores(queries)
+    np.testing.assert_allclose(scores, -np.sort(-dense_scores, axis=1)[:, :10], rtol=1e-6)
+    np.testing.assert_allclose(np.take_along_axis(dense_scores, ids, axis=1), scores, rtol=1e-6)
+    assert all(len(np.unique(row)) == 10 for row in ids)
+    # queries matching few documents are padded with the first documents scoring 0
+    np.testing.assert_array_equal(ids[-1], np.arange(10))
+
+
+def test_reciprocal_rank_fusion_matches_dense_reference():
+    rng = np.random.default_rng(0)
+    n_queries, n_docs, n_candidates, rrf_k = 50, 40, 8, 60
+    rankings = [np.stack([rng.permutation(n_docs)[:n_candidates] for _ in range(n_queries)]) for _ in range(2)]
+    masks = [np.ones((n_queries, n_candidates), dtype=bool), rng.random((n_queries, n_candidates)) > 0.3]
+    fused = reciprocal_rank_fusion(rankings, masks, n_docs, k=5, rrf_k=rrf_k, chunk_size=16)
+
+    expected = np.zeros((n_queries, n_docs))
+    for ranking, mask in zip(rankings, masks, strict=True):
+        for i in range(n_queries):
+            for rank, (doc, retrieved) in enumerate(zip(ranking[i], mask[i], strict=True), start=1):
+                expected[i, doc] += retrieved / (rrf_k + rank)
+    np.testing.assert_allclose(
+        np.take_along_axis(expected, fused, axis=1), -np.sort(-expected, axis=1)[:, :5], rtol=1e-12
+    )
+
+
+def test_reciprocal_rank_fusion_needs_k_candidates():
+    ranking = np.array([[0, 1]])
+    with pytest.raises(ValueError, match="at least 3 distinct candidates"):
+        reciprocal_rank_fusion([ranking, ranking], [np.ones((1, 2), dtype=bool)] * 2, n_docs=4, k=3)
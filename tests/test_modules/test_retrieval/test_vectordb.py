@@ -45,5 +45,5 @@ def test_get_assets_returns_correct_artifact():
 @pytest.mark.xfail
 def test_retrieve_candidates_returns_correct_labels(context):
     collection = context.vector_index.create_collection("sergeyzh/rubert-tiny-turbo", context.data_handler)
-    labels = retrieve_candidates(collection, 5, ["test utterance"], context.vector_index.metadata_as_labels)
+    labels = retrieve_candidates(collection, 5, ["test utterance"])
     np.testing.assert_array_equal(labels, np.array([[1, 0, 1]]))
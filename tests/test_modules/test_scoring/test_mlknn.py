@@ -1,4 +1,5 @@
 import numpy as np
+import pytest
 
 from autointent import Context
 from autointent.metrics import retrieval_hit_rate_macro, scoring_f1
@@ -60,3 +61,36 @@ def test_base_mlknn(setup_environment, load_clinic_subset):
         ]
     )
     assert (predictions == np.array([[0, 1, 0], [0, 1, 0], [0, 1, 0], [0, 1, 0], [0, 1, 0]])).all()
+
+
+@pytest.mark.usefixtures("float64_policy")
+def test_vectorized_counts_and_posteriors():
+    rng = np.random.default_rng(0)
+    n_train, n_test, n_classes, k = 200, 50, 6, 4
+    y = (rng.random((n_train, n_classes)) < 0.3).astype(int)
+    train_neighbors = y[rng.integers(0, n_train, size=(n_train, k))]
+    test_neighbors = y[rng.integers(0, n_train, size=(n_test, k))]
+
+    scorer = MLKnnScorer(k=k, s=0.5)
+    scorer._n_classes = n_classes
+    scorer._prior_prob_true, scorer._prior_prob_false = scorer._compute_prior(y)
+    scorer._cond_prob_true, scorer._cond_prob_false = scorer._compute_cond_from_neighbors(train_neighbors, y)
+
+    # reference: per-row loops of the original implementation
+    c = np.zeros((n_classes, k + 1), dtype=int)
+    cn = np.zeros((n_classes, k + 1), dtype=int)
+    for i in range(n_train):
+        deltas = train_neighbors[i].sum(axis=0)
+        c[np.arange(n_classes), deltas] += y[i]
+        cn[np.arange(n_classes), deltas] += 1 - y[i]
+    np.testing.assert_array_equal(scorer._cond_prob_true, (0.5 + c) / (0.5 * (k + 1) + c.sum(axis=1)[:, None]))
+    np.testing.assert_array_equal(scorer._cond_prob_false, (0.5 + cn) / (0.5 * (k + 1) + cn.sum(axis=1)[:, None]))
+
+    expected = np.zeros((n_test, n_classes))
+    for i in range(n_test):
+        deltas = test_neighbors[i].sum(axis=0)
+        for label in range(n_classes):
+            p_true = scorer._prior_prob_true[label] * scorer._cond_prob_true[label, deltas[label]]
+            p_false = scorer._prior_prob_false[label] * scorer._cond_prob_false[label, deltas[label]]
+            expected[i, label] = p_true / (p_true + p_false)
+    np.testing.assert_array_equal(scorer._predict_from_neighbors(test_neighbors), expected)
@@ -0,0 +1,129 @@
+import numpy as np
+import pytest
+
+from autointent.configs.vector_index import VectorIndexConfig
+from autointent.context import Context
+from autointent.context.hashed_embedding import HASHED_CHAR_NGRAMS_MODEL
+from autointent.metrics import retrieval_hit_rate, scoring_roc_auc
+from autointent.modules import KNNScorer, MLKnnScorer, VectorDBModule
+from autointent.modules.retrieval import vectordb
+from autointent.nodes.optimization.node_optimizer import NodeOptimizer, group_combinations
+
+
+@pytest.fixture
+def context(tmp_path, load_clinic_subset):
+    return Context(
+        multiclass_intent_records=load_clinic_subset,
+        multilabel_utterance_records=[],
+        test_utterance_records=[],
+        device="cpu",
+        mode="multiclass",
+        multilabel_generation_config="",
+        db_dir=str(tmp_path),
+        regex_sampling=0,
+        seed=0,
+        vector_index_config=VectorIndexConfig(backend="brute_force"),
+    )
+
+
+def test_group_combinations():
+    combinations = [
+        {"k": 1, "model_name": "a"},
+        {"k": 1, "model_name": "b"},
+        {"k": 5, "model_name": "a"},
+        {"k": 5, "model_name": "b"},
+    ]
+    assert group_combinations(combinations, ("k",)) == [[0, 2], [1, 3]]
+    assert group_combinations(combinations, ()) == [[0], [1], [2], [3]]
+
+
+def test_retrieval_grid_matches_separate_trials(context):
+    ks = [1, 3, 5]
+    search_space = [{"module_type": "vector_db", "k": ks, "model_name": [HASHED_CHAR_NGRAMS_MODEL]}]
+    NodeOptimizer("retrieval", search_space, "retrieval_hit_rate").fit(context)
+
+    trials = context.optimization_info.trials.retrieval
+    assert [trial.module_params["k"] for trial in trials] == ks
+    for k, trial in zip(ks, trials, strict=True):
+        module = VectorDBModule(k=k, model_name=HASHED_CHAR_NGRAMS_MODEL)
+        module.fit(context)
+        assert trial.metric_value == module.score(context, retrieval_hit_rate)
+        assert set(trial.extra_info) >= {"fit_time", "score_time", "query_latency"}
+
+
+def test_retrieval_grid_recall_is_per_k(context, monkeypatch):
+    recall_k = []
+
+    def recording_recall(_collection, _queries, ids):
+        recall_k.append(ids.shape[1])
+        return ids.shape[1] / 10
+
+    monkeypatch.setattr(vectordb, "search_recall", recording_recall)
+    ks = [1, 3, 5]
+    search_space = [{"module_type": "vector_db", "k": ks, "model_name": [HASHED_CHAR_NGRAMS_MODEL]}]
+    NodeOptimizer("retrieval", search_space, "retrieval_hit_rate").fit(context)
+
+    assert recall_k == ks
+    trials = context.optimization_info.trials.retrieval
+    for k, trial in zip(ks, trials, strict=True):
+        assert trial.extra_info["recall"] == k / 10
+        # the index is queried once for the whole grid, latency is measured at the largest k
+        assert trial.extra_info["query_k"] == max(ks)
+
+
+def test_knn_grid_matches_separate_trials(context):
+    retrieval = [{"module_type": "vector_db", "k": [10], "model_name": [HASHED_CHAR_NGRAMS_MODEL]}]
+    NodeOptimizer("retrieval", retrieval, "retrieval_hit_rate").fit(context)
+    scoring = [{"module_type": "knn", "k": [1, 5], "weights": ["uniform", "distance", "closest"]}]
+    NodeOptimizer("scoring", scoring, "scoring_roc_auc").fit(context)
+
+    trials = context.optimization_info.trials.scoring
+    artifacts = context.optimization_info.artifacts.scoring
+    assert len(trials) == 6
+    for trial, artifact in zip(trials, artifacts, strict=True):
+        module = KNNScorer(**trial.module_params)
+        module.fit(context)
+        assert trial.metric_value == module.score(context, scoring_roc_auc)
+        np.testing.assert_array_equal(artifact.test_scores, module.get_assets().test_scores)
+
+
+def test_mlknn_grid_matches_separate_trials(tmp_path, load_clinic_subset):
+    context = Context(
+        multiclass_intent_records=load_clinic_subset,
+        multilabel_utterance_records=[],
+        test_utterance_records=[],
+        device="cpu",
+        mode="multiclass_as_multilabel",
+        multilabel_generation_config="",
+        db_dir=str(tmp_path),
+        regex_sampling=0,
+        seed=0,
+        vector_index_config=VectorIndexConfig(backend="brute_force"),
+    )
+    retrieval = [{"module_type": "vector_db", "k": [10], "model_name": [HASHED_CHAR_NGRAMS_MODEL]}]
+    NodeOptimizer("retrieval", retrieval, "retrieval_hit_rate").fit(context)
+    collection = context.get_best_collection()
+    queried_k = []
+    query = collection.query
+
+    def counting_query(queries, k):
+        queried_k.append(k)
+        return query(queries, k)
+
+    collection.query = counting_query
+    scoring = [{"module_type": "mlknn", "k": [3, 5], "s": [0.5, 1.0], "ignore_first_neighbours": [0, 1]}]
+    NodeOptimizer("scoring", scoring, "scoring_roc_auc").fit(context)
+    # train, test and oos tables are queried once each at the largest k + ignore_first_neighbours
+    assert queried_k == [6, 6, 6]
+    # and dropped when the node is finished
+    assert context.query_cache._neighbours == {}
+    assert context.query_cache._embeddings == {}
+
+    trials = context.optimization_info.trials.scoring
+    artifacts = context.optimization_info.artifacts.scoring
+    assert len(trials) == 8
+    for trial, artifact in zip(trials, artifacts, strict=True):
+        module = MLKnnScorer(**trial.module_params)
+        module.fit(context)
+        assert trial.metric_value == module.score(context, scoring_roc_auc)
+        np.testing.assert_array_equal(artifact.test_scores, module.get_assets().test_scores)
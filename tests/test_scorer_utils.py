@@ -4,7 +4,7 @@ import pytest
 from autointent.modules.scoring.base import get_topk
 from autointent.modules.scoring.dnnc import build_result
 from autointent.modules.scoring.knn.count_neighbors import get_counts
-from autointent.modules.scoring.knn.weighting import closest_weighting
+from autointent.modules.scoring.knn.weighting import apply_weights, apply_weights_grid, closest_weighting
 
 
 @pytest.mark.parametrize(
@@ -97,6 +97,7 @@ def test_scoring_get_topk(scores, k, ground_truth):
     np.testing.assert_array_equal(x=get_topk(scores, k=k), y=ground_truth)
 
 
+@pytest.mark.usefixtures("float64_policy")
 @pytest.mark.parametrize(
     ("scores", "labels", "n_classes", "ground_truth"),
     [
@@ -130,6 +131,7 @@ def test_dnnc_build_result(scores, labels, n_classes, ground_truth):
     np.testing.assert_array_equal(x=build_result(scores, labels, n_classes), y=ground_truth)
 
 
+@pytest.mark.usefixtures("float64_policy")
 @pytest.mark.parametrize(
     ("labels", "distances", "multilabel", "n_classes", "ground_truth"),
     [
@@ -186,3 +188,38 @@ def test_dnnc_build_result(scores, labels, n_classes, ground_truth):
 )
 def test_closest_weighting(labels, distances, multilabel, n_classes, ground_truth):
     np.testing.assert_array_equal(x=closest_weighting(labels, distances, multilabel, n_classes), y=ground_truth)
+
+
+@pytest.mark.parametrize("multilabel", [False, True])
+def test_apply_weights_grid_matches_apply_weights(multilabel):
+    rng = np.random.default_rng(0)
+    n_samples, n_candidates, n_classes = 20, 10, 4
+    if multilabel:
+        labels = rng.integers(0, 2, size=(n_samples, n_candidates, n_classes))
+    else:
+        labels = rng.integers(0, n_classes, size=(n_samples, n_candidates))
+    distances = np.sort(rng.uniform(0, 2, size=(n_samples, n_candidates)).astype(np.float32), axis=1)
+    grid = [(k, weights) for k in [1, 3, 10] for weights in ["uniform", "distance", "closest"]]
+
+    results = apply_weights_grid(labels, distances, grid, n_classes, multilabel)
+    for (k, weights), probs in zip(grid, results, strict=True):
+        expected = apply_weights(labels[:, :k], distances[:, :k], weights, n_classes, multilabel)
+        np.testing.assert_array_equal(probs, expected)
+
+
+@pytest.mark.parametrize("multilabel", [False, True])
+def test_closest_weighting_matches_dense(multilabel):
+    rng = np.random.default_rng(0)
+    n_samples, n_candidates, n_classes = 30, 8, 5
+    if multilabel:
+        labels = rng.integers(0, 2, size=(n_samples, n_candidates, n_classes))
+        onehot = labels
+    else:
+        labels = rng.integers(0, n_classes, size=(n_samples, n_candidates))
+        onehot = np.eye(n_classes)[labels]
+    distances = rng.uniform(0, 2, size=(n_samples, n_candidates)).astype(np.float32)
+
+    # reference: max over a dense (n_samples, n_candidates, n_classes) tensor of similarities
+    dense = np.where(onehot != 0, (1 - distances)[..., None], -1)
+    expected = (dense.max(axis=1) + 1) / 2
+    np.testing.assert_array_equal(closest_weighting(labels, distances, multilabel, n_classes), expected)